@@ -0,0 +1,89 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_read_db
+from core.conditional import blog_validators, is_not_modified, set_validators
+from crud import async_blogs_crud
+from cache import cache
+from schemas.blogs_schema import BlogRow, BlogPage, BlogCursorPage, BlogBatch
+from .blogs import (
+    listing_bounds, listing_cacheable, listing_cache_key, listing_tags, page_response, cursor_response, capped_total, blog_detail, check_view, listing_rows,
+    batch_ids, batch_response,
+)
+
+router = APIRouter(prefix="/blogs", tags=["Blogs"])
+
+
+@router.get("/", response_model=BlogPage | BlogCursorPage, response_model_exclude_unset=True)
+async def get_blogs(
+    page: int = 1,
+    limit: int = 10,
+    sort_by: str = "created_at",
+    order: str = "desc",
+    search: str = None,
+    cursor: str = None,
+    include_total: bool = None,
+    view: str = "full",
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    check_view(view)
+    page, limit = listing_bounds(page, limit)
+    cacheable = listing_cacheable(page, cursor)
+    key = listing_cache_key(page, limit, sort_by, order, search, cursor, include_total, view)
+    since = cache.fence() if cacheable else None
+    if cacheable:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    try:
+        if cursor is not None:
+            blogs, next_cursor = await async_blogs_crud.get_blogs_after(db, cursor or None, limit, sort_by, order, search)
+            total = await async_blogs_crud.count_blogs(db, search, cached=True) if include_total else None
+            response = capped_total(cursor_response(blogs, limit, next_cursor, total, view), search)
+        else:
+            blogs, total = await async_blogs_crud.get_blogs_filtered(db, page, limit, sort_by, order, search, include_total is not False)
+            response = capped_total(page_response(blogs, total, page, limit, view), search)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if cacheable:
+        cache.set(key, response, tags=listing_tags(sort_by, search, response), since=since)
+    return response
+
+
+@router.get("/user/{user_id}", response_model=list[BlogRow])
+async def get_blogs_by_user(user_id: int, view: str = "full", db: AsyncSession = Depends(get_async_read_db)):
+    check_view(view)
+    return listing_rows(await async_blogs_crud.get_blogs_by_user(db, user_id), view)
+
+
+@router.get("/batch", response_model=BlogBatch)
+async def get_blogs_batch(ids: list[int] = Query(...), view: str = "full", db: AsyncSession = Depends(get_async_read_db)):
+    check_view(view)
+    ids = batch_ids(ids)
+    return batch_response(ids, await async_blogs_crud.get_blogs_by_ids(db, ids), view)
+
+
+@router.get("/{blog_id}")
+async def get_blog(blog_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
+    since = cache.fence()
+    validators = cache.get(f"blog:{blog_id}:validators")
+    if validators is None:
+        stamp = await async_blogs_crud.get_blog_stamp(db, blog_id)
+        if not stamp:
+            raise HTTPException(status_code=404, detail="Blog not found")
+        validators = blog_validators(stamp)
+        cache.set(f"blog:{blog_id}:validators", validators, tags=[f"blog:{blog_id}"], since=since)
+    if is_not_modified(request, validators):
+        return set_validators(Response(status_code=304), validators)
+    set_validators(response, validators)
+
+    cached = cache.get(f"blog:{blog_id}")
+    if cached is not None:
+        return cached
+    blog = await async_blogs_crud.get_blog_with_author(db, blog_id)
+    if not blog:
+        raise HTTPException(status_code=404, detail="Blog not found")
+    result = blog_detail(blog)
+    cache.set(f"blog:{blog_id}", result, tags=[f"blog:{blog_id}"], since=since)
+    return result
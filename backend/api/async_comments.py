@@ -0,0 +1,66 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_read_db
+from core.conditional import comments_validators, is_not_modified, set_validators
+from crud import async_blogs_crud, async_comments_crud
+from cache import cache
+from schemas.comment_schema import CommentOut, CommentThreadPage, CommentReplyPage
+from .comments import comment_rows, comment_node, thread_limits, thread_page, MAX_REPLIES_PAGE
+
+router = APIRouter(prefix="/comments", tags=["Comments"])
+
+
+@router.get("/blog/{blog_id}", response_model=list[CommentOut])
+async def get_comments(blog_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
+    since = cache.fence()
+    validators = cache.get(f"comments:{blog_id}:validators")
+    if validators is None:
+        stamp = await async_blogs_crud.get_blog_stamp(db, blog_id)
+        if stamp:
+            validators = comments_validators(stamp)
+            cache.set(f"comments:{blog_id}:validators", validators, tags=[f"comments:{blog_id}"], since=since)
+    if validators:
+        if is_not_modified(request, validators):
+            return set_validators(Response(status_code=304), validators)
+        set_validators(response, validators)
+
+    cached = cache.get(f"comments:{blog_id}")
+    if cached is not None:
+        return cached
+    result = comment_rows(await async_comments_crud.get_comments(db, blog_id))
+    cache.set(f"comments:{blog_id}", result, tags=[f"comments:{blog_id}"], since=since)
+    return result
+
+
+@router.get("/blog/{blog_id}/threads", response_model=CommentThreadPage)
+async def get_threads(blog_id: int, request: Request, response: Response, limit: int = 20, replies: int = 3, after: int = None, db: AsyncSession = Depends(get_async_read_db)):
+    limit, replies = thread_limits(limit, replies)
+    since = cache.fence()
+    validators = cache.get(f"comments:{blog_id}:validators")
+    if validators is None:
+        stamp = await async_blogs_crud.get_blog_stamp(db, blog_id)
+        if not stamp:
+            raise HTTPException(status_code=404, detail="Blog not found")
+        validators = comments_validators(stamp)
+        cache.set(f"comments:{blog_id}:validators", validators, tags=[f"comments:{blog_id}"], since=since)
+    if is_not_modified(request, validators):
+        return set_validators(Response(status_code=304), validators)
+    set_validators(response, validators)
+
+    key = f"comments:{blog_id}:threads:{limit}:{replies}:{after}"
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    result = thread_page(*await async_comments_crud.get_threads(db, blog_id, limit, replies, after))
+    cache.set(key, result, tags=[f"comments:{blog_id}"], since=since)
+    return result
+
+
+@router.get("/{comment_id}/replies", response_model=CommentReplyPage)
+async def get_replies(comment_id: int, limit: int = 50, after: int = None, db: AsyncSession = Depends(get_async_read_db)):
+    limit = max(1, min(limit, MAX_REPLIES_PAGE))
+    comment = await async_comments_crud.get_comment(db, comment_id)
+    if not comment:
+        raise HTTPException(status_code=404, detail="Comment not found")
+    rows, next_after = await async_comments_crud.get_replies(db, comment, limit, after)
+    return {"replies": [comment_node(c, username) for c, username in rows], "next_after": next_after}
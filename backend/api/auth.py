@@ -1,48 +1,52 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from database import get_db
 from core.security import get_password_hash, create_access_token, get_current_user
-from crud import user_crud
+from core.hashing import hasher, needs_rehash, HashingBusy
+from crud import user_crud, outbox_crud
 from schemas.user_schema import UserCreate, UserLogin, UserOut, SendOTP, VerifyOTP, ResetPasswordOTP
-from fastapi_mail import FastMail, MessageSchema, MessageType
-from core.config import conf
+from outbox import dispatcher as outbox
 import random
 import datetime
 import secrets
 
 
-mail = FastMail(conf)
-
-
 router = APIRouter(prefix="", tags=["Users"])
 
 
 @router.post("/register", response_model=UserOut)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: Session = Depends(get_db)):
+    hashed = await hasher.hash(user.password)
     try:
-        new_user = user_crud.create_user(db, user.username, user.email, user.password)
+        new_user = await run_in_threadpool(user_crud.create_user, db, user.username, user.email, hashed)
         return new_user
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/login")
-def login(user: UserLogin, db: Session = Depends(get_db)):
-    db_user = user_crud.get_user_by_username(db, user.username)
+async def login(user: UserLogin, db: Session = Depends(get_db)):
+    db_user = await run_in_threadpool(user_crud.get_user_by_username, db, user.username)
     if not db_user:
         raise HTTPException(status_code=400, detail="Invalid username")
 
-    import bcrypt
-    if not bcrypt.checkpw(user.password.encode('utf-8'), db_user.password.encode('utf-8')):
+    if not await hasher.verify(user.password, db_user.password):
         raise HTTPException(status_code=400, detail="Incorrect password")
 
-    token = create_access_token(data={"sub": db_user.username, "user_id": db_user.id})
+    if needs_rehash(db_user.password):
+        try:
+            new_hash = await hasher.rehash(user.password)
+            await run_in_threadpool(user_crud.set_password_hash, db, db_user.id, new_hash)
+        except HashingBusy:
+            pass
+
+    token = create_access_token(data={"sub": db_user.username, "user_id": db_user.id, "ver": db_user.token_version})
     return {"access_token": token, "token_type": "bearer"}
 
 @router.post("/send-otp")
-async def send_otp_route(request: SendOTP, db: Session = Depends(get_db)):
-    result = await send_otp(db, request.email, mail)
-    return result
+def send_otp_route(request: SendOTP, db: Session = Depends(get_db)):
+    return send_otp(db, request.email)
 
 
 @router.post("/verify-otp")
@@ -51,13 +55,13 @@ def verify_otp_route(request: VerifyOTP, db: Session = Depends(get_db)):
 
 
 @router.post("/reset-password-with-otp")
-def reset_password_with_otp_route(request: ResetPasswordOTP, db: Session = Depends(get_db)):
-    return reset_password_with_otp(db, request.reset_token, request.new_password)
+async def reset_password_with_otp_route(request: ResetPasswordOTP, db: Session = Depends(get_db)):
+    return await reset_password_with_otp(db, request.reset_token, request.new_password)
 
 
 @router.post("/reset-password")
-def reset_password_route(request: ResetPasswordOTP, db: Session = Depends(get_db)):
-    return reset_password(db, request.reset_token, request.new_password)
+async def reset_password_route(request: ResetPasswordOTP, db: Session = Depends(get_db)):
+    return await reset_password(db, request.reset_token, request.new_password)
 
 @router.get("/me", response_model=UserOut)
 def get_me(current_user = Depends(get_current_user)):
@@ -69,7 +73,7 @@ def logout(response: Response):
     return {"message": "Logged out successfully"}
 
 
-async def send_otp(db, email, mail):
+def send_otp(db, email):
     user = user_crud.get_user_by_email(db, email)
     if not user:
         raise HTTPException(status_code=400, detail="Email not registered")
@@ -78,14 +82,8 @@ async def send_otp(db, email, mail):
     expires = (datetime.datetime.now() + datetime.timedelta(minutes=10)).strftime("%Y-%m-%d %H:%M:%S")
     user_crud.set_otp(db, email, otp, expires)
 
-    message = MessageSchema(
-    subject="Your OTP for Password Reset",
-    recipients=[email],
-    body=f"Your OTP is {otp}. It expires in 10 minutes.",
-    subtype=MessageType.plain  # add this!
-    )
-
-    await mail.send_message(message)
+    outbox_crud.enqueue_email(db, email, "Your OTP for Password Reset", f"Your OTP is {otp}. It expires in 10 minutes.")
+    outbox.notify()
     return {"status": "success", "message": "OTP sent to your email"}
 
 
@@ -99,17 +97,19 @@ def verify_otp(db, email, otp):
         raise HTTPException(status_code=400, detail="Invalid or expired OTP")
 
 
-def reset_password_with_otp(db, reset_token, new_password):
-    user = user_crud.verify_reset_token(db, reset_token)
+async def reset_password_with_otp(db, reset_token, new_password):
+    user = await run_in_threadpool(user_crud.verify_reset_token, db, reset_token)
     if not user:
         raise HTTPException(status_code=400, detail="Invalid or expired reset token")
-    user_crud.update_password_by_email(db, user.email, new_password)
+    hashed = await hasher.hash(new_password)
+    await run_in_threadpool(user_crud.update_password_by_email, db, user.email, hashed)
     return {"status": "success", "message": "Password reset successfully"}
 
 
-def reset_password(db, reset_token, new_password):
-    user = user_crud.verify_reset_token(db, reset_token)
+async def reset_password(db, reset_token, new_password):
+    user = await run_in_threadpool(user_crud.verify_reset_token, db, reset_token)
     if not user:
         raise HTTPException(status_code=400, detail="Invalid or expired reset token")
-    user_crud.update_password_by_email(db, user.email, new_password)
+    hashed = await hasher.hash(new_password)
+    await run_in_threadpool(user_crud.update_password_by_email, db, user.email, hashed)
     return {"status": "success", "message": "Password reset successfully"}
@@ -1,133 +1,293 @@
-from fastapi import APIRouter, Depends, HTTPException, Form, UploadFile, File
-from sqlalchemy.orm import Session, joinedload
-from database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Form, UploadFile, File, Request, Response, Query
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from database import SessionLocal, get_db, get_read_db
 from core.security import get_current_user
-from crud import blogs_crud, likes_crud, comments_crud
-import models
-import os, shutil
+from core.conditional import blog_validators, is_not_modified, set_validators
+from crud import blogs_crud
+from cache import cache
+from media.uploads import save_upload, is_stored_media, UploadError
+from media.derivatives import derivative_urls, pool as derivatives_pool
+from core.config import CACHE_LISTING_PAGES, EXCERPT_LENGTH, BATCH_MAX_IDS, SEARCH_MAX_RESULTS
+from schemas.blogs_schema import BlogOut, BlogRow, BlogPage, BlogCursorPage, BlogBatch
 
 router = APIRouter(prefix="/blogs", tags=["Blogs"])
-UPLOAD_DIR = "public/uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+LISTING_VIEWS = ("full", "excerpt")
+MAX_LISTING_PAGE = 100
 
-@router.get("/")
+
+@router.get("/", response_model=BlogPage | BlogCursorPage, response_model_exclude_unset=True)
 def get_blogs(
     page: int = 1,
     limit: int = 10,
     sort_by: str = "created_at",
     order: str = "desc",
     search: str = None,
-    db: Session = Depends(get_db)
+    cursor: str = None,
+    include_total: bool = None,
+    view: str = "full",
+    db: Session = Depends(get_read_db)
 ):
-    blogs, total = blogs_crud.get_blogs_filtered(db, page, limit, sort_by, order, search)
-    result = []
-    for blog in blogs:
-        blog_dict = blog.__dict__.copy()
-        blog_dict["author_username"] = blog.author.username if blog.author else None
-        blog_dict["likes_count"] = likes_crud.count_likes(db, blog.id)
-        blog_dict["comments_count"] = db.query(models.Comment).filter(models.Comment.blog_id == blog.id).count()
-        result.append(blog_dict)
+    check_view(view)
+    page, limit = listing_bounds(page, limit)
+    cacheable = listing_cacheable(page, cursor)
+    key = listing_cache_key(page, limit, sort_by, order, search, cursor, include_total, view)
+    since = cache.fence() if cacheable else None
+    if cacheable:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    try:
+        if cursor is not None:
+            blogs, next_cursor = blogs_crud.get_blogs_after(db, cursor or None, limit, sort_by, order, search)
+            total = blogs_crud.count_blogs(db, search, cached=True) if include_total else None
+            response = capped_total(cursor_response(blogs, limit, next_cursor, total, view), search)
+        else:
+            blogs, total = blogs_crud.get_blogs_filtered(db, page, limit, sort_by, order, search, include_total is not False)
+            response = capped_total(page_response(blogs, total, page, limit, view), search)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if cacheable:
+        cache.set(key, response, tags=listing_tags(sort_by, search, response), since=since)
+    return response
+
+
+def listing_bounds(page, limit):
+    return max(1, page), max(1, min(limit, MAX_LISTING_PAGE))
+
+
+def listing_cacheable(page, cursor):
+    return cursor == "" if cursor is not None else page <= CACHE_LISTING_PAGES
+
+
+def listing_cache_key(page, limit, sort_by, order, search, cursor, include_total, view):
+    return f"blogs:list:{page}:{limit}:{sort_by}:{order}:{search or ''}:{cursor}:{include_total}:{view}"
+
+
+def check_view(view):
+    if view not in LISTING_VIEWS:
+        raise HTTPException(status_code=400, detail=f"view must be one of {', '.join(LISTING_VIEWS)}")
+
+
+def listing_tags(sort_by, search, response):
+    tags = ["blogs:list", f"blogs:sort:{sort_by}"] + [f"blog:{blog['id']}" for blog in response["blogs"]]
+    if search:
+        tags.append("blogs:search")
+    return tags
+
+
+def excerpt(text, length=EXCERPT_LENGTH):
+    if len(text) <= length:
+        return text
+    cut = text[:length]
+    space = cut.rfind(" ")
+    if space > length // 2:
+        cut = cut[:space]
+    return cut.rstrip() + "…"
+
+
+def blog_row(blog, author_username, view="full"):
+    """One listing entry with the fields of BlogOut, already JSON-compatible so it can be cached as is."""
+    row = {
+        "id": blog.id,
+        "title": blog.title,
+        "image_url": blog.image_url,
+        "image_variants": derivative_urls(blog.image_url),
+        "video_url": blog.video_url,
+        "user_id": blog.user_id,
+        "author_username": author_username,
+        "likes_count": blog.likes_count,
+        "comments_count": blog.comments_count,
+        "created_at": blog.created_at.isoformat(),
+    }
+    if view == "excerpt":
+        row["excerpt"] = excerpt(blog.content)
+    else:
+        row["content"] = blog.content
+    return row
+
+
+def listing_rows(blogs, view="full"):
+    return [blog_row(blog, author_username, view) for blog, author_username in blogs]
+
+
+def page_response(blogs, total, page, limit, view="full"):
     return {
-        "blogs": result,
+        "blogs": listing_rows(blogs, view),
         "total": total,
         "page": page,
         "limit": limit,
-        "total_pages": (total + limit - 1) // limit
+        "total_pages": (total + limit - 1) // limit if total is not None else None
     }
 
 
-@router.get("/user/{user_id}")
-def get_blogs_by_user(user_id: int, db: Session = Depends(get_db)):
-    blogs = db.query(models.Blog).filter(models.Blog.user_id == user_id).all()
-    result = []
-    for blog in blogs:
-        blog_dict = blog.__dict__.copy()
-        blog_dict["likes_count"] = likes_crud.count_likes(db, blog.id)
-        blog_dict["comments_count"] = db.query(models.Comment).filter(models.Comment.blog_id == blog.id).count()
-        result.append(blog_dict)
-    return result
+def cursor_response(blogs, limit, next_cursor, total=None, view="full"):
+    response = {"blogs": listing_rows(blogs, view), "limit": limit, "next_cursor": next_cursor}
+    if total is not None:
+        response["total"] = total
+    return response
 
 
-@router.get("/{blog_id}")
-def get_blog(blog_id: int, db: Session = Depends(get_db)):
-    blog = db.query(models.Blog).options(joinedload(models.Blog.author)).filter(models.Blog.id == blog_id).first()
-    if not blog:
-        raise HTTPException(status_code=404, detail="Blog not found")
-    likes = likes_crud.count_likes(db, blog_id)
-    comments = db.query(models.Comment).filter(models.Comment.blog_id == blog_id).count()
+def capped_total(response, search):
+    """Search totals past SEARCH_MAX_RESULTS only say that more blogs matched; report them as capped.
+
+    Only the SEARCH_MAX_RESULTS most relevant matches are listed under any
+    sort, so a capped search sorted by date leaves out older, less relevant
+    matches rather than paging on to them.
+    """
+    total = response.get("total")
+    if search and total is not None and total > SEARCH_MAX_RESULTS:
+        response["total"] = SEARCH_MAX_RESULTS
+        response["total_capped"] = True
+        if "total_pages" in response:
+            response["total_pages"] = (SEARCH_MAX_RESULTS + response["limit"] - 1) // response["limit"]
+    return response
+
+
+def blog_detail(blog):
     return {
         "id": blog.id,
         "title": blog.title,
         "content": blog.content,
         "image_url": blog.image_url,
+        "image_variants": derivative_urls(blog.image_url),
         "video_url": blog.video_url,
         "author_id": blog.user_id,
         "author_username": blog.author.username if blog.author else None,
-        "likes_count": likes,
-        "comments_count": comments,
+        "likes_count": blog.likes_count,
+        "comments_count": blog.comments_count,
     }
 
 
-@router.post("/")
-def create_blog(
+@router.get("/user/{user_id}", response_model=list[BlogRow])
+def get_blogs_by_user(user_id: int, view: str = "full", db: Session = Depends(get_read_db)):
+    check_view(view)
+    return listing_rows(blogs_crud.get_blogs_by_user(db, user_id), view)
+
+
+def batch_ids(ids, limit=BATCH_MAX_IDS):
+    unique = list(dict.fromkeys(ids))
+    if len(unique) > limit:
+        raise HTTPException(status_code=400, detail=f"At most {limit} ids per request")
+    return unique
+
+
+def batch_response(ids, rows, view):
+    found = {blog.id for blog, _ in rows}
+    return {"blogs": listing_rows(rows, view), "missing": [blog_id for blog_id in ids if blog_id not in found]}
+
+
+@router.get("/batch", response_model=BlogBatch)
+def get_blogs_batch(ids: list[int] = Query(...), view: str = "full", db: Session = Depends(get_read_db)):
+    check_view(view)
+    ids = batch_ids(ids)
+    return batch_response(ids, blogs_crud.get_blogs_by_ids(db, ids), view)
+
+
+@router.get("/{blog_id}")
+def get_blog(blog_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    since = cache.fence()
+    validators = cache.get(f"blog:{blog_id}:validators")
+    if validators is None:
+        stamp = blogs_crud.get_blog_stamp(db, blog_id)
+        if not stamp:
+            raise HTTPException(status_code=404, detail="Blog not found")
+        validators = blog_validators(stamp)
+        cache.set(f"blog:{blog_id}:validators", validators, tags=[f"blog:{blog_id}"], since=since)
+    if is_not_modified(request, validators):
+        return set_validators(Response(status_code=304), validators)
+    set_validators(response, validators)
+
+    cached = cache.get(f"blog:{blog_id}")
+    if cached is not None:
+        return cached
+    blog = blogs_crud.get_blog_with_author(db, blog_id)
+    if not blog:
+        raise HTTPException(status_code=404, detail="Blog not found")
+    result = blog_detail(blog)
+    cache.set(f"blog:{blog_id}", result, tags=[f"blog:{blog_id}"], since=since)
+    return result
+
+
+async def resolve_media(upload: UploadFile | None, url: str | None, kind: str, current: str | None = None):
+    if upload:
+        try:
+            return await save_upload(upload, kind)
+        except UploadError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+    if url and url != current:
+        if not is_stored_media(url):
+            raise HTTPException(status_code=400, detail=f"Unknown {kind} upload")
+        return url
+    return current
+
+
+def derivatives_ready(image_url: str):
+    # image_variants is part of the response, so the blogs' validators must
+    # change too or clients holding the old ETag keep getting 304s without it.
+    db = SessionLocal()
+    try:
+        blog_ids = blogs_crud.touch_image(db, image_url)
+    finally:
+        db.close()
+    if blog_ids:
+        cache.invalidate_tags(*(f"blog:{blog_id}" for blog_id in blog_ids))
+
+
+def schedule_derivatives(image_url: str | None):
+    derivatives_pool.submit(image_url, on_done=lambda: derivatives_ready(image_url))
+
+
+@router.post("/", response_model=BlogOut)
+async def create_blog(
     title: str = Form(...),
     content: str = Form(...),
     image: UploadFile | None = File(None),
     video: UploadFile | None = File(None),
+    image_url: str = Form(None),
+    video_url: str = Form(None),
     current_user = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    image_url, video_url = None, None
-
-    if image:
-        path = os.path.join(UPLOAD_DIR, image.filename)
-        with open(path, "wb") as f:
-            shutil.copyfileobj(image.file, f)
-        image_url = f"/uploads/{image.filename}"
-
-    if video:
-        path = os.path.join(UPLOAD_DIR, video.filename)
-        with open(path, "wb") as f:
-            shutil.copyfileobj(video.file, f)
-        video_url = f"/uploads/{video.filename}"
+    image_url = await resolve_media(image, image_url, "image")
+    video_url = await resolve_media(video, video_url, "video")
 
-    return blogs_crud.create_blog(db, title, content, image_url, video_url, current_user.id)
+    blog = await run_in_threadpool(blogs_crud.create_blog, db, title, content, image_url, video_url, current_user.id)
+    cache.invalidate_tags("blogs:list")
+    schedule_derivatives(image_url)
+    return blog_row(blog, current_user.username)
 
 
-@router.patch("/{blog_id}")
-def update_blog(
+@router.patch("/{blog_id}", response_model=BlogOut)
+async def update_blog(
     blog_id: int,
     title: str = Form(None),
     content: str = Form(None),
     image: UploadFile | None = File(None),
     video: UploadFile | None = File(None),
+    image_url: str = Form(None),
+    video_url: str = Form(None),
     current_user = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    blog = blogs_crud.get_blog_by_id(db, blog_id)
+    blog = await run_in_threadpool(blogs_crud.get_blog_by_id, db, blog_id)
     if not blog:
         raise HTTPException(status_code=404, detail="Blog not found")
     if blog.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    image_url = blog.image_url
-    video_url = blog.video_url
-
-    if image:
-        path = os.path.join(UPLOAD_DIR, image.filename)
-        with open(path, "wb") as f:
-            shutil.copyfileobj(image.file, f)
-        image_url = f"/uploads/{image.filename}"
-
-    if video:
-        path = os.path.join(UPLOAD_DIR, video.filename)
-        with open(path, "wb") as f:
-            shutil.copyfileobj(video.file, f)
-        video_url = f"/uploads/{video.filename}"
+    previous_image_url = blog.image_url
+    image_url = await resolve_media(image, image_url, "image", blog.image_url)
+    video_url = await resolve_media(video, video_url, "video", blog.video_url)
 
-    updated_blog = blogs_crud.update_blog(db, blog_id, title or blog.title, content or blog.content, image_url, video_url)
-    return updated_blog
+    updated_blog = await run_in_threadpool(blogs_crud.update_blog, db, blog_id, title or blog.title, content or blog.content, image_url, video_url)
+    cache.invalidate_tags(f"blog:{blog_id}", "blogs:sort:title", "blogs:search")
+    if image_url != previous_image_url:
+        schedule_derivatives(image_url)
+    return blog_row(updated_blog, current_user.username)
 
 
 @router.delete("/{blog_id}")
@@ -138,6 +298,7 @@ def delete_blog(blog_id: int, current_user = Depends(get_current_user), db: Sess
     if blog.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
     blogs_crud.delete_blog(db, blog)
+    cache.invalidate_tags(f"blog:{blog_id}", f"comments:{blog_id}", "blogs:list")
     return {"message": "Blog deleted successfully"}
 
 
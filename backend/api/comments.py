@@ -1,26 +1,117 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session, joinedload
-from database import get_db
+from database import get_db, get_read_db
 from core.security import get_current_user
-from crud import comments_crud
+from core.conditional import comments_validators, is_not_modified, set_validators
+from crud import comments_crud, blogs_crud
+from cache import cache
+from events import broker
+from models.comments import PATH_SEGMENT
+from schemas.comment_schema import CommentOut, CommentThreadPage, CommentReplyPage
 import models
 
 router = APIRouter(prefix="/comments", tags=["Comments"])
 
+MAX_THREADS_PAGE = 100
+MAX_REPLIES_PAGE = 200
 
-@router.get("/blog/{blog_id}")
-def get_comments(blog_id: int, db: Session = Depends(get_db)):
-    comments = db.query(models.Comment).options(joinedload(models.Comment.user)).filter(models.Comment.blog_id == blog_id).all()
-    result = []
-    for c in comments:
-        c_dict = c.__dict__.copy()
-        c_dict["username"] = c.user.username if c.user else None
-        c_dict["parent_comment_id"] = c.parent_comment_id
-        result.append(c_dict)
+
+@router.get("/blog/{blog_id}", response_model=list[CommentOut])
+def get_comments(blog_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    since = cache.fence()
+    validators = cache.get(f"comments:{blog_id}:validators")
+    if validators is None:
+        stamp = blogs_crud.get_blog_stamp(db, blog_id)
+        if stamp:
+            validators = comments_validators(stamp)
+            cache.set(f"comments:{blog_id}:validators", validators, tags=[f"comments:{blog_id}"], since=since)
+    if validators:
+        if is_not_modified(request, validators):
+            return set_validators(Response(status_code=304), validators)
+        set_validators(response, validators)
+
+    cached = cache.get(f"comments:{blog_id}")
+    if cached is not None:
+        return cached
+    result = comment_rows(comments_crud.get_comments(db, blog_id))
+    cache.set(f"comments:{blog_id}", result, tags=[f"comments:{blog_id}"], since=since)
+    return result
+
+
+def comment_row(comment, username):
+    return {
+        "id": comment.id,
+        "content": comment.content,
+        "blog_id": comment.blog_id,
+        "user_id": comment.user_id,
+        "username": username,
+        "parent_comment_id": comment.parent_comment_id,
+    }
+
+
+def comment_rows(comments):
+    return [comment_row(comment, username) for comment, username in comments]
+
+
+@router.get("/blog/{blog_id}/threads", response_model=CommentThreadPage)
+def get_threads(blog_id: int, request: Request, response: Response, limit: int = 20, replies: int = 3, after: int = None, db: Session = Depends(get_read_db)):
+    limit, replies = thread_limits(limit, replies)
+    since = cache.fence()
+    validators = cache.get(f"comments:{blog_id}:validators")
+    if validators is None:
+        stamp = blogs_crud.get_blog_stamp(db, blog_id)
+        if not stamp:
+            raise HTTPException(status_code=404, detail="Blog not found")
+        validators = comments_validators(stamp)
+        cache.set(f"comments:{blog_id}:validators", validators, tags=[f"comments:{blog_id}"], since=since)
+    if is_not_modified(request, validators):
+        return set_validators(Response(status_code=304), validators)
+    set_validators(response, validators)
+
+    key = f"comments:{blog_id}:threads:{limit}:{replies}:{after}"
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    result = thread_page(*comments_crud.get_threads(db, blog_id, limit, replies, after))
+    cache.set(key, result, tags=[f"comments:{blog_id}"], since=since)
     return result
 
 
-@router.post("/blog/{blog_id}")
+@router.get("/{comment_id}/replies", response_model=CommentReplyPage)
+def get_replies(comment_id: int, limit: int = 50, after: int = None, db: Session = Depends(get_read_db)):
+    limit = max(1, min(limit, MAX_REPLIES_PAGE))
+    comment = comments_crud.get_comment(db, comment_id)
+    if not comment:
+        raise HTTPException(status_code=404, detail="Comment not found")
+    rows, next_after = comments_crud.get_replies(db, comment, limit, after)
+    return {"replies": [comment_node(c, username) for c, username in rows], "next_after": next_after}
+
+
+def thread_limits(limit, replies):
+    return max(1, min(limit, MAX_THREADS_PAGE)), max(0, min(replies, MAX_REPLIES_PAGE))
+
+
+def comment_node(comment, username):
+    node = comment_row(comment, username)
+    node["depth"] = comment.depth
+    node["reply_count"] = comment.reply_count
+    return node
+
+
+def thread_page(roots, replies, next_after):
+    threads = {}
+    result = []
+    for root, username in roots:
+        node = comment_node(root, username)
+        node["replies"] = []
+        threads[root.path] = node
+        result.append(node)
+    for reply, username in replies:
+        threads[reply.path[:PATH_SEGMENT]]["replies"].append(comment_node(reply, username))
+    return {"threads": result, "next_after": next_after}
+
+
+@router.post("/blog/{blog_id}", response_model=CommentOut)
 def add_comment(blog_id: int, comment: dict, current_user = Depends(get_current_user), db: Session = Depends(get_db)):
     parent_id = comment.get("parent_id")
     if parent_id:
@@ -28,8 +119,13 @@ def add_comment(blog_id: int, comment: dict, current_user = Depends(get_current_
         if not parent:
             raise HTTPException(status_code=404, detail="Parent comment not found")
 
-    new_comment = comments_crud.create_comment(db, comment["content"], blog_id, current_user.id, parent_id)
-    return new_comment
+    try:
+        new_comment = comments_crud.create_comment(db, comment["content"], blog_id, current_user.id, parent_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    cache.invalidate_tags(f"comments:{blog_id}", f"blog:{blog_id}")
+    broker.publish(blog_id)
+    return comment_row(new_comment, current_user.username)
 
 
 @router.delete("/{comment_id}")
@@ -41,5 +137,8 @@ def delete_comment(comment_id: int, current_user = Depends(get_current_user), db
     if comment.user_id != current_user.id and comment.blog.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
 
+    blog_id = comment.blog_id
     comments_crud.delete_comment(db, comment)
+    cache.invalidate_tags(f"comments:{blog_id}", f"blog:{blog_id}")
+    broker.publish(blog_id)
     return {"message": "Comment deleted successfully"}
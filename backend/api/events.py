@@ -0,0 +1,22 @@
+from fastapi import APIRouter, HTTPException, Query
+from events import broker, TooManySubscribers, EventStreamResponse
+from core.config import EVENTS_MAX_BLOGS, EVENTS_HEARTBEAT, EVENTS_SEND_TIMEOUT
+from .blogs import batch_ids
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+
+@router.get("/blogs")
+async def blog_events(ids: list[int] = Query(...)):
+    """Server-Sent Events with the like and comment counts of the given blogs, pushed as they change."""
+    ids = batch_ids(ids, EVENTS_MAX_BLOGS)
+    try:
+        subscription = broker.subscribe(ids)
+    except TooManySubscribers:
+        raise HTTPException(status_code=503, detail="Too many event subscribers, try again shortly", headers={"Retry-After": "5"})
+    try:
+        initial = await broker.snapshot(ids)
+    except Exception:
+        broker.unsubscribe(subscription)
+        raise
+    return EventStreamResponse(broker, subscription, initial, EVENTS_HEARTBEAT, EVENTS_SEND_TIMEOUT)
@@ -1,22 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_db, get_read_db
 from core.security import get_current_user
 from crud import likes_crud
+from cache import cache
 from models import Blog
+from core.config import LIKE_WRITE_BEHIND
+from ingest import like_buffer
+from events import broker
+from schemas.likes_schema import LikeBatch
+from .blogs import batch_ids
 
 router = APIRouter(prefix="/likes", tags=["Likes"])
 
 
+@router.get("/batch", response_model=LikeBatch)
+def get_like_states(blog_ids: list[int] = Query(...), current_user = Depends(get_current_user), db: Session = Depends(get_read_db)):
+    blog_ids = batch_ids(blog_ids)
+    counts = likes_crud.like_counts(db, blog_ids)
+    found = [blog_id for blog_id in blog_ids if blog_id in counts]
+    liked = likes_crud.liked_blog_ids(db, found, current_user.id) if found else set()
+    states = []
+    for blog_id in found:
+        if LIKE_WRITE_BEHIND:
+            is_liked = like_buffer.state(blog_id, current_user.id, lambda: blog_id in liked)
+            likes_count = max(0, counts[blog_id] + like_buffer.delta(blog_id))
+        else:
+            is_liked, likes_count = blog_id in liked, counts[blog_id]
+        states.append({"blog_id": blog_id, "is_liked": is_liked, "likes_count": likes_count})
+    return {"likes": states, "missing": [blog_id for blog_id in blog_ids if blog_id not in counts]}
+
+
 @router.get("/blog/{blog_id}")
-def get_like_status(blog_id: int, current_user = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_like_status(blog_id: int, current_user = Depends(get_current_user), db: Session = Depends(get_read_db)):
     blog = db.query(Blog).filter(Blog.id == blog_id).first()
     if not blog:
         raise HTTPException(status_code=404, detail="Blog not found")
 
+    if LIKE_WRITE_BEHIND:
+        is_liked = like_buffer.state(blog_id, current_user.id, lambda: likes_crud.is_liked(db, blog_id, current_user.id))
+        return {"is_liked": is_liked, "likes_count": max(0, blog.likes_count + like_buffer.delta(blog_id))}
+
     is_liked = likes_crud.is_liked(db, blog_id, current_user.id)
-    likes_count = likes_crud.count_likes(db, blog_id)
-    return {"is_liked": is_liked, "likes_count": likes_count}
+    return {"is_liked": is_liked, "likes_count": blog.likes_count}
 
 @router.post("/blog/{blog_id}")
 def toggle_like(blog_id: int, current_user = Depends(get_current_user), db: Session = Depends(get_db)):
@@ -24,6 +50,13 @@ def toggle_like(blog_id: int, current_user = Depends(get_current_user), db: Sess
     if not blog:
         raise HTTPException(status_code=404, detail="Blog not found")
 
+    if LIKE_WRITE_BEHIND:
+        # Acknowledged once journaled; the flusher writes it and invalidates the blog's cache entries.
+        liked = like_buffer.toggle(blog_id, current_user.id, lambda: likes_crud.is_liked(db, blog_id, current_user.id))
+        broker.publish(blog_id)
+        return {"liked": liked, "likes_count": max(0, blog.likes_count + like_buffer.delta(blog_id))}
+
     liked = likes_crud.toggle_like(db, blog_id, current_user.id)
-    count = likes_crud.count_likes(db, blog_id)
-    return {"liked": liked, "likes_count": count}
+    cache.invalidate_tags(f"blog:{blog_id}", "blogs:sort:likes")
+    broker.publish(blog_id)
+    return {"liked": liked, "likes_count": blog.likes_count}
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+from database import get_db, replicas
+from crud import outbox_crud
+from cache import cache
+from database.instrumentation import metrics
+from core.hashing import hasher
+from ingest import like_buffer
+from outbox import dispatcher as outbox_dispatcher
+from events import broker
+from trending import ranker as trending_ranker
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get("", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/cache")
+def cache_metrics():
+    return cache.stats()
+
+
+@router.get("/hashing")
+def hashing_metrics():
+    return hasher.stats()
+
+
+@router.get("/likes")
+def like_buffer_metrics():
+    return like_buffer.stats()
+
+
+@router.get("/outbox")
+def outbox_metrics(db: Session = Depends(get_db)):
+    return {"queue": outbox_crud.count_by_status(db), "dispatcher": outbox_dispatcher.stats()}
+
+
+@router.get("/events")
+def event_metrics():
+    return broker.stats()
+
+
+@router.get("/trending")
+def trending_metrics():
+    return trending_ranker.stats()
+
+
+@router.get("/replicas")
+def replica_metrics():
+    return replicas.stats()
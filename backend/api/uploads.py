@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel
+from core.security import get_current_user
+from media import uploads
+
+router = APIRouter(prefix="/uploads", tags=["Uploads"])
+
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    size: int
+    kind: str
+
+
+@router.post("/")
+def create_upload(body: UploadSessionCreate, current_user = Depends(get_current_user)):
+    try:
+        return uploads.create_session(current_user.id, body.filename, body.size, body.kind)
+    except uploads.UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+@router.get("/{upload_id}")
+def get_upload(upload_id: str, current_user = Depends(get_current_user)):
+    try:
+        return uploads.get_session(upload_id, current_user.id)
+    except uploads.UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+@router.put("/{upload_id}")
+async def upload_chunk(upload_id: str, offset: int, request: Request, current_user = Depends(get_current_user)):
+    try:
+        return await uploads.append_chunk(upload_id, current_user.id, offset, request.stream())
+    except uploads.UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+@router.post("/{upload_id}/complete")
+async def complete_upload(upload_id: str, current_user = Depends(get_current_user)):
+    try:
+        return await uploads.complete_session(upload_id, current_user.id)
+    except uploads.UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
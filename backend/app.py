@@ -1,27 +1,152 @@
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
-from database import Base, engine
+from database import SessionLocal, replicas
+from core.config import DB_MODE, UPLOAD_DIR, LIKE_WRITE_BEHIND, WEB_CONCURRENCY, OUTBOX_DISPATCHER, DATABASE_REPLICA_URLS, TRENDING_REFRESH, SEARCH_BACKEND
+from core.hashing import hasher, HashingBusy
+from search import rebuild_index
+from media.derivatives import pool as derivatives_pool
+from media.uploads import sweeper as upload_sweeper
+from ingest import like_buffer
+from outbox import dispatcher as outbox_dispatcher
+from events import broker as event_broker
+from trending import ranker as trending_ranker
+from media.serving import MediaFiles
+from middleware import QueryProfilingMiddleware, CompressionMiddleware, ReadYourWritesMiddleware, BodySizeLimitMiddleware
 from api.auth import router as user_router
 from api.blogs import router as blog_router
 from api.comments import router as comment_router
 from api.likes import router as likes_router
+from api.metrics import router as metrics_router
+from api.uploads import router as uploads_router
+from api.events import router as events_router
 
-app = FastAPI(title="Blog API")
-Base.metadata.create_all(bind=engine)
+app = FastAPI(title="Blog API", default_response_class=ORJSONResponse)
 
+# Added first so it runs inside CORSMiddleware and its 413s carry CORS headers.
+app.add_middleware(BodySizeLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://127.0.0.1:5173"],
     allow_credentials=True,
     allow_methods=["*"],
-    allow_headers=["content-type", "authorization", "accept", "origin", "x-requested-with"],
+    allow_headers=["content-type", "authorization", "accept", "origin", "x-requested-with", "x-read-primary-until"],
+    expose_headers=["server-timing", "x-read-primary-until"],
 )
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(QueryProfilingMiddleware)
+if DATABASE_REPLICA_URLS:
+    app.add_middleware(ReadYourWritesMiddleware)
 
-app.mount("/uploads", StaticFiles(directory="public/uploads"), name="uploads")
+
+@app.exception_handler(HashingBusy)
+def password_service_busy(request: Request, exc: HashingBusy):
+    return JSONResponse(status_code=503, content={"detail": "Too many password requests, try again shortly"}, headers={"Retry-After": "1"})
+
+
+@app.on_event("startup")
+def build_search_index():
+    if SEARCH_BACKEND == "inverted" and WEB_CONCURRENCY > 1:
+        raise RuntimeError("SEARCH_BACKEND=inverted needs a single worker; use the fulltext backend or WEB_CONCURRENCY=1")
+    db = SessionLocal()
+    try:
+        rebuild_index(db)
+    finally:
+        db.close()
+
+
+@app.on_event("startup")
+def start_replica_checks():
+    replicas.start()
+
+
+@app.on_event("shutdown")
+def stop_replica_checks():
+    replicas.stop()
+
+
+@app.on_event("startup")
+def start_like_buffer():
+    if LIKE_WRITE_BEHIND:
+        if WEB_CONCURRENCY > 1:
+            raise RuntimeError("LIKE_WRITE_BEHIND needs a single worker; unset it or run with WEB_CONCURRENCY=1")
+        like_buffer.start()
+
+
+@app.on_event("shutdown")
+def stop_like_buffer():
+    if LIKE_WRITE_BEHIND:
+        like_buffer.stop()
+
+
+@app.on_event("startup")
+def start_outbox_dispatcher():
+    if OUTBOX_DISPATCHER:
+        outbox_dispatcher.start()
+
+
+@app.on_event("shutdown")
+def stop_outbox_dispatcher():
+    if OUTBOX_DISPATCHER:
+        outbox_dispatcher.stop()
+
+
+@app.on_event("startup")
+def start_trending_ranker():
+    if TRENDING_REFRESH:
+        trending_ranker.start()
+
+
+@app.on_event("shutdown")
+def stop_trending_ranker():
+    if TRENDING_REFRESH:
+        trending_ranker.stop()
+
+
+@app.on_event("startup")
+async def start_event_broker():
+    event_broker.start()
+
+
+@app.on_event("shutdown")
+async def stop_event_broker():
+    await event_broker.stop()
+
+
+@app.on_event("startup")
+def start_upload_sweeper():
+    upload_sweeper.start()
+
+
+@app.on_event("shutdown")
+def stop_upload_sweeper():
+    upload_sweeper.stop()
+
+
+@app.on_event("shutdown")
+def stop_derivatives_pool():
+    derivatives_pool.shutdown()
+
+
+@app.on_event("shutdown")
+def stop_password_hasher():
+    hasher.shutdown()
+
+
+app.mount("/uploads", MediaFiles(UPLOAD_DIR), name="uploads")
+
+if DB_MODE == "async":
+    from api.async_blogs import router as async_blog_router
+    from api.async_comments import router as async_comment_router
+
+    app.include_router(async_blog_router, prefix="/api")
+    app.include_router(async_comment_router, prefix="/api")
 
 app.include_router(user_router, prefix="/api")
 app.include_router(blog_router, prefix="/api")
 app.include_router(comment_router, prefix="/api")
 app.include_router(likes_router, prefix="/api")
+app.include_router(uploads_router, prefix="/api")
+app.include_router(events_router, prefix="/api")
+app.include_router(metrics_router, prefix="/api")
@@ -0,0 +1,331 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+import httpx
+from benchmarks.db_load_benchmark import percentile
+from benchmarks.seed import BENCH_PASSWORD, WORDS
+
+
+async def list_blogs(client, ctx, rng):
+    return await client.get("/api/blogs/", params={"page": rng.randint(1, 5), "limit": 10})
+
+
+async def list_blogs_by_likes(client, ctx, rng):
+    return await client.get("/api/blogs/", params={"sort_by": "likes", "order": "desc", "page": rng.randint(1, 3)})
+
+
+async def list_blogs_by_title(client, ctx, rng):
+    return await client.get("/api/blogs/", params={"sort_by": "title", "order": "asc", "page": rng.randint(1, 3)})
+
+
+async def cursor_pages(client, ctx, rng):
+    response = await client.get("/api/blogs/", params={"cursor": "", "limit": 10})
+    next_cursor = response.json().get("next_cursor") if response.status_code == 200 else None
+    if next_cursor:
+        response = await client.get("/api/blogs/", params={"cursor": next_cursor, "limit": 10})
+    return response
+
+
+async def search_blogs(client, ctx, rng):
+    return await client.get("/api/blogs/", params={"search": rng.choice(WORDS)})
+
+
+async def blog_detail(client, ctx, rng):
+    return await client.get(f"/api/blogs/{rng.randint(1, ctx['max_blog'])}")
+
+
+async def blog_revalidate(client, ctx, rng):
+    blog_id = rng.randint(1, ctx["max_blog"])
+    etag = ctx["etags"].get(blog_id)
+    response = await client.get(f"/api/blogs/{blog_id}", headers={"If-None-Match": etag} if etag else {})
+    if "etag" in response.headers:
+        ctx["etags"][blog_id] = response.headers["etag"]
+    return response
+
+
+async def blogs_by_user(client, ctx, rng):
+    return await client.get(f"/api/blogs/user/{rng.randint(1, ctx['max_user'])}")
+
+
+async def comments_flat(client, ctx, rng):
+    return await client.get(f"/api/comments/blog/{rng.randint(1, ctx['max_blog'])}")
+
+
+async def comment_threads(client, ctx, rng):
+    return await client.get(f"/api/comments/blog/{rng.randint(1, ctx['max_blog'])}/threads")
+
+
+async def comment_replies(client, ctx, rng):
+    return await client.get(f"/api/comments/{rng.randint(1, ctx['max_comment'])}/replies")
+
+
+async def like_status(client, ctx, rng):
+    return await client.get(f"/api/likes/blog/{rng.randint(1, ctx['max_blog'])}", headers=auth(ctx, rng))
+
+
+async def like_toggle(client, ctx, rng):
+    return await client.post(f"/api/likes/blog/{rng.randint(1, ctx['max_blog'])}", headers=auth(ctx, rng))
+
+
+async def add_comment(client, ctx, rng):
+    return await client.post(f"/api/comments/blog/{rng.randint(1, ctx['max_blog'])}", json={"content": " ".join(rng.choices(WORDS, k=12))}, headers=auth(ctx, rng))
+
+
+async def create_blog(client, ctx, rng):
+    data = {"title": " ".join(rng.choices(WORDS, k=5)), "content": " ".join(rng.choices(WORDS, k=80))}
+    return await client.post("/api/blogs/", data=data, headers=auth(ctx, rng))
+
+
+async def me(client, ctx, rng):
+    return await client.get("/api/me", headers=auth(ctx, rng))
+
+
+async def login(client, ctx, rng):
+    return await client.post("/api/login", json={"username": f"bench{rng.randint(1, ctx['max_user'])}", "password": BENCH_PASSWORD})
+
+
+async def upload_session(client, ctx, rng):
+    headers = auth(ctx, rng)
+    response = await client.post("/api/uploads/", json={"filename": "clip.mp4", "size": 1024, "kind": "video"}, headers=headers)
+    if response.status_code == 200:
+        response = await client.get(f"/api/uploads/{response.json()['id']}", headers=headers)
+    return response
+
+
+async def cache_metrics(client, ctx, rng):
+    return await client.get("/api/metrics/cache")
+
+
+MIN_TAIL_SAMPLES = 100
+
+# (name, weight, scenario); weights approximate a read-heavy blog front end.
+SCENARIOS = [
+    ("blogs.list", 20, list_blogs),
+    ("blogs.list_likes", 5, list_blogs_by_likes),
+    ("blogs.list_title", 3, list_blogs_by_title),
+    ("blogs.cursor", 5, cursor_pages),
+    ("blogs.search", 4, search_blogs),
+    ("blogs.detail", 15, blog_detail),
+    ("blogs.revalidate", 5, blog_revalidate),
+    ("blogs.by_user", 3, blogs_by_user),
+    ("blogs.create", 1, create_blog),
+    ("comments.flat", 5, comments_flat),
+    ("comments.threads", 8, comment_threads),
+    ("comments.replies", 3, comment_replies),
+    ("comments.add", 2, add_comment),
+    ("likes.status", 6, like_status),
+    ("likes.toggle", 4, like_toggle),
+    ("auth.me", 3, me),
+    ("auth.login", 1, login),
+    ("uploads.session", 1, upload_session),
+    ("metrics.cache", 1, cache_metrics),
+]
+
+
+def auth(ctx, rng):
+    return {"Authorization": f"Bearer {rng.choice(ctx['tokens'])}"}
+
+
+def dataset_bounds():
+    from sqlalchemy import func
+    from database import SessionLocal
+    from models import Blog, Comment, User
+
+    db = SessionLocal()
+    try:
+        return {
+            "max_blog": db.query(func.max(Blog.id)).scalar() or 1,
+            "max_comment": db.query(func.max(Comment.id)).scalar() or 1,
+            "max_user": db.query(func.max(User.id)).scalar() or 1,
+        }
+    finally:
+        db.close()
+
+
+def parse_prometheus(text: str):
+    """Return {(name, route): value} for the per-route series of GET /api/metrics."""
+    values = {}
+    for line in text.splitlines():
+        if line.startswith("#") or "{" not in line:
+            continue
+        name, rest = line.split("{", 1)
+        labels, value = rest.rsplit("} ", 1)
+        route = labels.split('route="', 1)[1].split('"', 1)[0]
+        method = labels.split('method="', 1)[1].split('"', 1)[0] if 'method="' in labels else ""
+        values[(name, f"{method} {route}".strip())] = float(value)
+    return values
+
+
+async def fetch_metrics(client):
+    response = await client.get("/api/metrics")
+    return parse_prometheus(response.text) if response.status_code == 200 else {}
+
+
+def statements_per_request(before, after):
+    routes = {}
+    for (name, route), requests in after.items():
+        if name != "http_requests_total":
+            continue
+        delta = requests - before.get((name, route), 0)
+        if delta <= 0 or route.endswith("/api/metrics"):
+            continue
+        statements = after.get(("db_statements_total", route), 0) - before.get(("db_statements_total", route), 0)
+        routes[route] = {"requests": int(delta), "statements_per_request": round(statements / delta, 2)}
+    return routes
+
+
+async def run(base_url: str, args, bounds):
+    rng = random.Random(args.seed)
+    names = [name for name, _, _ in SCENARIOS]
+    weights = [weight for _, weight, _ in SCENARIOS]
+    scenarios = {name: scenario for name, _, scenario in SCENARIOS}
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        tokens = []
+        for user_id in rng.sample(range(1, bounds["max_user"] + 1), min(args.users, bounds["max_user"])):
+            response = await client.post("/api/login", json={"username": f"bench{user_id}", "password": BENCH_PASSWORD})
+            response.raise_for_status()
+            tokens.append(response.json()["access_token"])
+        ctx = {**bounds, "tokens": tokens, "etags": {}}
+
+        before = await fetch_metrics(client)
+        deadline = time.perf_counter() + args.duration
+
+        async def worker(seed: int):
+            worker_rng = random.Random(args.seed * 1000 + seed)
+            while time.perf_counter() < deadline:
+                name = worker_rng.choices(names, weights=weights)[0]
+                started = time.perf_counter()
+                try:
+                    response = await scenarios[name](client, ctx, worker_rng)
+                    if response.status_code >= 500 or response.status_code in (401, 403, 422):
+                        errors[name] += 1
+                except httpx.HTTPError:
+                    errors[name] += 1
+                latencies[name].append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        after = await fetch_metrics(client)
+
+    everything = [sample for samples in latencies.values() for sample in samples]
+    return {
+        "config": {"concurrency": args.concurrency, "duration": args.duration, "seed": args.seed, **bounds},
+        "overall": summarize(everything, sum(errors.values()), elapsed),
+        "scenarios": {name: summarize(latencies[name], errors[name], elapsed) for name in names if latencies[name]},
+        "routes": statements_per_request(before, after),
+    }
+
+
+def summarize(samples, errors: int, elapsed: float):
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "rps": round(len(samples) / elapsed, 1),
+        "p50_ms": round(percentile(samples, 50), 2),
+        "p95_ms": round(percentile(samples, 95), 2),
+        "p99_ms": round(percentile(samples, 99), 2),
+    }
+
+
+def compare(result, baseline, threshold: float):
+    """List regressions: throughput down, tail latency up, or more SQL per request than the baseline allows."""
+    regressions = []
+    base, current = baseline["overall"], result["overall"]
+    if current["rps"] < base["rps"] * (1 - threshold):
+        regressions.append(f"overall rps {current['rps']} < baseline {base['rps']}")
+    for name, base in baseline["scenarios"].items():
+        current = result["scenarios"].get(name)
+        if current is None:
+            continue
+        # Tail latency of a rarely picked scenario is too noisy to gate on.
+        fields = ("p50_ms", "p99_ms") if min(current["requests"], base["requests"]) >= MIN_TAIL_SAMPLES else ("p50_ms",)
+        for field in fields:
+            if current[field] > base[field] * (1 + threshold):
+                regressions.append(f"{name} {field} {current[field]} > baseline {base[field]}")
+    for route, base in baseline["routes"].items():
+        current = result["routes"].get(route)
+        if current and current["statements_per_request"] > base["statements_per_request"] * (1 + threshold) + 0.5:
+            regressions.append(f"{route} statements/request {current['statements_per_request']} > baseline {base['statements_per_request']}")
+    return regressions
+
+
+def start_server(port: int, workers: int):
+    env = dict(os.environ)
+    if env.get("DATABASE_URL", "").startswith("sqlite"):
+        # The MySQL FULLTEXT backend cannot run on the SQLite stand-in.
+        env.setdefault("SEARCH_BACKEND", "inverted")
+    cmd = [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    process = subprocess.Popen(cmd, env=env)
+    for _ in range(150):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/api/blogs/?limit=1", timeout=1)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("server did not start")
+
+
+def report(result):
+    overall = result["overall"]
+    print(f"overall            rps={overall['rps']:<8} p50={overall['p50_ms']}ms p95={overall['p95_ms']}ms p99={overall['p99_ms']}ms errors={overall['errors']}")
+    for name, level in result["scenarios"].items():
+        print(f"{name:18} n={level['requests']:<6} p50={level['p50_ms']}ms p95={level['p95_ms']}ms p99={level['p99_ms']}ms errors={level['errors']}")
+    print("SQL statements per request:")
+    for route, stats in sorted(result["routes"].items()):
+        print(f"  {route:45} {stats['statements_per_request']:>6} ({stats['requests']} requests)")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Drive every API router with a mixed workload against a seeded database (see benchmarks.seed). "
+                    "The workload writes likes, comments and blogs, so reseed before runs you want to compare."
+    )
+    parser.add_argument("--base-url", help="benchmark an already running server instead of starting uvicorn")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--users", type=int, default=50, help="virtual users to log in")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against a previous --output file")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed relative regression against the baseline")
+    args = parser.parse_args()
+
+    bounds = dataset_bounds()
+    server = None if args.base_url else start_server(args.port, args.workers)
+    try:
+        result = asyncio.run(run(args.base_url or f"http://127.0.0.1:{args.port}", args, bounds))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} of the baseline")
+
+
+if __name__ == "__main__":
+    main()
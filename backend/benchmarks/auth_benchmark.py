@@ -0,0 +1,113 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import httpx
+from benchmarks.db_load_benchmark import percentile
+
+PATHS = ["/api/me", "/api/likes/blog/{blog_id}"]
+
+
+def issue_tokens(count: int):
+    from database import SessionLocal
+    from models import User
+    from core.security import create_access_token
+
+    db = SessionLocal()
+    try:
+        users = db.query(User.id, User.username, User.token_version).order_by(User.id).limit(count).all()
+    finally:
+        db.close()
+    if not users:
+        raise RuntimeError("no users in the database; register a few before benchmarking")
+    return [create_access_token(data={"sub": u.username, "user_id": u.id, "ver": u.token_version}) for u in users]
+
+
+async def run_level(base_url: str, tokens, concurrency: int, duration: float, blog_ids: int):
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def worker(seed: int):
+            nonlocal errors
+            i = seed
+            while time.perf_counter() < deadline:
+                path = PATHS[i % len(PATHS)].format(blog_id=1 + i % blog_ids)
+                headers = {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path, headers=headers)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+                i += concurrency
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+def start_server(principal_ttl: int, port: int, workers: int):
+    env = {**os.environ, "PRINCIPAL_CACHE_TTL": str(principal_ttl)}
+    cmd = [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    process = subprocess.Popen(cmd, env=env)
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/api/blogs/?limit=1", timeout=1)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare authenticated throughput with and without the principal cache")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[50, 200])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--blog-ids", type=int, default=100)
+    parser.add_argument("--principal-ttl", type=int, default=300)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    tokens = issue_tokens(args.users)
+    results = {}
+    # A TTL of 0 disables the principal cache, which is the per-request lookup baseline.
+    for label, ttl in (("uncached", 0), ("cached", args.principal_ttl)):
+        server = start_server(ttl, args.port, args.workers)
+        try:
+            base_url = f"http://127.0.0.1:{args.port}"
+            results[label] = [asyncio.run(run_level(base_url, tokens, level, args.duration, args.blog_ids)) for level in args.concurrency]
+        finally:
+            server.terminate()
+            server.wait()
+
+    for label, levels in results.items():
+        for level in levels:
+            print(f"{label:8} c={level['concurrency']:<4} rps={level['rps']:<8} p50={level['p50_ms']}ms p99={level['p99_ms']}ms errors={level['errors']}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import argparse
+import random
+import statistics
+import time
+from middleware.compression import ENCODERS
+from benchmarks.serialization_benchmark import listing_rows, comment_models, typed_listing, typed_comments
+
+LEVELS = {"gzip": [1, 4, 6, 9], "br": [1, 4, 6, 11], "zstd": [1, 3, 9, 19]}
+
+
+def payloads(args):
+    rng = random.Random(args.seed)
+    rows = listing_rows(args.page_size, args.words, rng)
+    return {
+        "listing": typed_listing(rows, "full"),
+        "listing excerpt": typed_listing(rows, "excerpt"),
+        "comments": typed_comments(comment_models(args.comments, rng)),
+    }
+
+
+def measure(encoding: str, level: int, body: bytes, iterations: int):
+    timings = []
+    for _ in range(iterations):
+        encoder = ENCODERS[encoding](level)
+        started = time.perf_counter()
+        compressed = encoder.compress(body, final=True)
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    cpu_us = statistics.median(timings)
+    saved = len(body) - len(compressed)
+    return {"cpu_us": round(cpu_us, 1), "bytes": len(compressed), "ratio": round(len(body) / len(compressed), 2), "saved_kb_per_cpu_ms": round(saved / cpu_us, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare compression CPU cost against bytes saved for typical API responses")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--words", type=int, default=600)
+    parser.add_argument("--comments", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    missing = sorted(set(LEVELS) - set(ENCODERS))
+    if missing:
+        print(f"Not installed, skipped: {', '.join(missing)}")
+    for name, body in payloads(args).items():
+        print(f"{name}: {len(body)} bytes")
+        for encoding in (encoding for encoding in LEVELS if encoding in ENCODERS):
+            for level in LEVELS[encoding]:
+                result = measure(encoding, level, body, args.iterations)
+                print(f"  {encoding:4} level={level:<3} {result['cpu_us']:>9.1f}us {result['bytes']:>8} bytes ratio={result['ratio']:<6} saved={result['saved_kb_per_cpu_ms']}KB/cpu-ms")
+
+
+if __name__ == "__main__":
+    main()
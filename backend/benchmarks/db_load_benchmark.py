@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import httpx
+
+PATHS = ["/api/blogs/?page={page}&include_total=false", "/api/blogs/{blog_id}", "/api/comments/blog/{blog_id}"]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+
+async def run_level(base_url: str, concurrency: int, duration: float, blog_ids: int, pages: int):
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def worker(seed: int):
+            nonlocal errors
+            i = seed
+            while time.perf_counter() < deadline:
+                path = PATHS[i % len(PATHS)].format(page=1 + i % pages, blog_id=1 + i % blog_ids)
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path, headers={"Cache-Control": "no-cache"})
+                    if response.status_code >= 500:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+                i += concurrency
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+def start_server(mode: str, port: int, workers: int):
+    # A zero-entry response cache evicts every entry as it is stored, so each
+    # listing, detail and comments request goes to the database.
+    env = {**os.environ, "DB_MODE": mode, "CACHE_BACKEND": "memory", "CACHE_MAX_ENTRIES": "0"}
+    cmd = [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    process = subprocess.Popen(cmd, env=env)
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/api/blogs/?limit=1", timeout=1)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"server in {mode} mode did not start")
+
+
+def listing_pages(base_url: str):
+    """Number of 10-blog listing pages that have rows, so no request hits an empty page."""
+    total = httpx.get(f"{base_url}/api/blogs/?limit=1", timeout=10).json()["total"] or 0
+    return max(1, (total + 9) // 10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sync and async database modes under concurrent load")
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[50, 100, 250, 500])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--blog-ids", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for mode in args.modes:
+        server = start_server(mode, args.port, args.workers)
+        try:
+            base_url = f"http://127.0.0.1:{args.port}"
+            pages = listing_pages(base_url)
+            results[mode] = [asyncio.run(run_level(base_url, level, args.duration, args.blog_ids, pages)) for level in args.concurrency]
+        finally:
+            server.terminate()
+            server.wait()
+
+    for mode, levels in results.items():
+        for level in levels:
+            print(f"{mode:5} c={level['concurrency']:<4} rps={level['rps']:<8} p50={level['p50_ms']}ms p99={level['p99_ms']}ms errors={level['errors']}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
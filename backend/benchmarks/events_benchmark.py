@@ -0,0 +1,132 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+import httpx
+from benchmarks.db_load_benchmark import percentile
+from benchmarks.api_benchmark import start_server
+from benchmarks.auth_benchmark import issue_tokens
+
+
+async def subscriber(port: int, blog_ids, received, ready: asyncio.Event, stop: asyncio.Event):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=1 << 16)
+    query = "&".join(f"ids={blog_id}" for blog_id in blog_ids)
+    writer.write(f"GET /api/events/blogs?{query} HTTP/1.1\r\nHost: bench\r\nAccept: text/event-stream\r\n\r\n".encode())
+    await writer.drain()
+    status = await reader.readline()
+    if b" 200 " not in status:
+        writer.close()
+        raise RuntimeError(status.decode().strip())
+    while (await reader.readline()) not in (b"\r\n", b""):
+        pass
+    ready.set()
+    try:
+        while not stop.is_set():
+            line = await reader.readline()
+            if not line:
+                break
+            if line.startswith(b"data: "):
+                received.append((time.perf_counter(), json.loads(line[6:])["blog_id"]))
+    finally:
+        writer.close()
+
+
+def rss_mb(pid: int):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        return None
+
+
+async def run_level(port: int, pid: int, token: str, subscribers: int, hot_blogs, blogs_per_subscriber: int, rounds: int, settle: float):
+    stop = asyncio.Event()
+    streams = []
+    tasks = []
+    for n in range(subscribers):
+        # Every subscriber watches the hot blogs plus a spread of colder ones, like a feed page.
+        cold = [hot_blogs[-1] + 1 + (n * blogs_per_subscriber + i) % 5000 for i in range(blogs_per_subscriber - len(hot_blogs))]
+        received, ready = [], asyncio.Event()
+        streams.append((received, ready))
+        tasks.append(asyncio.create_task(subscriber(port, hot_blogs + cold, received, ready, stop)))
+    started = time.perf_counter()
+    await asyncio.wait_for(asyncio.gather(*(ready.wait() for _, ready in streams)), timeout=120)
+    connect_seconds = time.perf_counter() - started
+
+    latencies = []
+    probes = []
+    missed = 0
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=30, headers={"Authorization": f"Bearer {token}"}) as client:
+        for round_number in range(rounds):
+            blog_id = hot_blogs[round_number % len(hot_blogs)]
+            published = time.perf_counter()
+            await client.post(f"/api/likes/blog/{blog_id}")
+            probe_started = time.perf_counter()
+            await client.get("/api/blogs/1")
+            probes.append((time.perf_counter() - probe_started) * 1000)
+            await asyncio.sleep(settle)
+            for received, _ in streams:
+                arrival = next((at for at, event_blog in received if event_blog == blog_id and at >= published), None)
+                if arrival is None:
+                    missed += 1
+                else:
+                    latencies.append((arrival - published) * 1000)
+            for received, _ in streams:
+                received.clear()
+        stats = (await client.get("/api/metrics/events")).json()
+    memory = rss_mb(pid)
+
+    stop.set()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return {
+        "subscribers": subscribers,
+        "connect_seconds": round(connect_seconds, 2),
+        "delivered": len(latencies),
+        "missed": missed,
+        "p50_ms": round(percentile(latencies, 50), 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99), 1) if latencies else None,
+        "probe_p50_ms": round(percentile(probes, 50), 1),
+        "server_rss_mb": memory,
+        "broker": stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how many SSE subscribers one worker sustains and how fast count updates reach them")
+    parser.add_argument("--subscribers", nargs="+", type=int, default=[100, 1000, 5000])
+    parser.add_argument("--blogs-per-subscriber", type=int, default=20)
+    parser.add_argument("--hot-blogs", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--settle", type=float, default=2.0, help="seconds to wait for an update to fan out")
+    parser.add_argument("--port", type=int, default=8769)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    os.environ.setdefault("EVENTS_MAX_SUBSCRIBERS", str(max(args.subscribers) + 100))
+    token = issue_tokens(1)[0]
+    hot_blogs = list(range(1, args.hot_blogs + 1))
+    results = []
+    for level in args.subscribers:
+        server = start_server(args.port, 1)
+        try:
+            result = asyncio.run(run_level(args.port, server.pid, token, level, hot_blogs, args.blogs_per_subscriber, args.rounds, args.settle))
+        finally:
+            server.terminate()
+            server.wait()
+        results.append(result)
+        print(
+            f"subscribers={result['subscribers']:<6} connect={result['connect_seconds']}s delivered={result['delivered']} missed={result['missed']} "
+            f"p50={result['p50_ms']}ms p99={result['p99_ms']}ms probe_p50={result['probe_p50_ms']}ms rss={result['server_rss_mb']}MB"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
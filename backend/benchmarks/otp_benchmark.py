@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+import httpx
+from benchmarks.db_load_benchmark import percentile
+from benchmarks.api_benchmark import start_server
+from benchmarks.smtp_sink import SmtpSink
+
+
+def recipients(count: int):
+    from database import SessionLocal
+    from models import User
+
+    db = SessionLocal()
+    try:
+        emails = [row.email for row in db.query(User.email).order_by(User.id).limit(count)]
+    finally:
+        db.close()
+    if not emails:
+        raise RuntimeError("no users in the database; run benchmarks.seed first")
+    return emails
+
+
+async def burst(base_url: str, emails, requests: int, concurrency: int):
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        async def one(i: int):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/api/send-otp", json={"email": emails[i % len(emails)]})
+                latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    errors += 1
+
+        await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure /api/send-otp latency and delivery lag against a slow local SMTP server")
+    parser.add_argument("--smtp-delay", type=float, default=1.0, help="seconds the SMTP stand-in takes per message")
+    parser.add_argument("--fail-every", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--smtp-port", type=int, default=2525)
+    parser.add_argument("--port", type=int, default=8768)
+    parser.add_argument("--timeout", type=float, default=600.0, help="give up waiting for deliveries after this many seconds")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    os.environ.update({
+        "MAIL_SERVER": "127.0.0.1", "MAIL_PORT": str(args.smtp_port), "MAIL_STARTTLS": "false", "MAIL_SSL_TLS": "false",
+        "OUTBOX_BACKOFF": "0.5", "OUTBOX_BACKOFF_MAX": "2",
+    })
+    sink = SmtpSink(port=args.smtp_port, delay=args.smtp_delay, fail_every=args.fail_every).start_in_thread()
+    emails = recipients(args.requests)
+    server = start_server(args.port, 1)
+    try:
+        started = time.perf_counter()
+        latencies, errors = asyncio.run(burst(f"http://127.0.0.1:{args.port}", emails, args.requests, args.concurrency))
+        accepted = args.requests - errors
+        while len(sink.messages) < accepted and time.perf_counter() - started < args.timeout:
+            time.sleep(0.1)
+        delivered_at = sink.messages[-1][0] if sink.messages else started
+        outbox = httpx.get(f"http://127.0.0.1:{args.port}/api/metrics/outbox").json()
+    finally:
+        server.terminate()
+        server.wait()
+
+    result = {
+        "smtp_delay_ms": args.smtp_delay * 1000,
+        "requests": args.requests,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "delivered": len(sink.messages),
+        "delivery_seconds": round(delivered_at - started, 2),
+        "smtp_sessions": sink.sessions,
+        "outbox": outbox,
+    }
+    print(f"send-otp p50={result['p50_ms']}ms p99={result['p99_ms']}ms errors={errors} (SMTP takes {result['smtp_delay_ms']:.0f}ms per message)")
+    print(f"delivered {result['delivered']}/{accepted} in {result['delivery_seconds']}s over {result['smtp_sessions']} SMTP sessions")
+    print(f"outbox: {outbox}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import itertools
+import random
+import statistics
+import time
+from types import SimpleNamespace
+from core.config import SEARCH_MAX_RESULTS
+from search.inverted import InvertedIndexSearch, tokenize
+
+
+def synthetic_corpus(docs: int, words: int, vocabulary: int, seed: int):
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(vocabulary)]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(vocabulary)))
+    for blog_id in range(1, docs + 1):
+        title = " ".join(rng.choices(vocab, cum_weights=cum_weights, k=6))
+        content = " ".join(rng.choices(vocab, cum_weights=cum_weights, k=words))
+        yield SimpleNamespace(id=blog_id, title=title, content=content)
+
+
+def linear_scan(corpus, term: str, limit: int):
+    needle = term.lower()
+    hits = [blog.id for blog in corpus if needle in blog.title.lower() or needle in blog.content.lower()]
+    return hits[:limit]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the in-process search index on a synthetic corpus")
+    parser.add_argument("--docs", type=int, default=1_000_000)
+    parser.add_argument("--words", type=int, default=40)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--scan-docs", type=int, default=100_000, help="corpus size for the linear ILIKE-style baseline")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    index = InvertedIndexSearch()
+    started = time.perf_counter()
+    for blog in synthetic_corpus(args.docs, args.words, args.vocabulary, args.seed):
+        index.index_blog(blog)
+    build_seconds = time.perf_counter() - started
+
+    # Head queries pair two of the 100 most frequent words, whose posting lists
+    # cover most of the corpus; mixed queries draw both words from the whole
+    # vocabulary. Each set runs at the page size and at SEARCH_MAX_RESULTS,
+    # the depth the listing endpoints ask for.
+    rng = random.Random(args.seed + 1)
+    query_sets = {
+        "head": [f"w{rng.randrange(100)} w{rng.randrange(100)}" for _ in range(args.queries)],
+        "mixed": [f"w{rng.randrange(args.vocabulary)} w{rng.randrange(args.vocabulary)}" for _ in range(args.queries)],
+    }
+    results = {}
+    for name, queries in query_sets.items():
+        for limit in (args.limit, SEARCH_MAX_RESULTS):
+            timings = []
+            for query in queries:
+                started = time.perf_counter()
+                index.search(None, query, limit)
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name, limit] = timings
+
+    corpus = list(synthetic_corpus(args.scan_docs, args.words, args.vocabulary, args.seed))
+    scan_timings = []
+    for query in query_sets["mixed"][:20]:
+        started = time.perf_counter()
+        linear_scan(corpus, tokenize(query)[0], args.limit)
+        scan_timings.append((time.perf_counter() - started) * 1000)
+
+    print(f"indexed {args.docs} docs in {build_seconds:.1f}s")
+    for (name, limit), timings in results.items():
+        print(f"{name} queries, limit {limit}, ms: p50={statistics.median(timings):.3f} p99={percentile(timings, 99):.3f} max={max(timings):.3f}")
+    print(f"linear scan over {args.scan_docs} docs ms: p50={statistics.median(scan_timings):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import argparse
+import datetime
+import itertools
+import os
+import random
+import time
+
+BENCH_PASSWORD = "Bench1!pass"
+WORDS = (
+    "python fastapi database index cache query latency throughput design travel food music "
+    "garden science history review tutorial guide notes release performance async thread"
+).split()
+
+
+def sentence(rng: random.Random, words: int):
+    return " ".join(rng.choices(WORDS, k=words))
+
+
+def users(count: int, password_hash: str):
+    for user_id in range(1, count + 1):
+        yield {"id": user_id, "username": f"bench{user_id}", "email": f"bench{user_id}@example.com", "password": password_hash}
+
+
+def blogs(count: int, user_count: int, rng: random.Random, start: datetime.datetime):
+    for blog_id in range(1, count + 1):
+        created = start + datetime.timedelta(seconds=blog_id * 37)
+        yield {
+            "id": blog_id,
+            "title": sentence(rng, 6).capitalize(),
+            "content": sentence(rng, 120),
+            "user_id": rng.randint(1, user_count),
+            "created_at": created,
+            "updated_at": created,
+        }
+
+
+def comments(blog_count: int, user_count: int, per_blog: int, max_depth: int, rng: random.Random):
+    """Nested comments per blog; each blog's thread is built in memory so reply counts are exact."""
+    from models.comments import path_segment
+
+    comment_id = itertools.count(1)
+    for blog_id in range(1, blog_count + 1):
+        thread = []
+        for _ in range(rng.randint(0, per_blog * 2)):
+            parent = rng.choice(thread) if thread and rng.random() < 0.6 else None
+            if parent is not None and len(parent["path"]) // 9 >= max_depth:
+                parent = None
+            row_id = next(comment_id)
+            row = {
+                "id": row_id,
+                "content": sentence(rng, 20),
+                "blog_id": blog_id,
+                "user_id": rng.randint(1, user_count),
+                "parent_comment_id": parent["id"] if parent else None,
+                "path": (parent["path"] if parent else "") + path_segment(row_id),
+                "reply_count": 0,
+            }
+            if parent is not None:
+                parent["reply_count"] += 1
+            thread.append(row)
+        yield from thread
+
+
+def likes(blog_count: int, user_count: int, per_blog: int, rng: random.Random):
+    like_id = itertools.count(1)
+    for blog_id in range(1, blog_count + 1):
+        # Skewed so a few blogs are hot, like a real front page.
+        count = min(user_count, int(per_blog * rng.paretovariate(1.5) / 3))
+        for user_id in rng.sample(range(1, user_count + 1), count):
+            yield {"id": next(like_id), "blog_id": blog_id, "user_id": user_id}
+
+
+def seed(args):
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import insert
+    from database import SessionLocal
+    from models import User
+    from core.hashing import hash_password
+    import bulk
+
+    command.upgrade(Config("alembic.ini"), "head")
+    rng = random.Random(args.seed)
+    db = SessionLocal()
+    try:
+        if db.query(User.id).first() is not None:
+            raise SystemExit("Database already has users; seed into an empty database")
+        start = datetime.datetime(2024, 1, 1)
+        password_hash = hash_password(BENCH_PASSWORD)
+        tables = [
+            ("users", users(args.users, password_hash)),
+            ("blogs", blogs(args.blogs, args.users, rng, start)),
+            ("comments", comments(args.blogs, args.users, args.comments_per_blog, args.max_depth, rng)),
+            ("likes", likes(args.blogs, args.users, args.likes_per_blog, rng)),
+        ]
+        for entity, rows in tables:
+            started = time.perf_counter()
+            if entity == "users":
+                db.execute(insert(User.__table__), list(rows))
+                db.commit()
+                count = args.users
+            else:
+                count = bulk.import_entity(db, entity, rows, args.batch_size, commit_every=10)
+            print(f"Seeded {count} {entity} in {time.perf_counter() - started:.1f}s")
+        bulk.finalize_import(db, "likes", args.batch_size)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a synthetic dataset for the API benchmarks")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///bench.db"))
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--blogs", type=int, default=10_000)
+    parser.add_argument("--comments-per-blog", type=int, default=8)
+    parser.add_argument("--max-depth", type=int, default=4)
+    parser.add_argument("--likes-per-blog", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    # Settings are read at import time, so the target database must be set before anything imports database.
+    os.environ["DATABASE_URL"] = args.database_url
+    seed(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import argparse
+import datetime
+import random
+import statistics
+import time
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy.orm.attributes import set_committed_value
+from models import Blog, Comment, User
+from schemas.blogs_schema import BlogPage, BlogCursorPage
+from schemas.comment_schema import CommentOut
+from api.blogs import page_response
+from api.comments import comment_rows
+from benchmarks.seed import sentence
+
+PAGE = TypeAdapter(BlogPage | BlogCursorPage)
+COMMENTS = TypeAdapter(list[CommentOut])
+
+
+def listing_rows(count: int, words: int, rng: random.Random):
+    """(Blog, author_username) rows shaped like the listing query's, as ORM instances with instance state."""
+    start = datetime.datetime(2024, 1, 1)
+    rows = []
+    for blog_id in range(1, count + 1):
+        created = start + datetime.timedelta(minutes=blog_id)
+        blog = Blog(
+            id=blog_id, title=sentence(rng, 6), content=sentence(rng, words), user_id=blog_id % 50 + 1,
+            likes_count=rng.randint(0, 500), comments_count=rng.randint(0, 50), version=1, comments_version=0,
+            created_at=created, updated_at=created,
+        )
+        rows.append((blog, f"bench{blog.user_id}"))
+    return rows
+
+
+def comment_models(count: int, rng: random.Random):
+    comments = []
+    for comment_id in range(1, count + 1):
+        user = User(id=comment_id % 50 + 1, username=f"bench{comment_id % 50 + 1}", email="bench@example.com", password="$2b$12$" + "x" * 53)
+        comment = Comment(id=comment_id, content=sentence(rng, 20), blog_id=1, user_id=user.id, parent_comment_id=None, path=f"{comment_id:08x}/", reply_count=0)
+        # As joinedload leaves it: the author is loaded, user.comments is not.
+        set_committed_value(comment, "user", user)
+        comments.append(comment)
+    return comments
+
+
+def legacy_listing(rows):
+    """The previous path: ``__dict__`` copies through jsonable_encoder, encoded again by FastAPI and rendered by JSONResponse."""
+    blogs = []
+    for blog, author_username in rows:
+        blog_dict = blog.__dict__.copy()
+        blog_dict["author_username"] = author_username
+        blog_dict["image_variants"] = None
+        blogs.append(blog_dict)
+    payload = jsonable_encoder({"blogs": blogs, "total": len(rows), "page": 1, "limit": len(rows), "total_pages": 1})
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def typed_listing(rows, view):
+    """The response-model path: explicit rows, validated and dumped by pydantic-core, rendered by orjson."""
+    payload = PAGE.validate_python(page_response(rows, len(rows), 1, len(rows), view))
+    return ORJSONResponse(PAGE.dump_python(payload, mode="json", exclude_unset=True)).body
+
+
+def legacy_comments(comments):
+    result = []
+    for c in comments:
+        c_dict = c.__dict__.copy()
+        c_dict["username"] = c.user.username if c.user else None
+        result.append(c_dict)
+    return JSONResponse(jsonable_encoder(jsonable_encoder(result))).body
+
+
+def typed_comments(comments):
+    payload = COMMENTS.validate_python(comment_rows((c, c.user.username) for c in comments))
+    return ORJSONResponse(COMMENTS.dump_python(payload, mode="json")).body
+
+
+def measure(fn, iterations: int):
+    body = fn()
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    return {"median_us": round(statistics.median(timings), 1), "bytes": len(body)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-response serialization cost of the legacy and typed response paths")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--words", type=int, default=600, help="words of content per blog")
+    parser.add_argument("--comments", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = listing_rows(args.page_size, args.words, rng)
+    comments = comment_models(args.comments, rng)
+    cases = [
+        ("listing legacy", lambda: legacy_listing(rows)),
+        ("listing typed", lambda: typed_listing(rows, "full")),
+        ("listing typed excerpt", lambda: typed_listing(rows, "excerpt")),
+        ("comments legacy", lambda: legacy_comments(comments)),
+        ("comments typed", lambda: typed_comments(comments)),
+    ]
+    for name, fn in cases:
+        result = measure(fn, args.iterations)
+        print(f"{name:22} {result['median_us']:>10.1f}us {result['bytes']:>9} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""A local SMTP stand-in that accepts everything, optionally slowly.
+
+Enough of the protocol for smtplib: EHLO/HELO, AUTH PLAIN/LOGIN (any
+credentials), MAIL, RCPT, DATA, RSET, NOOP and QUIT. ``delay`` is added before
+each DATA reply to imitate a slow server; ``fail_every`` answers every n-th
+message with a 451 so retries can be exercised.
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+
+class SmtpSink:
+    def __init__(self, host: str = "127.0.0.1", port: int = 2525, delay: float = 0.0, fail_every: int = 0):
+        self.host = host
+        self.port = port
+        self.delay = delay
+        self.fail_every = fail_every
+        self.messages = []
+        self.sessions = 0
+        self._attempts = 0
+        self._server = None
+
+    async def _session(self, reader, writer):
+        self.sessions += 1
+
+        async def reply(line: str):
+            writer.write(line.encode("ascii") + b"\r\n")
+            await writer.drain()
+
+        await reply("220 sink ESMTP")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode("utf-8", "replace").strip()
+                verb = command.split(" ", 1)[0].upper()
+                if verb == "EHLO":
+                    await reply("250-sink")
+                    await reply("250 AUTH PLAIN LOGIN")
+                elif verb == "AUTH":
+                    if command.upper().startswith("AUTH LOGIN"):
+                        for _ in range(2 - len(command.split()[2:])):
+                            await reply("334 ")
+                            await reader.readline()
+                    await reply("235 Authenticated")
+                elif verb == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    data = bytearray()
+                    while True:
+                        chunk = await reader.readline()
+                        if not chunk or chunk == b".\r\n":
+                            break
+                        data += chunk
+                    await asyncio.sleep(self.delay)
+                    self._attempts += 1
+                    if self.fail_every and self._attempts % self.fail_every == 0:
+                        await reply("451 Try again later")
+                    else:
+                        self.messages.append((time.perf_counter(), bytes(data)))
+                        await reply("250 Queued")
+                elif verb == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:
+                    await reply("250 OK")
+        finally:
+            writer.close()
+
+    async def serve(self):
+        self._server = await asyncio.start_server(self._session, self.host, self.port)
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start_in_thread(self):
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_until_complete, args=(self.serve(),), daemon=True)
+        thread.start()
+        for _ in range(50):
+            if self._server is not None:
+                return self
+            time.sleep(0.05)
+        raise RuntimeError("SMTP sink did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local SMTP server that accepts and discards mail")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2525)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to wait before acknowledging each message")
+    parser.add_argument("--fail-every", type=int, default=0, help="answer every n-th message with a temporary failure")
+    args = parser.parse_args()
+    sink = SmtpSink(args.host, args.port, args.delay, args.fail_every)
+    try:
+        asyncio.run(sink.serve())
+    except KeyboardInterrupt:
+        print(f"{len(sink.messages)} messages over {sink.sessions} sessions")
+
+
+if __name__ == "__main__":
+    main()
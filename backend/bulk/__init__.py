@@ -0,0 +1,2 @@
+from .formats import detect_format, read_rows
+from .transfer import ENTITIES, export_entity, import_entity, finalize_import
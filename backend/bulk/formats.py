@@ -0,0 +1,37 @@
+import csv
+import json
+
+FORMATS = {".ndjson": "ndjson", ".jsonl": "ndjson", ".json": "ndjson", ".csv": "csv"}
+
+
+def detect_format(path: str, fmt: str | None = None):
+    if fmt:
+        return fmt
+    if path == "-":
+        return "ndjson"
+    for suffix, detected in FORMATS.items():
+        if path.endswith(suffix):
+            return detected
+    raise ValueError(f"Cannot tell the format of {path}; pass --format ndjson or --format csv")
+
+
+def read_rows(stream, fmt: str):
+    if fmt == "csv":
+        for row in csv.DictReader(stream):
+            yield {key: (value if value != "" else None) for key, value in row.items()}
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def write_rows(stream, fmt: str, columns, rows):
+    if fmt == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(["" if value is None else value.isoformat() if hasattr(value, "isoformat") else value for value in row])
+        return
+    for row in rows:
+        stream.write(json.dumps(dict(zip(columns, row)), default=lambda value: value.isoformat(), ensure_ascii=False))
+        stream.write("\n")
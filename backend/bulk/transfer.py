@@ -0,0 +1,117 @@
+from datetime import datetime
+from sqlalchemy import insert, select, text, DateTime, Integer
+from sqlalchemy.orm import Session
+from models import Blog, Comment, Like, User
+from crud import blogs_crud, comments_crud
+from .formats import write_rows
+
+ENTITIES = {
+    "blogs": Blog,
+    "comments": Comment,
+    "likes": Like,
+}
+
+
+def export_entity(db: Session, entity: str, stream, fmt: str, batch_size: int):
+    """Stream a whole table in primary key order through a server-side cursor."""
+    table = ENTITIES[entity].__table__
+    columns = [column.name for column in table.columns]
+    result = db.execute(select(table).order_by(table.c.id).execution_options(yield_per=batch_size))
+    exported = 0
+
+    def rows():
+        nonlocal exported
+        for row in result:
+            exported += 1
+            yield tuple(row)
+
+    write_rows(stream, fmt, columns, rows())
+    return exported
+
+
+def converters(table):
+    def to_int(value):
+        return int(value) if value is not None else None
+
+    def to_datetime(value):
+        return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+    result = {}
+    for column in table.columns:
+        if isinstance(column.type, Integer):
+            result[column.name] = to_int
+        elif isinstance(column.type, DateTime):
+            result[column.name] = to_datetime
+        else:
+            result[column.name] = lambda value: value
+    return result
+
+
+def import_entity(db: Session, entity: str, rows, batch_size: int, commit_every: int, disable_checks: bool = False):
+    """Insert rows with multi-row executemany batches, committing every ``commit_every`` batches.
+
+    Rows keep their ids when they carry one, so comment parent links survive as
+    long as parents come before replies (exports are in id order). A ``username``
+    field is accepted in place of ``user_id``.
+    """
+    bind = db.get_bind()
+    if not (disable_checks and bind.dialect.name == "mysql"):
+        return _insert_rows(db, entity, rows, batch_size, commit_every)
+    # SET only lasts for its connection, and a Session may check out a different
+    # pooled connection after every commit, so the whole import runs on one
+    # connection and the checks are turned back on there before it is returned.
+    # If that fails the connection is invalidated rather than pooled.
+    with bind.connect() as connection:
+        connection.execute(text("SET unique_checks = 0, foreign_key_checks = 0"))
+        connection.commit()
+        try:
+            with Session(bind=connection, autoflush=False) as pinned:
+                return _insert_rows(pinned, entity, rows, batch_size, commit_every)
+        finally:
+            try:
+                connection.rollback()
+                connection.execute(text("SET unique_checks = 1, foreign_key_checks = 1"))
+                connection.commit()
+            except Exception:
+                connection.invalidate()
+
+
+def _insert_rows(db: Session, entity: str, rows, batch_size: int, commit_every: int):
+    table = ENTITIES[entity].__table__
+    convert = converters(table)
+    usernames = None
+    batch, keys, batches, imported = [], None, 0, 0
+
+    def flush():
+        nonlocal batch, batches, imported
+        if not batch:
+            return
+        db.execute(insert(table), batch)
+        imported += len(batch)
+        batches += 1
+        batch = []
+        if batches % commit_every == 0:
+            db.commit()
+
+    for raw in rows:
+        if "user_id" not in raw and raw.get("username") is not None:
+            if usernames is None:
+                usernames = dict(db.execute(select(User.username, User.id)).all())
+            raw["user_id"] = usernames.get(raw["username"])
+        row = {key: convert[key](value) for key, value in raw.items() if key in convert}
+        if keys is not None and row.keys() != keys:
+            flush()
+        keys = row.keys()
+        batch.append(row)
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    db.commit()
+    return imported
+
+
+def finalize_import(db: Session, entity: str, batch_size: int):
+    """Recompute the derived columns the imported rows may not have carried."""
+    if entity == "comments" and db.query(Comment.id).filter(Comment.path == "").first():
+        comments_crud.backfill_paths(db, batch_size)
+    blogs_crud.reconcile_counters(db, batch_size)
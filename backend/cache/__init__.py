@@ -0,0 +1,31 @@
+from core.config import (
+    CACHE_BACKEND, CACHE_URL, CACHE_TTL, CACHE_MAX_ENTRIES, DATABASE_REPLICA_URLS, READ_YOUR_WRITES_WINDOW, WEB_CONCURRENCY,
+)
+from .memory import MemoryCache
+from .shared import SharedCache, LocalSharedClient
+from .replicas import ReplicaLagCache
+
+
+def create_cache():
+    if CACHE_BACKEND == "shared":
+        if CACHE_URL:
+            import redis
+            client = redis.Redis.from_url(CACHE_URL)
+        else:
+            client = LocalSharedClient(CACHE_MAX_ENTRIES)
+        return SharedCache(client, CACHE_TTL)
+    return MemoryCache(CACHE_MAX_ENTRIES, CACHE_TTL)
+
+
+cache = create_cache()
+if DATABASE_REPLICA_URLS:
+    cache = ReplicaLagCache(cache, READ_YOUR_WRITES_WINDOW)
+
+# Principals must be forgotten on every worker when a token is revoked, so with
+# several workers they are kept in Redis even if responses are cached per process.
+principal_cache_shared = bool(CACHE_URL) and (CACHE_BACKEND == "shared" or WEB_CONCURRENCY > 1)
+if principal_cache_shared and CACHE_BACKEND != "shared":
+    import redis
+    principal_cache = SharedCache(redis.Redis.from_url(CACHE_URL), CACHE_TTL)
+else:
+    principal_cache = cache
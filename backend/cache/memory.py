@@ -0,0 +1,108 @@
+from collections import OrderedDict
+import threading
+import time
+
+
+# How many recently invalidated tags MemoryCache remembers for fencing fills.
+INVALIDATION_HISTORY = 10000
+
+
+class MemoryCache:
+    """Per-process LRU cache with per-entry TTL and tag-based invalidation.
+
+    Read-through fills are fenced: take ``fence()`` before reading the source
+    and pass it to ``set`` as ``since``, and the value is dropped if one of its
+    tags was invalidated in between, since it may predate that write.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: int = 60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._tags = {}
+        # Invalidation sequence number, and the number each recent tag was last
+        # invalidated at; fences older than _horizon can no longer be checked.
+        self._seq = 0
+        self._horizon = 0
+        self._invalidated = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0, "expirations": 0, "invalidations": 0, "stale_fills": 0}
+
+    def fence(self):
+        with self._lock:
+            return self._seq
+
+    def _stale(self, tags, since):
+        if since is None or not tags:
+            return False
+        return since < self._horizon or any(self._invalidated.get(tag, 0) > since for tag in tags)
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            value, expires, _ = entry
+            if expires <= time.monotonic():
+                self._drop(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def set(self, key: str, value, ttl: int | None = None, tags=(), since: int | None = None):
+        with self._lock:
+            if self._stale(tags, since):
+                self._stats["stale_fills"] += 1
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, time.monotonic() + (ttl or self.ttl), tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            self._stats["sets"] += 1
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._stats["evictions"] += 1
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._drop(key)
+                    self._stats["invalidations"] += 1
+
+    def invalidate_tags(self, *tags: str):
+        with self._lock:
+            self._seq += 1
+            for tag in tags:
+                self._invalidated[tag] = self._seq
+                self._invalidated.move_to_end(tag)
+            while len(self._invalidated) > INVALIDATION_HISTORY:
+                _, self._horizon = self._invalidated.popitem(last=False)
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._drop(key)
+                    self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"backend": "memory", "size": len(self._entries), "max_entries": self.max_entries, **self._stats}
+
+    def _drop(self, key: str):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
@@ -0,0 +1,70 @@
+import threading
+import time
+from database.replicas import read_your_writes
+
+
+class ReplicaLagCache:
+    """Keeps a response cache honest when reads are served from lagging replicas.
+
+    A read that misses right after a write may be answered by a replica that
+    has not applied the write yet and cache that stale answer. So every tag
+    invalidation is repeated once ``delay`` seconds later, by when the replicas
+    are expected to have caught up, and requests in their client's
+    read-your-writes window skip cached entries entirely.
+    """
+
+    def __init__(self, cache, delay: float):
+        self.cache = cache
+        self.delay = delay
+        self._due = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stats = {"bypassed": 0, "reinvalidations": 0}
+
+    def get(self, key: str):
+        if read_your_writes.get():
+            self._stats["bypassed"] += 1
+            return None
+        return self.cache.get(key)
+
+    def fence(self):
+        return self.cache.fence()
+
+    def set(self, key: str, value, ttl: int | None = None, tags=(), since: int | None = None):
+        self.cache.set(key, value, ttl, tags, since)
+
+    def delete(self, *keys: str):
+        self.cache.delete(*keys)
+
+    def invalidate_tags(self, *tags: str):
+        self.cache.invalidate_tags(*tags)
+        due = time.monotonic() + self.delay
+        with self._lock:
+            for tag in tags:
+                self._due[tag] = due
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="cache-reinvalidate", daemon=True)
+                self._thread.start()
+
+    def clear(self):
+        with self._lock:
+            self._due.clear()
+        self.cache.clear()
+
+    def _run(self):
+        # Tags invalidated again before their repeat is due are coalesced into one entry.
+        while True:
+            time.sleep(min(self.delay, 0.25))
+            now = time.monotonic()
+            with self._lock:
+                ready = [tag for tag, due in self._due.items() if due <= now]
+                for tag in ready:
+                    del self._due[tag]
+            if ready:
+                self.cache.invalidate_tags(*ready)
+                self._stats["reinvalidations"] += len(ready)
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._due)
+        return {**self.cache.stats(), **self._stats, "pending_reinvalidations": pending}
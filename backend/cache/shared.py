@@ -0,0 +1,160 @@
+from collections import OrderedDict
+import fnmatch
+import json
+import threading
+import time
+
+
+class LocalSharedClient:
+    """In-process stand-in for the subset of the Redis client API used by SharedCache."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+
+    def get(self, name):
+        with self._lock:
+            item = self._data.get(name)
+            if item is None:
+                return None
+            value, expires = item
+            if expires is not None and expires <= time.monotonic():
+                del self._data[name]
+                return None
+            self._data.move_to_end(name)
+            return value
+
+    def set(self, name, value, ex=None):
+        with self._lock:
+            self._data[name] = (value, time.monotonic() + ex if ex else None)
+            self._data.move_to_end(name)
+            self._evict()
+
+    def mget(self, names):
+        return [self.get(name) for name in names]
+
+    def incr(self, name):
+        with self._lock:
+            value = int(self._data.get(name, (0, None))[0]) + 1
+            self._data[name] = (value, None)
+            self._data.move_to_end(name)
+            self._evict()
+            return value
+
+    def delete(self, *names):
+        with self._lock:
+            return sum(self._data.pop(name, None) is not None for name in names)
+
+    def scan_iter(self, match="*"):
+        with self._lock:
+            names = list(self._data)
+        return (name for name in names if fnmatch.fnmatchcase(name, match))
+
+    def sadd(self, name, *values):
+        with self._lock:
+            members = self._data.get(name, (set(), None))[0]
+            members.update(values)
+            self._data[name] = (members, None)
+            self._evict()
+
+    def smembers(self, name):
+        with self._lock:
+            return set(self._data.get(name, (set(), None))[0])
+
+    def expire(self, name, seconds):
+        with self._lock:
+            if name in self._data:
+                self._data[name] = (self._data[name][0], time.monotonic() + seconds)
+
+    def _evict(self):
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+
+class SharedCache:
+    """Cache shared between workers through a Redis-compatible client.
+
+    Entries are stored as JSON with a TTL; each tag is a set of the keys
+    carrying it. LRU eviction is left to the server (maxmemory-policy).
+
+    Fills are fenced as in MemoryCache: every invalidation takes a number from
+    a shared counter and stamps it on its tags for ``ttl`` seconds, and a
+    ``set`` whose tags were stamped after its fence is dropped. The tags are
+    checked again after writing, so an invalidation that lands between the
+    check and the write still removes the value.
+    """
+
+    def __init__(self, client, ttl: int = 60, prefix: str = "blogapi"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "invalidations": 0, "stale_fills": 0}
+
+    def fence(self):
+        return int(self.client.get(f"{self.prefix}:seq") or 0)
+
+    def _stale(self, tags, since):
+        if since is None or not tags:
+            return False
+        stamps = self.client.mget([f"{self.prefix}:inv:{tag}" for tag in tags])
+        return any(stamp is not None and int(stamp) > since for stamp in stamps)
+
+    def get(self, key: str):
+        raw = self.client.get(f"{self.prefix}:{key}")
+        with self._lock:
+            self._stats["hits" if raw is not None else "misses"] += 1
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value, ttl: int | None = None, tags=(), since: int | None = None):
+        ttl = ttl or self.ttl
+        name = f"{self.prefix}:{key}"
+        if self._stale(tags, since):
+            with self._lock:
+                self._stats["stale_fills"] += 1
+            return
+        self.client.set(name, json.dumps(value), ex=ttl)
+        for tag in tags:
+            tag_name = f"{self.prefix}:tag:{tag}"
+            self.client.sadd(tag_name, name)
+            self.client.expire(tag_name, ttl)
+        if self._stale(tags, since):
+            self.client.delete(name)
+            with self._lock:
+                self._stats["stale_fills"] += 1
+            return
+        with self._lock:
+            self._stats["sets"] += 1
+
+    def delete(self, *keys: str):
+        removed = self.client.delete(*(f"{self.prefix}:{key}" for key in keys)) if keys else 0
+        with self._lock:
+            self._stats["invalidations"] += removed
+
+    def invalidate_tags(self, *tags: str):
+        seq = self.client.incr(f"{self.prefix}:seq")
+        for tag in tags:
+            self.client.set(f"{self.prefix}:inv:{tag}", seq, ex=self.ttl)
+        for tag in tags:
+            tag_name = f"{self.prefix}:tag:{tag}"
+            names = [name.decode() if isinstance(name, bytes) else name for name in self.client.smembers(tag_name)]
+            removed = self.client.delete(*names) if names else 0
+            self.client.delete(tag_name)
+            with self._lock:
+                self._stats["invalidations"] += removed
+
+    def clear(self):
+        # The invalidation counter is kept so fences taken before the clear stay comparable.
+        seq = f"{self.prefix}:seq"
+        names = [name for name in self.client.scan_iter(match=f"{self.prefix}:*") if name not in (seq, seq.encode())]
+        for start in range(0, len(names), 500):
+            self.client.delete(*names[start:start + 500])
+
+    def stats(self):
+        with self._lock:
+            stats = {"backend": "shared", **self._stats}
+        stats["evictions"] = getattr(self.client, "evictions", None)
+        return stats
@@ -0,0 +1,44 @@
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response
+
+
+def http_date(value):
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def blog_validators(stamp):
+    etag = f'W/"b{stamp.id}-{stamp.version}-{stamp.likes_count}-{stamp.comments_count}"'
+    return {"etag": etag, "last_modified": http_date(stamp.updated_at)}
+
+
+def comments_validators(stamp):
+    etag = f'W/"c{stamp.id}-{stamp.comments_version}"'
+    return {"etag": etag, "last_modified": http_date(stamp.updated_at)}
+
+
+def is_not_modified(request: Request, validators: dict):
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        etag = validators["etag"].removeprefix("W/")
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and validators["last_modified"]:
+        try:
+            return parsedate_to_datetime(validators["last_modified"]) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def set_validators(response: Response, validators: dict):
+    response.headers["ETag"] = validators["etag"]
+    response.headers["Cache-Control"] = "no-cache"
+    if validators["last_modified"]:
+        response.headers["Last-Modified"] = validators["last_modified"]
+    return response
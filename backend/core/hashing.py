@@ -0,0 +1,95 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+import time
+import bcrypt
+from core.config import BCRYPT_ROUNDS, HASH_WORKERS, HASH_MAX_PENDING
+
+
+class HashingBusy(Exception):
+    pass
+
+
+def hash_password(password: str, rounds: int = BCRYPT_ROUNDS):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def check_password(password: str, hashed: str):
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+def needs_rehash(hashed: str, rounds: int = BCRYPT_ROUNDS):
+    try:
+        return int(hashed.split("$")[2]) != rounds
+    except (IndexError, ValueError):
+        return True
+
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated thread pool so password work cannot occupy request workers.
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism up to
+    ``workers``. At most ``max_pending`` calls may be queued or running; past that
+    HashingBusy is raised immediately instead of letting logins pile up.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._latencies = deque(maxlen=1000)
+        self._stats = {"hashes": 0, "verifications": 0, "rehashes": 0, "rejected": 0}
+
+    def _submit(self, kind: str, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise HashingBusy()
+            self._pending += 1
+            self._stats[kind] += 1
+        return self._executor.submit(self._timed, fn, time.perf_counter(), *args)
+
+    def _timed(self, fn, queued_at: float, *args):
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._latencies.append((time.perf_counter() - queued_at) * 1000)
+
+    async def hash(self, password: str):
+        return await asyncio.wrap_future(self._submit("hashes", hash_password, password))
+
+    async def verify(self, password: str, hashed: str):
+        return await asyncio.wrap_future(self._submit("verifications", check_password, password, hashed))
+
+    async def rehash(self, password: str):
+        return await asyncio.wrap_future(self._submit("rehashes", hash_password, password))
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            pending = self._pending
+            stats = dict(self._stats)
+
+        def percentile(pct):
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * pct / 100))], 2) if latencies else None
+
+        return {
+            **stats,
+            "workers": self.workers,
+            "queue_depth": pending,
+            "max_pending": self.max_pending,
+            "rounds": BCRYPT_ROUNDS,
+            "latency_p50_ms": percentile(50),
+            "latency_p99_ms": percentile(99),
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+hasher = PasswordHasher(HASH_WORKERS, HASH_MAX_PENDING)
@@ -1,11 +1,13 @@
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-import bcrypt
 from fastapi import HTTPException, status, Depends, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from models import User
 from database import get_db
+from cache import principal_cache, principal_cache_shared
+from core.config import PRINCIPAL_CACHE_TTL, PRINCIPAL_LOCAL_MAX_TTL, WEB_CONCURRENCY
+from core.hashing import hash_password, check_password
 
 SECRET_KEY = "your-secret-key"
 ALGORITHM = "HS256"
@@ -13,11 +15,15 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 120
 
 security = HTTPBearer()
 
+# A per-process principal cache cannot hear about revocations on other workers;
+# see WEB_CONCURRENCY in core.config.
+PRINCIPAL_TTL = PRINCIPAL_CACHE_TTL if principal_cache_shared or WEB_CONCURRENCY <= 1 else min(PRINCIPAL_CACHE_TTL, PRINCIPAL_LOCAL_MAX_TTL)
+
 def verify_password(plain_password, hashed_password):
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+    return check_password(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return hash_password(password)
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
@@ -26,16 +32,52 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+class Principal:
+    """The authenticated caller as carried by the token and the principal cache."""
+
+    def __init__(self, id: int, username: str, email: str, token_version: int):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.token_version = token_version
+
+
+def principal_key(user_id: int, token_version: int):
+    return f"principal:{user_id}:{token_version}"
+
+
+def forget_principal(user_id: int):
+    principal_cache.invalidate_tags(f"user:{user_id}")
+
+
+def load_principal(db: Session, user_id: int, token_version: int):
+    key = principal_key(user_id, token_version)
+    since = principal_cache.fence()
+    cached = principal_cache.get(key)
+    if cached is not None:
+        return Principal(**cached)
+    row = db.query(User.id, User.username, User.email, User.token_version).filter(User.id == user_id).first()
+    if row is None:
+        return None
+    principal = {"id": row.id, "username": row.username, "email": row.email, "token_version": row.token_version}
+    if PRINCIPAL_TTL and row.token_version == token_version:
+        principal_cache.set(key, principal, ttl=PRINCIPAL_TTL, tags=[f"user:{user_id}"], since=since)
+    return Principal(**principal)
+
+
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
     token = credentials.credentials
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username = payload.get("sub")
-        if username is None:
+        user_id = payload.get("user_id")
+        if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid token")
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
+    token_version = payload.get("ver", 0)
+    principal = load_principal(db, user_id, token_version)
+    if principal is None:
         raise HTTPException(status_code=401, detail="User not found")
-    return user
+    if principal.token_version != token_version:
+        raise HTTPException(status_code=401, detail="Token revoked")
+    return principal
@@ -0,0 +1,72 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy import func, select
+from models import Blog
+from search import search_blogs_async
+from core.config import SEARCH_MAX_RESULTS
+from .blogs_crud import (
+    listing_statement, ranked_statement, order_ranked, cached_count, store_count,
+    relevance_position, relevance_cursor, after_cursor, next_cursor, user_blogs_statement,
+    trending_statement, trending_after, trending_page, trending_count_statement,
+)
+
+async def _ranked_page(db: AsyncSession, page_ids):
+    rows = (await db.execute(ranked_statement(page_ids))).all()
+    return order_ranked(rows, page_ids)
+
+async def search_matches(db: AsyncSession, search: str):
+    return await search_blogs_async(db, search, SEARCH_MAX_RESULTS + 1)
+
+async def count_blogs(db: AsyncSession, search: str = None, cached: bool = False):
+    total = cached_count(search) if cached else None
+    if total is None:
+        if search:
+            total = len(await search_matches(db, search))
+        else:
+            total = (await db.execute(select(func.count(Blog.id)))).scalar_one()
+        store_count(search, total)
+    return total
+
+async def get_blogs_filtered(db: AsyncSession, page: int = 1, limit: int = 10, sort_by: str = 'created_at', order: str = 'desc', search: str = None, include_total: bool = True):
+    offset = (page - 1) * limit
+    if search:
+        matched_ids = await search_matches(db, search)
+        total = len(matched_ids) if include_total else None
+        matched_ids = matched_ids[:SEARCH_MAX_RESULTS]
+        if sort_by == 'relevance':
+            return await _ranked_page(db, matched_ids[offset:offset + limit]), total
+        stmt, _, _ = listing_statement(sort_by, order, matched_ids)
+        return (await db.execute(stmt.offset(offset).limit(limit))).all(), total
+    if sort_by == 'trending':
+        blogs, _ = trending_page((await db.execute(trending_statement().offset(offset).limit(limit))).all(), limit)
+        return blogs, ((await db.scalar(trending_count_statement())) or 0) if include_total else None
+    stmt, _, _ = listing_statement(sort_by, order)
+    blogs = (await db.execute(stmt.offset(offset).limit(limit))).all()
+    total = await count_blogs(db) if include_total else None
+    return blogs, total
+
+async def get_blogs_after(db: AsyncSession, cursor: str = None, limit: int = 10, sort_by: str = 'created_at', order: str = 'desc', search: str = None):
+    matched_ids = (await search_matches(db, search))[:SEARCH_MAX_RESULTS] if search else None
+    if search and sort_by == 'relevance':
+        position = relevance_position(cursor)
+        page_ids = matched_ids[position:position + limit]
+        return await _ranked_page(db, page_ids), relevance_cursor(position + limit, len(matched_ids))
+    if sort_by == 'trending' and not search:
+        return trending_page((await db.execute(trending_after(trending_statement(), cursor).limit(limit + 1))).all(), limit)
+    stmt, sort_by, order = listing_statement(sort_by, order, matched_ids)
+    stmt = after_cursor(stmt, cursor, sort_by, order)
+    blogs = (await db.execute(stmt.limit(limit + 1))).all()
+    return blogs[:limit], next_cursor(blogs, limit, sort_by, order)
+
+async def get_blogs_by_ids(db: AsyncSession, blog_ids):
+    return await _ranked_page(db, blog_ids)
+
+async def get_blogs_by_user(db: AsyncSession, user_id: int):
+    return (await db.execute(user_blogs_statement(user_id))).all()
+
+async def get_blog_stamp(db: AsyncSession, blog_id: int):
+    stmt = select(Blog.id, Blog.version, Blog.likes_count, Blog.comments_count, Blog.comments_version, Blog.updated_at).where(Blog.id == blog_id)
+    return (await db.execute(stmt)).first()
+
+async def get_blog_with_author(db: AsyncSession, blog_id: int):
+    return (await db.execute(select(Blog).options(joinedload(Blog.author)).where(Blog.id == blog_id))).scalars().first()
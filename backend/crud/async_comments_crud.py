@@ -0,0 +1,18 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from models import Comment
+from crud.comments_crud import comments_statement, thread_roots_statement, thread_replies_statement, subtree_statement, split_page
+
+async def get_comments(db: AsyncSession, blog_id: int):
+    return (await db.execute(comments_statement(blog_id))).all()
+
+async def get_comment(db: AsyncSession, comment_id: int):
+    return (await db.execute(select(Comment).where(Comment.id == comment_id))).scalars().first()
+
+async def get_threads(db: AsyncSession, blog_id: int, limit: int, per_thread: int, after: int | None = None):
+    roots, next_after = split_page((await db.execute(thread_roots_statement(blog_id, limit, after))).all(), limit)
+    replies = (await db.execute(thread_replies_statement(blog_id, [c for c, _ in roots], per_thread))).all() if roots and per_thread > 0 else []
+    return roots, replies, next_after
+
+async def get_replies(db: AsyncSession, root, limit: int, after: int | None = None):
+    return split_page((await db.execute(subtree_statement(root, limit, after))).all(), limit)
@@ -1,46 +1,215 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, asc, or_ , func
-from models import Blog, Like, Comment
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import desc, asc, or_ , and_, func, select, delete, update
+from models import Blog, Like, Comment, User, BlogTrending, TrendingState
+from search import search_blogs, index_blog, remove_blog
+from core.config import SEARCH_MAX_RESULTS
+from collections import OrderedDict
+from datetime import datetime
+import base64
+import json
+import threading
+import time
 
 def create_blog(db: Session, title, content, image_url, video_url, user_id):
     blog = Blog(title=title, content=content, image_url=image_url, video_url=video_url, user_id=user_id)
     db.add(blog)
     db.commit()
     db.refresh(blog)
+    index_blog(blog)
     return blog
 
 def get_all_blogs(db: Session):
     return db.query(Blog).all()
 
-def get_blogs_filtered(db: Session, page: int = 1, limit: int = 10, sort_by: str = 'created_at', order: str = 'desc', search: str = None):
-    query = db.query(Blog)
+SORT_COLUMNS = {'created_at': Blog.created_at, 'title': Blog.title, 'likes': Blog.likes_count}
+COUNT_CACHE_TTL = 30
+# Keyed by the client's search string, so it must not grow without bound.
+COUNT_CACHE_MAX_ENTRIES = 1024
 
-    if search:
-        query = query.filter(or_(Blog.title.ilike(f'%{search}%'), Blog.content.ilike(f'%{search}%')))
-
-    if sort_by == 'title':
-        order_func = desc if order == 'desc' else asc
-        query = query.order_by(order_func(Blog.title))
-    elif sort_by == 'created_at':
-        order_func = desc if order == 'desc' else asc
-        query = query.order_by(order_func(Blog.created_at))
-    elif sort_by == 'likes':
-        order_func = desc if order == 'desc' else asc
-        query = query.outerjoin(Like).group_by(Blog.id).order_by(order_func(func.count(Like.id)))
-    else:
-        query = query.order_by(desc(Blog.created_at))
+_count_cache = OrderedDict()
+_count_lock = threading.Lock()
 
-    offset = (page - 1) * limit
-    blogs = query.offset(offset).limit(limit).all()
+def listing_statement(sort_by: str, order: str, matched_ids=None):
+    if sort_by not in SORT_COLUMNS:
+        sort_by, order = 'created_at', 'desc'
+    column = SORT_COLUMNS[sort_by]
+    order_func = desc if order == 'desc' else asc
+    stmt = select(Blog, User.username).outerjoin(User, Blog.user_id == User.id)
+    if matched_ids is not None:
+        stmt = stmt.where(Blog.id.in_(matched_ids))
+    return stmt.order_by(order_func(column), order_func(Blog.id)), sort_by, order
 
-  
-    total_query = db.query(Blog)
-    if search:
-        total_query = total_query.filter(or_(Blog.title.ilike(f'%{search}%'), Blog.content.ilike(f'%{search}%')))
-    total = total_query.count()
+def trending_statement():
+    return (
+        select(Blog, User.username, BlogTrending.score)
+        .join(BlogTrending, BlogTrending.blog_id == Blog.id)
+        .outerjoin(User, Blog.user_id == User.id)
+        .order_by(desc(BlogTrending.score), desc(BlogTrending.blog_id))
+    )
+
+def trending_after(stmt, cursor: str):
+    if not cursor:
+        return stmt
+    cursor_sort, _, score, last_id = decode_cursor(cursor)
+    if cursor_sort != 'trending' or not isinstance(score, float):
+        raise ValueError("Cursor does not match the requested sort order")
+    return stmt.where(or_(BlogTrending.score < score, and_(BlogTrending.score == score, BlogTrending.blog_id < last_id)))
+
+def trending_page(rows, limit: int):
+    """Drop the score column, and turn the row past ``limit`` into the next cursor."""
+    cursor = None
+    if len(rows) > limit:
+        blog, _, score = rows[limit - 1]
+        cursor = encode_cursor('trending', 'desc', score, blog.id)
+    return [(blog, username) for blog, username, _ in rows[:limit]], cursor
+
+def trending_count_statement():
+    return select(TrendingState.ranked).where(TrendingState.id == 1)
+
+def ranked_statement(page_ids):
+    return select(Blog, User.username).outerjoin(User, Blog.user_id == User.id).where(Blog.id.in_(page_ids))
+
+def order_ranked(rows, page_ids):
+    by_id = {blog.id: (blog, username) for blog, username in rows}
+    return [by_id[blog_id] for blog_id in page_ids if blog_id in by_id]
+
+def cached_count(search: str = None):
+    key = search or ''
+    with _count_lock:
+        hit = _count_cache.get(key)
+        if hit is None:
+            return None
+        if hit[1] <= time.monotonic():
+            del _count_cache[key]
+            return None
+        _count_cache.move_to_end(key)
+        return hit[0]
 
+def store_count(search: str, total: int):
+    key = search or ''
+    with _count_lock:
+        _count_cache[key] = (total, time.monotonic() + COUNT_CACHE_TTL)
+        _count_cache.move_to_end(key)
+        while len(_count_cache) > COUNT_CACHE_MAX_ENTRIES:
+            _count_cache.popitem(last=False)
+    return total
+
+def _ranked_page(db: Session, page_ids):
+    return order_ranked(db.execute(ranked_statement(page_ids)).all(), page_ids)
+
+def search_matches(db: Session, search: str):
+    """Best matches first, stopping one past SEARCH_MAX_RESULTS.
+
+    A search total of SEARCH_MAX_RESULTS + 1 therefore means "more than
+    SEARCH_MAX_RESULTS"; see capped_total in api/blogs.py.
+    """
+    return search_blogs(db, search, SEARCH_MAX_RESULTS + 1)
+
+def count_blogs(db: Session, search: str = None, cached: bool = False):
+    total = cached_count(search) if cached else None
+    if total is None:
+        total = len(search_matches(db, search)) if search else db.query(Blog).count()
+        store_count(search, total)
+    return total
+
+def get_blogs_filtered(db: Session, page: int = 1, limit: int = 10, sort_by: str = 'created_at', order: str = 'desc', search: str = None, include_total: bool = True):
+    offset = (page - 1) * limit
+    if search:
+        matched_ids = search_matches(db, search)
+        total = len(matched_ids) if include_total else None
+        matched_ids = matched_ids[:SEARCH_MAX_RESULTS]
+        if sort_by == 'relevance':
+            return _ranked_page(db, matched_ids[offset:offset + limit]), total
+        stmt, _, _ = listing_statement(sort_by, order, matched_ids)
+        return db.execute(stmt.offset(offset).limit(limit)).all(), total
+    if sort_by == 'trending':
+        blogs, _ = trending_page(db.execute(trending_statement().offset(offset).limit(limit)).all(), limit)
+        return blogs, (db.scalar(trending_count_statement()) or 0) if include_total else None
+    stmt, _, _ = listing_statement(sort_by, order)
+    blogs = db.execute(stmt.offset(offset).limit(limit)).all()
+    total = count_blogs(db) if include_total else None
     return blogs, total
 
+def encode_cursor(sort_by: str, order: str, value, blog_id: int):
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort_by, order, value, blog_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str):
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort_by, order, value, blog_id = json.loads(payload)
+        if sort_by == 'created_at':
+            value = datetime.fromisoformat(value)
+        return sort_by, order, value, int(blog_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+def relevance_position(cursor: str):
+    if not cursor:
+        return 0
+    cursor_sort, _, position, _ = decode_cursor(cursor)
+    if cursor_sort != 'relevance' or not isinstance(position, int):
+        raise ValueError("Cursor does not match the requested sort order")
+    return position
+
+def relevance_cursor(end: int, matched: int):
+    return encode_cursor('relevance', 'desc', end, 0) if end < matched else None
+
+def after_cursor(stmt, cursor: str, sort_by: str, order: str):
+    if not cursor:
+        return stmt
+    cursor_sort, cursor_order, value, last_id = decode_cursor(cursor)
+    if (cursor_sort, cursor_order) != (sort_by, order):
+        raise ValueError("Cursor does not match the requested sort order")
+    column = SORT_COLUMNS[sort_by]
+    # Compare with the boundary row's stored value rather than the one carried
+    # in the cursor: SQLite keeps server-default timestamps without fractional
+    # seconds, so a rebuilt datetime would not compare equal to them. The
+    # cursor's value only stands in when that row has since been deleted.
+    value = func.coalesce(select(column).where(Blog.id == last_id).scalar_subquery(), value)
+    if order == 'desc':
+        return stmt.where(or_(column < value, and_(column == value, Blog.id < last_id)))
+    return stmt.where(or_(column > value, and_(column == value, Blog.id > last_id)))
+
+def next_cursor(rows, limit: int, sort_by: str, order: str):
+    if len(rows) <= limit:
+        return None
+    last = rows[limit - 1][0]
+    return encode_cursor(sort_by, order, getattr(last, SORT_COLUMNS[sort_by].key), last.id)
+
+def get_blogs_after(db: Session, cursor: str = None, limit: int = 10, sort_by: str = 'created_at', order: str = 'desc', search: str = None):
+    matched_ids = search_matches(db, search)[:SEARCH_MAX_RESULTS] if search else None
+    if search and sort_by == 'relevance':
+        position = relevance_position(cursor)
+        page_ids = matched_ids[position:position + limit]
+        return _ranked_page(db, page_ids), relevance_cursor(position + limit, len(matched_ids))
+    if sort_by == 'trending' and not search:
+        return trending_page(db.execute(trending_after(trending_statement(), cursor).limit(limit + 1)).all(), limit)
+    stmt, sort_by, order = listing_statement(sort_by, order, matched_ids)
+    stmt = after_cursor(stmt, cursor, sort_by, order)
+    blogs = db.execute(stmt.limit(limit + 1)).all()
+    return blogs[:limit], next_cursor(blogs, limit, sort_by, order)
+
+def user_blogs_statement(user_id: int):
+    return select(Blog, User.username).outerjoin(User, Blog.user_id == User.id).where(Blog.user_id == user_id)
+
+def get_counts(db: Session, blog_ids):
+    return db.execute(select(Blog.id, Blog.likes_count, Blog.comments_count).where(Blog.id.in_(blog_ids))).all()
+
+def get_blogs_by_ids(db: Session, blog_ids):
+    return _ranked_page(db, blog_ids)
+
+def get_blogs_by_user(db: Session, user_id: int):
+    return db.execute(user_blogs_statement(user_id)).all()
+
+def get_blog_stamp(db: Session, blog_id: int):
+    return db.query(Blog.id, Blog.version, Blog.likes_count, Blog.comments_count, Blog.comments_version, Blog.updated_at).filter(Blog.id == blog_id).first()
+
+def get_blog_with_author(db: Session, blog_id: int):
+    return db.query(Blog).options(joinedload(Blog.author)).filter(Blog.id == blog_id).first()
+
 def get_blog_by_id(db: Session, blog_id: int):
     return db.query(Blog).filter(Blog.id == blog_id).first()
 
@@ -51,10 +220,39 @@ def update_blog(db: Session, blog_id: int, title: str, content: str, image_url:
         blog.content = content
         blog.image_url = image_url
         blog.video_url = video_url
+        blog.version = Blog.version + 1
         db.commit()
         db.refresh(blog)
+        index_blog(blog)
     return blog
 
+def touch_image(db: Session, image_url: str):
+    """Bump the version of every blog showing image_url, so cached copies of
+    them revalidate once its derivatives exist; returns their ids."""
+    blog_ids = db.execute(select(Blog.id).where(Blog.image_url == image_url)).scalars().all()
+    if blog_ids:
+        db.execute(update(Blog).where(Blog.id.in_(blog_ids)).values(version=Blog.version + 1, updated_at=func.now()))
+        db.commit()
+    return blog_ids
+
 def delete_blog(db: Session, blog):
+    blog_id = blog.id
+    # Delete the trending row here rather than leaving it to the cascade, so
+    # the ranked count listings report stays in step.
+    if db.execute(delete(BlogTrending).where(BlogTrending.blog_id == blog_id)).rowcount:
+        db.execute(update(TrendingState).where(TrendingState.id == 1).values(ranked=TrendingState.ranked - 1))
     db.delete(blog)
     db.commit()
+    remove_blog(blog_id)
+
+def reconcile_counters(db: Session, batch_size: int = 1000):
+    likes = select(func.count(Like.id)).where(Like.blog_id == Blog.id).scalar_subquery()
+    comments = select(func.count(Comment.id)).where(Comment.blog_id == Blog.id).scalar_subquery()
+    max_id = db.query(func.max(Blog.id)).scalar() or 0
+    updated = 0
+    for start in range(0, max_id, batch_size):
+        updated += db.query(Blog).filter(Blog.id > start, Blog.id <= start + batch_size).update(
+            {Blog.likes_count: likes, Blog.comments_count: comments}, synchronize_session=False
+        )
+        db.commit()
+    return updated
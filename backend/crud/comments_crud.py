@@ -1,13 +1,134 @@
 from sqlalchemy.orm import Session
-from models import Comment
+from sqlalchemy import select, func, literal, String
+from models import Comment, Blog, User
+from models.comments import PATH_SEGMENT, MAX_DEPTH, MAX_PATH_LENGTH, path_segment, subtree_end
 
 def create_comment(db: Session, content: str, blog_id: int, user_id: int, parent_comment_id=None):
+    parent_path = ""
+    if parent_comment_id:
+        parent_path = db.query(Comment.path).filter(Comment.id == parent_comment_id).scalar()
+        if len(parent_path) + PATH_SEGMENT > MAX_PATH_LENGTH:
+            raise ValueError(f"Replies cannot be nested more than {MAX_DEPTH} levels deep")
     comment = Comment(content=content, blog_id=blog_id, user_id=user_id, parent_comment_id=parent_comment_id)
     db.add(comment)
+    db.flush()
+    if parent_comment_id:
+        db.query(Comment).filter(Comment.id == parent_comment_id).update({Comment.reply_count: Comment.reply_count + 1}, synchronize_session=False)
+    comment.path = parent_path + path_segment(comment.id)
+    db.query(Blog).filter(Blog.id == blog_id).update({Blog.comments_count: Blog.comments_count + 1, Blog.comments_version: Blog.comments_version + 1}, synchronize_session=False)
     db.commit()
     db.refresh(comment)
     return comment
 
 def delete_comment(db: Session, comment):
-    db.delete(comment)
+    # Replies move up to the deleted comment's parent (or become thread roots),
+    # so the comment's segment is cut out of every path below it.
+    moved = db.query(Comment).filter(Comment.parent_comment_id == comment.id).update({Comment.parent_comment_id: comment.parent_comment_id}, synchronize_session=False)
+    if moved:
+        db.query(Comment).filter(
+            Comment.blog_id == comment.blog_id, Comment.path > comment.path, Comment.path < subtree_end(comment.path)
+        ).update(
+            {Comment.path: literal(comment.path[:-PATH_SEGMENT], String) + func.substr(Comment.path, len(comment.path) + 1)},
+            synchronize_session=False,
+        )
+    db.query(Comment).filter(Comment.id == comment.id).delete(synchronize_session=False)
+    if comment.parent_comment_id:
+        db.query(Comment).filter(Comment.id == comment.parent_comment_id).update({Comment.reply_count: Comment.reply_count + moved - 1}, synchronize_session=False)
+    db.query(Blog).filter(Blog.id == comment.blog_id).update({Blog.comments_count: Blog.comments_count - 1, Blog.comments_version: Blog.comments_version + 1}, synchronize_session=False)
     db.commit()
+    return moved
+
+def comments_statement(blog_id: int):
+    return select(Comment, User.username).outerjoin(User, User.id == Comment.user_id).where(Comment.blog_id == blog_id)
+
+def get_comments(db: Session, blog_id: int):
+    return db.execute(comments_statement(blog_id)).all()
+
+def get_comment(db: Session, comment_id: int):
+    return db.query(Comment).filter(Comment.id == comment_id).first()
+
+def thread_roots_statement(blog_id: int, limit: int, after: int | None = None):
+    stmt = (
+        select(Comment, User.username)
+        .outerjoin(User, User.id == Comment.user_id)
+        .where(Comment.blog_id == blog_id, Comment.parent_comment_id.is_(None))
+    )
+    if after:
+        stmt = stmt.where(Comment.id > after)
+    return stmt.order_by(Comment.id).limit(limit + 1)
+
+def thread_replies_statement(blog_id: int, roots, per_thread: int):
+    # Roots of one page are contiguous by id and therefore by path, so all of
+    # their replies fall into a single range; row_number keeps the first few per thread.
+    thread = func.substr(Comment.path, 1, PATH_SEGMENT)
+    ranked = (
+        select(Comment.id, func.row_number().over(partition_by=thread, order_by=Comment.path).label("position"))
+        .where(
+            Comment.blog_id == blog_id,
+            Comment.parent_comment_id.is_not(None),
+            Comment.path > roots[0].path,
+            Comment.path < subtree_end(roots[-1].path),
+        )
+        .subquery()
+    )
+    return (
+        select(Comment, User.username)
+        .join(ranked, ranked.c.id == Comment.id)
+        .outerjoin(User, User.id == Comment.user_id)
+        .where(ranked.c.position <= per_thread)
+        .order_by(Comment.path)
+    )
+
+def subtree_statement(root, limit: int, after: int | None = None):
+    stmt = (
+        select(Comment, User.username)
+        .outerjoin(User, User.id == Comment.user_id)
+        .where(Comment.blog_id == root.blog_id, Comment.path > root.path, Comment.path < subtree_end(root.path))
+    )
+    if after:
+        stmt = stmt.where(Comment.path > select(Comment.path).where(Comment.id == after).scalar_subquery())
+    return stmt.order_by(Comment.path).limit(limit + 1)
+
+def split_page(rows, limit: int):
+    return rows[:limit], rows[limit - 1][0].id if len(rows) > limit else None
+
+def get_threads(db: Session, blog_id: int, limit: int, per_thread: int, after: int | None = None):
+    roots, next_after = split_page(db.execute(thread_roots_statement(blog_id, limit, after)).all(), limit)
+    replies = db.execute(thread_replies_statement(blog_id, [c for c, _ in roots], per_thread)).all() if roots and per_thread > 0 else []
+    return roots, replies, next_after
+
+def get_replies(db: Session, root, limit: int, after: int | None = None):
+    return split_page(db.execute(subtree_statement(root, limit, after)).all(), limit)
+
+def backfill_paths(db: Session, batch_size: int = 1000):
+    """Recompute path and reply_count for every comment, one blog at a time."""
+    blog_ids = [blog_id for (blog_id,) in db.query(Comment.blog_id).distinct().all()]
+    updated = 0
+    for blog_id in blog_ids:
+        rows = db.query(Comment.id, Comment.parent_comment_id).filter(Comment.blog_id == blog_id).order_by(Comment.id).all()
+        parents = dict(rows)
+        paths = {}
+        reply_counts = {comment_id: 0 for comment_id in parents}
+
+        def resolve(comment_id):
+            chain = []
+            while comment_id is not None and comment_id not in paths:
+                chain.append(comment_id)
+                parent_id = parents.get(comment_id)
+                comment_id = parent_id if parent_id in parents else None
+            prefix = paths[comment_id] if comment_id is not None else ""
+            for link in reversed(chain):
+                prefix += path_segment(link)
+                paths[link] = prefix
+
+        for comment_id, parent_id in rows:
+            resolve(comment_id)
+            if parent_id in reply_counts:
+                reply_counts[parent_id] += 1
+
+        mappings = [{"id": comment_id, "path": paths[comment_id], "reply_count": reply_counts[comment_id]} for comment_id in parents]
+        for start in range(0, len(mappings), batch_size):
+            db.bulk_update_mappings(Comment, mappings[start:start + batch_size])
+            db.commit()
+        updated += len(mappings)
+    return updated
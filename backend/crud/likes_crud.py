@@ -1,14 +1,17 @@
 from sqlalchemy.orm import Session
-from models import Like
+from sqlalchemy import insert, select, func, tuple_
+from models import Like, Blog
 
 def toggle_like(db: Session, blog_id: int, user_id: int):
     existing_like = db.query(Like).filter(Like.blog_id == blog_id, Like.user_id == user_id).first()
     if existing_like:
         db.delete(existing_like)
+        db.query(Blog).filter(Blog.id == blog_id).update({Blog.likes_count: Blog.likes_count - 1}, synchronize_session=False)
         db.commit()
         return False
     new_like = Like(blog_id=blog_id, user_id=user_id)
     db.add(new_like)
+    db.query(Blog).filter(Blog.id == blog_id).update({Blog.likes_count: Blog.likes_count + 1}, synchronize_session=False)
     db.commit()
     return True
 
@@ -20,3 +23,31 @@ def is_liked(db: Session, blog_id: int, user_id: int | None) -> bool:
         return False
     existing_like = db.query(Like).filter(Like.blog_id == blog_id, Like.user_id == user_id).first()
     return existing_like is not None
+
+def like_counts(db: Session, blog_ids):
+    return dict(db.execute(select(Blog.id, Blog.likes_count).where(Blog.id.in_(blog_ids))).all())
+
+def liked_blog_ids(db: Session, blog_ids, user_id: int):
+    return set(db.scalars(select(Like.blog_id).where(Like.user_id == user_id, Like.blog_id.in_(blog_ids))))
+
+def apply_like_states(db: Session, states: dict, batch_size: int = 1000):
+    """Write coalesced (blog_id, user_id) -> liked states and recount the touched blogs.
+
+    Inserts skip rows that already exist and deletes skip rows that are gone, so
+    replaying the same states after a crash is harmless.
+    """
+    items = list(states.items())
+    for start in range(0, len(items), batch_size):
+        chunk = items[start:start + batch_size]
+        unliked = [key for key, liked in chunk if not liked]
+        liked = [{"blog_id": blog_id, "user_id": user_id} for (blog_id, user_id), is_liked in chunk if is_liked]
+        if unliked:
+            db.query(Like).filter(tuple_(Like.blog_id, Like.user_id).in_(unliked)).delete(synchronize_session=False)
+        if liked:
+            db.execute(insert(Like).prefix_with("IGNORE", dialect="mysql").prefix_with("OR IGNORE", dialect="sqlite"), liked)
+    blog_ids = sorted({blog_id for blog_id, _ in states})
+    recount = select(func.count(Like.id)).where(Like.blog_id == Blog.id).scalar_subquery()
+    for start in range(0, len(blog_ids), batch_size):
+        db.query(Blog).filter(Blog.id.in_(blog_ids[start:start + batch_size])).update({Blog.likes_count: recount}, synchronize_session=False)
+    db.commit()
+    return blog_ids
@@ -0,0 +1,86 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update, delete, func
+from models import OutboxMessage
+import datetime
+import random
+import uuid
+
+DUE_STATUSES = ("pending", "sending")
+
+def enqueue_email(db: Session, recipient: str, subject: str, body: str):
+    message = OutboxMessage(recipient=recipient, subject=subject, body=body, next_attempt_at=datetime.datetime.now())
+    db.add(message)
+    db.commit()
+    return message.id
+
+def claim_due(db: Session, limit: int, lease: float):
+    """Lease up to ``limit`` due messages to the caller; a row only goes to whoever updates it first."""
+    now = datetime.datetime.now()
+    due = (OutboxMessage.status.in_(DUE_STATUSES), OutboxMessage.next_attempt_at <= now)
+    ids = db.scalars(select(OutboxMessage.id).where(*due).order_by(OutboxMessage.next_attempt_at, OutboxMessage.id).limit(limit)).all()
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    db.execute(
+        update(OutboxMessage)
+        .where(OutboxMessage.id.in_(ids), *due)
+        .values(status="sending", claim_token=token, next_attempt_at=now + datetime.timedelta(seconds=lease))
+    )
+    db.commit()
+    return db.scalars(select(OutboxMessage).where(OutboxMessage.claim_token == token).order_by(OutboxMessage.id)).all()
+
+def retry_delay(attempts: int, backoff: float, backoff_max: float):
+    # Full jitter keeps a burst of failures from retrying in lockstep.
+    return random.uniform(backoff, min(backoff_max, backoff * 2 ** attempts))
+
+def _settle(db: Session, message, **values):
+    """Update a leased row unless its lease expired and went to another dispatcher."""
+    result = db.execute(
+        update(OutboxMessage)
+        .where(OutboxMessage.id == message.id, OutboxMessage.claim_token == message.claim_token)
+        .values(claim_token=None, **values)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+def record_results(db: Session, sent, failed, released, max_attempts: int, backoff: float, backoff_max: float):
+    """Store the outcome of one batch and return (retried, failed, skipped) counts.
+
+    ``failed`` holds (message, error, permanent) tuples. ``released`` messages
+    were never tried, because the connection broke first. They go back to the
+    queue without using up an attempt. Rows whose lease ran out and was claimed
+    again are left to the new holder and counted as skipped.
+    """
+    now = datetime.datetime.now()
+    skipped = 0
+    for message in sent:
+        skipped += not _settle(db, message, status="sent", sent_at=now, attempts=message.attempts + 1)
+    retry_at = now
+    retried = gave_up = 0
+    for message, error, permanent in failed:
+        attempts = message.attempts + 1
+        values = {"attempts": attempts, "last_error": str(error)[:500]}
+        if permanent or attempts >= max_attempts:
+            values["status"] = "failed"
+        else:
+            values["status"] = "pending"
+            values["next_attempt_at"] = now + datetime.timedelta(seconds=retry_delay(attempts, backoff, backoff_max))
+        if not _settle(db, message, **values):
+            skipped += 1
+        elif values["status"] == "failed":
+            gave_up += 1
+        else:
+            retry_at = max(retry_at, values["next_attempt_at"])
+            retried += 1
+    for message in released:
+        skipped += not _settle(db, message, status="pending", next_attempt_at=retry_at)
+    db.commit()
+    return retried, gave_up, skipped
+
+def purge_sent(db: Session, older_than: datetime.datetime):
+    result = db.execute(delete(OutboxMessage).where(OutboxMessage.status == "sent", OutboxMessage.sent_at < older_than))
+    db.commit()
+    return result.rowcount
+
+def count_by_status(db: Session):
+    return dict(db.execute(select(OutboxMessage.status, func.count()).group_by(OutboxMessage.status)).all())
@@ -0,0 +1,147 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update, delete, insert, func
+from sqlalchemy.exc import IntegrityError
+from models import Like, Comment, BlogTrending, TrendingState
+from core.config import TRENDING_HALF_LIFE_HOURS, TRENDING_WINDOW_HOURS, TRENDING_LIKE_WEIGHT, TRENDING_COMMENT_WEIGHT
+import datetime
+import math
+
+DECAY_RATE = math.log(2) / (TRENDING_HALF_LIFE_HOURS * 3600)
+# Scores grow by DECAY_RATE per second past this instant. A recent epoch keeps
+# them small (about 250 per year at a 24 hour half-life) so they stay precise;
+# changing it invalidates every stored score (see migration 0006).
+SCORE_EPOCH = datetime.datetime(2026, 1, 1)
+STATE_ID = 1
+
+def utc_now():
+    # created_at comes from the database clock, which is assumed to run in UTC
+    # (SQLite's CURRENT_TIMESTAMP always does).
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+def event_score(created_at: datetime.datetime, weight: float):
+    """Log-domain contribution of one like or comment: log(weight) + rate * seconds since SCORE_EPOCH."""
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    seconds = (created_at - SCORE_EPOCH).total_seconds()
+    return math.log(weight) + DECAY_RATE * seconds
+
+def add_scores(a, b):
+    """log(e^a + e^b), without leaving the log domain."""
+    if a is None:
+        return b
+    high, low = (a, b) if a >= b else (b, a)
+    return high + math.log1p(math.exp(low - high))
+
+def window_start(now: datetime.datetime):
+    return now - datetime.timedelta(hours=TRENDING_WINDOW_HOURS)
+
+def score_floor(now: datetime.datetime):
+    """A blog whose activity is worth less than one like at the start of the window has gone cold."""
+    return event_score(window_start(now), TRENDING_LIKE_WEIGHT)
+
+def get_state(db: Session):
+    state = db.get(TrendingState, STATE_ID)
+    if state is None:
+        try:
+            db.add(TrendingState(id=STATE_ID, last_like_id=0, last_comment_id=0, ranked=0))
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+        state = db.get(TrendingState, STATE_ID)
+    return state
+
+def rebuild_due(db: Session, now: datetime.datetime, interval: float):
+    state = get_state(db)
+    return state.rebuilt_at is None or state.rebuilt_at <= now - datetime.timedelta(seconds=interval)
+
+def new_events(db: Session, model, after_id: int, limit: int):
+    return db.execute(select(model.id, model.blog_id, model.created_at).where(model.id > after_id).order_by(model.id).limit(limit)).all()
+
+def merge_scores(db: Session, scores):
+    existing = dict(db.execute(select(BlogTrending.blog_id, BlogTrending.score).where(BlogTrending.blog_id.in_(scores))).all())
+    updates = [{"blog_id": blog_id, "score": add_scores(existing[blog_id], score)} for blog_id, score in scores.items() if blog_id in existing]
+    inserts = [{"blog_id": blog_id, "score": score} for blog_id, score in scores.items() if blog_id not in existing]
+    if updates:
+        db.execute(update(BlogTrending), updates)
+    if inserts:
+        db.execute(insert(BlogTrending), inserts)
+        db.execute(update(TrendingState).where(TrendingState.id == STATE_ID).values(ranked=TrendingState.ranked + len(inserts)))
+
+def fold_new_events(db: Session, now: datetime.datetime, batch_size: int):
+    """Add up to ``batch_size`` new likes and comments each to the stored scores.
+
+    Returns how many events were read, or None when another process folded the
+    same events first. Rows are found by id above the stored watermarks, so a
+    row committed out of id order, an unlike or a deleted comment is only
+    accounted for by the next rebuild.
+    """
+    state = get_state(db)
+    seen = (state.last_like_id, state.last_comment_id)
+    likes = new_events(db, Like, state.last_like_id, batch_size)
+    comments = new_events(db, Comment, state.last_comment_id, batch_size)
+    if not likes and not comments:
+        db.rollback()
+        return 0
+    # Updating the watermarks first locks the state row, so concurrent passes
+    # queue up here and the losers find the watermarks already moved.
+    claimed = db.execute(
+        update(TrendingState)
+        .where(TrendingState.id == STATE_ID, TrendingState.last_like_id == seen[0], TrendingState.last_comment_id == seen[1])
+        .values(last_like_id=likes[-1].id if likes else seen[0], last_comment_id=comments[-1].id if comments else seen[1])
+    ).rowcount
+    if not claimed:
+        db.rollback()
+        return None
+    cutoff = window_start(now)
+    scores = {}
+    for rows, weight in ((likes, TRENDING_LIKE_WEIGHT), (comments, TRENDING_COMMENT_WEIGHT)):
+        for _, blog_id, created_at in rows:
+            if created_at is not None and created_at >= cutoff:
+                scores[blog_id] = add_scores(scores.get(blog_id), event_score(created_at, weight))
+    if scores:
+        merge_scores(db, scores)
+    db.commit()
+    return len(likes) + len(comments)
+
+def rebuild(db: Session, now: datetime.datetime, interval: float, batch_size: int):
+    """Recompute every score from the likes and comments inside the window.
+
+    Returns how many blogs are ranked, or None when another process rebuilt
+    within ``interval`` seconds.
+    """
+    get_state(db)
+    claimed = db.execute(
+        update(TrendingState)
+        .where(TrendingState.id == STATE_ID)
+        .where((TrendingState.rebuilt_at.is_(None)) | (TrendingState.rebuilt_at <= now - datetime.timedelta(seconds=interval)))
+        .values(rebuilt_at=now)
+    ).rowcount
+    if not claimed:
+        db.rollback()
+        return None
+    cutoff = window_start(now)
+    scores = {}
+    watermarks = {}
+    for model, weight in ((Like, TRENDING_LIKE_WEIGHT), (Comment, TRENDING_COMMENT_WEIGHT)):
+        watermarks[model] = db.scalar(select(func.max(model.id))) or 0
+        stmt = select(model.blog_id, model.created_at).where(model.created_at >= cutoff, model.id <= watermarks[model])
+        for blog_id, created_at in db.execute(stmt.execution_options(yield_per=batch_size)):
+            scores[blog_id] = add_scores(scores.get(blog_id), event_score(created_at, weight))
+    db.execute(delete(BlogTrending))
+    rows = [{"blog_id": blog_id, "score": score} for blog_id, score in scores.items()]
+    for start in range(0, len(rows), batch_size):
+        db.execute(insert(BlogTrending), rows[start:start + batch_size])
+    db.execute(
+        update(TrendingState)
+        .where(TrendingState.id == STATE_ID)
+        .values(last_like_id=watermarks[Like], last_comment_id=watermarks[Comment], ranked=len(rows))
+    )
+    db.commit()
+    return len(rows)
+
+def prune(db: Session, now: datetime.datetime):
+    pruned = db.execute(delete(BlogTrending).where(BlogTrending.score < score_floor(now))).rowcount
+    if pruned:
+        db.execute(update(TrendingState).where(TrendingState.id == STATE_ID).values(ranked=TrendingState.ranked - pruned))
+    db.commit()
+    return pruned
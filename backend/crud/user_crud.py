@@ -1,13 +1,13 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, text
+from sqlalchemy import func
 from sqlalchemy.exc import IntegrityError
 from models import User
-from core.security import get_password_hash
+from core.security import forget_principal
 import datetime
 
-def create_user(db: Session, username: str, email: str, password: str):
+def create_user(db: Session, username: str, email: str, hashed_password: str):
     try:
-        new_user = User(username=username, email=email, password=get_password_hash(password))
+        new_user = User(username=username, email=email, password=hashed_password)
         db.add(new_user)
         db.commit()
         db.refresh(new_user)
@@ -17,7 +17,14 @@ def create_user(db: Session, username: str, email: str, password: str):
         raise ValueError("Username or email already exists")
 
 def get_user_by_username(db: Session, username: str):
-    return db.query(User).filter(text("username = :username COLLATE utf8mb4_bin")).params(username=username).first()
+    # Look up through the unique index, then compare case-sensitively; a COLLATE
+    # in the WHERE clause would force a full scan of users.
+    user = db.query(User).filter(User.username == username).first()
+    return user if user and user.username == username else None
+
+def set_password_hash(db: Session, user_id: int, hashed: str):
+    db.query(User).filter(User.id == user_id).update({User.password: hashed}, synchronize_session=False)
+    db.commit()
 
 def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
@@ -52,14 +59,17 @@ def verify_reset_token(db: Session, token: str):
             return user
     return None
 
-def update_password_by_email(db: Session, email: str, new_password: str):
+def update_password_by_email(db: Session, email: str, hashed_password: str):
     user = get_user_by_email(db, email)
     if user:
-        user.password = get_password_hash(new_password)
+        user.password = hashed_password
         user.otp = None
         user.otp_expires = None
         user.reset_token = None
         user.reset_expires = None
+        user.token_version = User.token_version + 1
+        user_id = user.id
         db.commit()
+        forget_principal(user_id)
         return user
     return None
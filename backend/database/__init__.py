@@ -1 +1,5 @@
-from .connection import DATABASE_URL, SessionLocal, Base, engine, get_db
+from .connection import (
+    DATABASE_URL, SessionLocal, Base, engine, get_db, async_engine, AsyncSessionLocal, get_async_db,
+    replicas, get_read_db, get_async_read_db,
+)
+from .replicas import read_your_writes
@@ -0,0 +1,112 @@
+"""EXPLAIN the SELECTs behind each read endpoint and flag full table scans.
+
+Each scenario calls the same CRUD functions the routes use while a cursor
+listener records the SQL, then every captured SELECT is explained on the same
+database. Run it against a seeded database: on near-empty tables MySQL may
+legitimately prefer a scan over an index.
+"""
+from contextlib import contextmanager
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from models import Blog, Comment, User
+from crud import blogs_crud, comments_crud, likes_crud, user_crud
+
+
+def sample_ids(db: Session):
+    blog = db.execute(select(Blog.id, Blog.user_id).order_by(Blog.id.desc()).limit(1)).first()
+    comment = db.execute(select(Comment.id).where(Comment.parent_comment_id.is_(None)).order_by(Comment.id).limit(1)).first()
+    user = db.execute(select(User.id, User.username, User.email).order_by(User.id).limit(1)).first()
+    return {
+        "blog_id": blog.id if blog else 1,
+        "author_id": blog.user_id if blog else 1,
+        "comment_id": comment.id if comment else 1,
+        "user_id": user.id if user else 1,
+        "username": user.username if user else "nobody",
+        "email": user.email if user else "nobody@example.com",
+    }
+
+
+def listing_pages(db, ids, sort_by, order):
+    blogs_crud.get_blogs_filtered(db, 1, 10, sort_by, order, None)
+    _, cursor = blogs_crud.get_blogs_after(db, None, 10, sort_by, order, None)
+    if cursor:
+        blogs_crud.get_blogs_after(db, cursor, 10, sort_by, order, None)
+
+
+def comment_threads(db, ids):
+    comments_crud.get_threads(db, ids["blog_id"], 20, 3)
+    root = comments_crud.get_comment(db, ids["comment_id"])
+    if root:
+        comments_crud.get_replies(db, root, 50)
+
+
+SCENARIOS = [
+    ("GET /blogs sort_by=created_at", lambda db, ids: listing_pages(db, ids, "created_at", "desc")),
+    ("GET /blogs sort_by=title", lambda db, ids: listing_pages(db, ids, "title", "asc")),
+    ("GET /blogs sort_by=likes", lambda db, ids: listing_pages(db, ids, "likes", "desc")),
+    ("GET /blogs sort_by=trending", lambda db, ids: listing_pages(db, ids, "trending", "desc")),
+    ("GET /blogs/user/{id}", lambda db, ids: blogs_crud.get_blogs_by_user(db, ids["author_id"])),
+    ("GET /blogs/{id}", lambda db, ids: (blogs_crud.get_blog_stamp(db, ids["blog_id"]), blogs_crud.get_blog_with_author(db, ids["blog_id"]))),
+    ("GET /comments/blog/{id}", lambda db, ids: comments_crud.get_comments(db, ids["blog_id"])),
+    ("GET /comments/blog/{id}/threads, /comments/{id}/replies", comment_threads),
+    ("GET /likes/blog/{id}", lambda db, ids: likes_crud.is_liked(db, ids["blog_id"], ids["user_id"])),
+    ("GET /blogs/batch", lambda db, ids: blogs_crud.get_blogs_by_ids(db, [ids["blog_id"], ids["blog_id"] - 1])),
+    ("GET /likes/batch", lambda db, ids: likes_crud.liked_blog_ids(db, likes_crud.like_counts(db, [ids["blog_id"], ids["blog_id"] - 1]), ids["user_id"])),
+    ("POST /login", lambda db, ids: user_crud.get_user_by_username(db, ids["username"])),
+    ("POST /send-otp, /verify-otp", lambda db, ids: user_crud.get_user_by_email(db, ids["email"])),
+    ("POST /reset-password", lambda db, ids: user_crud.verify_reset_token(db, "no-such-token")),
+]
+
+
+@contextmanager
+def captured_selects(engine):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def full_scans(connection, statement, parameters, tables):
+    """Return (plan lines, tables read by a full scan) for one statement."""
+    if connection.dialect.name == "mysql":
+        rows = connection.exec_driver_sql("EXPLAIN " + statement, parameters).mappings().all()
+        plan = [f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']} {row['Extra'] or ''}".strip() for row in rows]
+        scans = [row["table"] for row in rows if row["type"] == "ALL" and row["table"] in tables]
+        return plan, scans
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    plan = [row[-1] for row in rows]
+    scans = []
+    for detail in plan:
+        words = detail.split()
+        if len(words) >= 2 and words[0] == "SCAN" and words[1] in tables and "USING" not in words:
+            scans.append(words[1])
+    return plan, scans
+
+
+def explain_endpoints(db: Session, verbose: bool = False):
+    """Explain every scenario's SELECTs; returns a list of (scenario, statement, tables) full scans."""
+    engine = db.get_bind()
+    tables = {table.name for table in Blog.metadata.sorted_tables}
+    ids = sample_ids(db)
+    failures = []
+    for name, scenario in SCENARIOS:
+        with captured_selects(engine) as statements:
+            scenario(db, ids)
+        print(f"{name}: {len(statements)} queries")
+        connection = db.connection()
+        for statement, parameters in statements:
+            plan, scans = full_scans(connection, statement, parameters, tables)
+            if scans:
+                failures.append((name, statement, scans))
+                print(f"  FULL SCAN on {', '.join(scans)}: {' '.join(statement.split())[:200]}")
+            if verbose or scans:
+                for line in plan:
+                    print(f"    {line}")
+    return failures
@@ -0,0 +1,114 @@
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+import logging
+import threading
+import time
+from sqlalchemy import event
+from core.config import DB_SLOW_QUERY_MS, DB_PROFILE_DEBUG, DB_REPEATED_STATEMENT_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+request_profile = ContextVar("request_profile", default=None)
+
+
+def route_label(scope):
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class RequestProfile:
+    """SQL cost of one request, filled in by the engine listeners below."""
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.statements = 0
+        self.db_time = 0.0
+        self.slow = 0
+        self.repeated = Counter() if DB_PROFILE_DEBUG else None
+
+    @property
+    def route(self):
+        return route_label(self.scope)
+
+    def record(self, statement: str, elapsed: float, slow: bool):
+        self.statements += 1
+        self.db_time += elapsed
+        self.slow += int(slow)
+        if self.repeated is not None:
+            self.repeated[statement] += 1
+
+    def repeated_statements(self):
+        if self.repeated is None:
+            return []
+        return [(statement, count) for statement, count in self.repeated.items() if count >= DB_REPEATED_STATEMENT_THRESHOLD]
+
+
+class QueryMetrics:
+    """Per-route request and SQL aggregates, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = defaultdict(lambda: {"requests": 0, "seconds": 0.0, "statements": 0, "db_seconds": 0.0, "slow": 0, "repeated": 0})
+
+    def record_statement(self, elapsed: float, slow: bool):
+        # Statements issued outside any request, e.g. by the like flusher or startup hooks.
+        with self._lock:
+            entry = self._routes[("", "background")]
+            entry["statements"] += 1
+            entry["db_seconds"] += elapsed
+            entry["slow"] += int(slow)
+
+    def record_request(self, method: str, profile: RequestProfile, elapsed: float, repeated: int):
+        with self._lock:
+            entry = self._routes[(method, profile.route)]
+            entry["requests"] += 1
+            entry["seconds"] += elapsed
+            entry["statements"] += profile.statements
+            entry["db_seconds"] += profile.db_time
+            entry["slow"] += profile.slow
+            entry["repeated"] += int(repeated > 0)
+
+    def render(self):
+        with self._lock:
+            routes = {key: dict(entry) for key, entry in self._routes.items()}
+        series = [
+            ("http_requests_total", "counter", "Requests handled", "requests"),
+            ("http_request_duration_seconds_total", "counter", "Wall time spent handling requests", "seconds"),
+            ("db_statements_total", "counter", "SQL statements executed", "statements"),
+            ("db_statement_duration_seconds_total", "counter", "Time spent executing SQL statements", "db_seconds"),
+            ("db_slow_statements_total", "counter", f"SQL statements slower than {DB_SLOW_QUERY_MS:g} ms", "slow"),
+            ("db_repeated_statement_requests_total", "counter", "Requests that ran one statement repeatedly (likely N+1)", "repeated"),
+        ]
+        lines = []
+        for name, kind, help_text, field in series:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (method, route), entry in sorted(routes.items()):
+                labels = f'route="{route}"' + (f',method="{method}"' if method else "")
+                lines.append(f"{name}{{{labels}}} {entry[field]:g}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = QueryMetrics()
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started
+    profile = request_profile.get()
+    slow = elapsed * 1000 >= DB_SLOW_QUERY_MS
+    if slow:
+        route = profile.route if profile is not None else "background"
+        logger.warning("Slow query on %s (%.1f ms): %s", route, elapsed * 1000, " ".join(statement.split())[:500])
+    if profile is not None:
+        profile.record(statement, elapsed, slow)
+    else:
+        metrics.record_statement(elapsed, slow)
+
+
+def instrument(engine):
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
@@ -0,0 +1,101 @@
+from contextvars import ContextVar
+import itertools
+import logging
+import threading
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# True while the current request's client has written within READ_YOUR_WRITES_WINDOW,
+# so its reads must come from the primary. Set by ReadYourWritesMiddleware.
+read_your_writes = ContextVar("read_your_writes", default=False)
+
+
+def replica_lag(connection):
+    """Seconds the replica is behind its source, 0 where the backend does not report it, None if replication is stopped."""
+    if connection.dialect.name != "mysql":
+        return 0
+    row = connection.exec_driver_sql("SHOW REPLICA STATUS").mappings().first()
+    if row is None:
+        return 0
+    return row.get("Seconds_Behind_Source")
+
+
+class ReplicaPool:
+    """Round robin over the replicas that passed their last health check.
+
+    A replica is healthy when it answers a query and is no more than ``max_lag``
+    seconds behind the primary. One that fails a check, or fails a query during
+    a request, is skipped until a later check succeeds. With no healthy replica
+    ``pick`` returns None and reads go to the primary.
+    """
+
+    def __init__(self, engines, interval: float, max_lag: float):
+        self.engines = engines
+        self.interval = interval
+        self.max_lag = max_lag
+        self._healthy = list(range(len(engines)))
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._stats = {"replica_reads": 0, "primary_reads": 0, "failed_checks": 0, "marked_down": 0}
+
+    def pick(self, primary: bool = False):
+        """Index of the replica to read from, or None for the primary."""
+        with self._lock:
+            if primary or not self._healthy:
+                self._stats["primary_reads"] += 1
+                return None
+            self._stats["replica_reads"] += 1
+            return self._healthy[next(self._counter) % len(self._healthy)]
+
+    def mark_down(self, index: int):
+        with self._lock:
+            if index in self._healthy:
+                self._healthy.remove(index)
+                self._stats["marked_down"] += 1
+        logger.warning("Replica %d failed a query; reading from the others until it passes a health check", index)
+
+    def healthy(self, engine):
+        try:
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+                lag = replica_lag(connection)
+        except Exception as exc:
+            logger.warning("Replica health check failed for %s: %s", engine.url.render_as_string(hide_password=True), exc)
+            return False
+        if lag is None or lag > self.max_lag:
+            logger.warning("Replica %s is %s seconds behind, skipping it", engine.url.render_as_string(hide_password=True), lag)
+            return False
+        return True
+
+    def check(self):
+        healthy = [index for index, engine in enumerate(self.engines) if self.healthy(engine)]
+        with self._lock:
+            self._stats["failed_checks"] += len(self.engines) - len(healthy)
+            self._healthy = healthy
+        return healthy
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            self.check()
+
+    def start(self):
+        if not self.engines or self._thread is not None:
+            return
+        self._stopping.clear()
+        self.check()
+        self._thread = threading.Thread(target=self._run, name="replica-health", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "replicas": len(self.engines), "healthy": len(self._healthy)}
@@ -0,0 +1,31 @@
+from core.config import EVENTS_BACKEND, EVENTS_URL, EVENTS_CHANNEL, EVENTS_INTERVAL, EVENTS_MAX_SUBSCRIBERS, LIKE_WRITE_BEHIND
+from database import SessionLocal
+from crud import blogs_crud
+from ingest import like_buffer
+from .backends import LocalBackend, RedisBackend
+from .broker import EventBroker, TooManySubscribers
+from .stream import EventStreamResponse
+
+
+def load_counts(blog_ids):
+    db = SessionLocal()
+    try:
+        rows = blogs_crud.get_counts(db, blog_ids)
+    finally:
+        db.close()
+    events = []
+    for blog_id, likes_count, comments_count in rows:
+        if LIKE_WRITE_BEHIND:
+            likes_count = max(0, likes_count + like_buffer.delta(blog_id))
+        events.append({"blog_id": blog_id, "likes_count": likes_count, "comments_count": comments_count})
+    return events
+
+
+def create_backend():
+    if EVENTS_BACKEND == "redis":
+        import redis
+        return RedisBackend(redis.Redis.from_url(EVENTS_URL), EVENTS_CHANNEL)
+    return LocalBackend()
+
+
+broker = EventBroker(create_backend(), load_counts, EVENTS_INTERVAL, EVENTS_MAX_SUBSCRIBERS)
@@ -0,0 +1,61 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class LocalBackend:
+    """Single-process fan-out: published blog ids go straight back to this process's broker."""
+
+    def __init__(self):
+        self._deliver = None
+
+    def start(self, deliver):
+        self._deliver = deliver
+
+    def publish(self, blog_ids):
+        if self._deliver is not None:
+            self._deliver(blog_ids)
+
+    def stop(self):
+        self._deliver = None
+
+
+class RedisBackend:
+    """Cross-worker fan-out through a Redis pub/sub channel.
+
+    Only blog ids travel over the channel; every worker reads the current
+    counts itself for the blogs its own subscribers watch.
+    """
+
+    def __init__(self, client, channel: str):
+        self.client = client
+        self.channel = channel
+        self._pubsub = None
+        self._thread = None
+
+    def start(self, deliver):
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(self.channel)
+
+        def listen():
+            try:
+                for message in self._pubsub.listen():
+                    data = message["data"]
+                    if isinstance(data, bytes):
+                        data = data.decode()
+                    deliver([int(blog_id) for blog_id in data.split(",") if blog_id])
+            except Exception:
+                # Raised by close() on shutdown as well as by a lost connection.
+                logger.info("Event channel listener stopped", exc_info=True)
+
+        self._thread = threading.Thread(target=listen, name="event-listener", daemon=True)
+        self._thread.start()
+
+    def publish(self, blog_ids):
+        self.client.publish(self.channel, ",".join(str(blog_id) for blog_id in blog_ids))
+
+    def stop(self):
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import threading
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+class Subscription:
+    """One client's view of the blogs it watches.
+
+    Only the latest counts per blog are kept, so a reader that falls behind
+    skips the intermediate updates instead of queueing them. The buffer can
+    never hold more than one event per watched blog.
+    """
+
+    def __init__(self, blog_ids):
+        self.blog_ids = blog_ids
+        self.superseded = 0
+        self.closed = False
+        self._pending = {}
+        self._ready = asyncio.Event()
+
+    def close(self):
+        self.closed = True
+        self._ready.set()
+
+    def offer(self, event):
+        if event["blog_id"] in self._pending:
+            self.superseded += 1
+        self._pending[event["blog_id"]] = event
+        self._ready.set()
+
+    async def next(self, timeout: float):
+        """Wait up to ``timeout`` seconds and return the pending events, possibly none."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._ready.clear()
+        events, self._pending = list(self._pending.values()), {}
+        return events
+
+
+class EventBroker:
+    """Fans count updates for blogs out to the subscriptions of this worker.
+
+    ``publish`` only marks a blog as changed (through the backend, so other
+    workers hear about it too). Every ``interval`` seconds the broker reads the
+    current counts of the changed blogs that somebody here watches, in one
+    query, and offers one event per blog to each subscriber. However many likes
+    a hot post gets in that window, subscribers see a single update.
+    """
+
+    def __init__(self, backend, load_counts, interval: float, max_subscribers: int):
+        self.backend = backend
+        self.load_counts = load_counts
+        self.interval = interval
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._dirty = set()
+        self._watchers = {}
+        self._subscriptions = 0
+        self._task = None
+        self._stats = {"published": 0, "flushes": 0, "events": 0, "slow_disconnects": 0}
+
+    def publish(self, blog_id: int):
+        with self._lock:
+            self._stats["published"] += 1
+        try:
+            self.backend.publish([blog_id])
+        except Exception:
+            # A missed push only delays the update until the client's next action.
+            logger.exception("Could not publish change of blog %s", blog_id)
+
+    def _mark(self, blog_ids):
+        with self._lock:
+            self._dirty.update(blog_ids)
+
+    def subscribe(self, blog_ids):
+        if self._subscriptions >= self.max_subscribers:
+            raise TooManySubscribers()
+        subscription = Subscription(blog_ids)
+        for blog_id in blog_ids:
+            self._watchers.setdefault(blog_id, set()).add(subscription)
+        self._subscriptions += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        for blog_id in subscription.blog_ids:
+            watchers = self._watchers.get(blog_id)
+            if watchers is not None:
+                watchers.discard(subscription)
+                if not watchers:
+                    del self._watchers[blog_id]
+        self._subscriptions -= 1
+
+    def record_slow_disconnect(self):
+        self._stats["slow_disconnects"] += 1
+
+    async def snapshot(self, blog_ids):
+        return await run_in_threadpool(self.load_counts, blog_ids)
+
+    async def flush(self):
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        watched = [blog_id for blog_id in dirty if blog_id in self._watchers]
+        if not watched:
+            return 0
+        events = await self.snapshot(watched)
+        for event in events:
+            for subscription in self._watchers.get(event["blog_id"], ()):
+                subscription.offer(event)
+                self._stats["events"] += 1
+        self._stats["flushes"] += 1
+        return len(events)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Event flush failed")
+
+    def start(self):
+        self.backend.start(self._mark)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        self.backend.stop()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self):
+        return {**self._stats, "subscriptions": self._subscriptions, "watched_blogs": len(self._watchers)}
@@ -0,0 +1,56 @@
+import asyncio
+import json
+from starlette.responses import Response
+
+
+def format_event(event):
+    return f"event: counts\ndata: {json.dumps(event, separators=(',', ':'))}\n\n".encode()
+
+
+class EventStreamResponse(Response):
+    """Streams a subscription as Server-Sent Events until the client goes away.
+
+    Starts with the current counts, then sends each coalesced update, with a
+    comment line as heartbeat when nothing happened for ``heartbeat`` seconds.
+    A client that stops reading fills its TCP window until writes block. Once
+    one write blocks for ``send_timeout`` seconds, the stream is closed rather
+    than left holding the subscription.
+    """
+
+    media_type = "text/event-stream"
+
+    def __init__(self, broker, subscription, initial, heartbeat: float, send_timeout: float, retry_ms: int = 3000):
+        super().__init__(headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+        self.raw_headers = [(name, value) for name, value in self.raw_headers if name != b"content-length"]
+        self.broker = broker
+        self.subscription = subscription
+        self.initial = initial
+        self.heartbeat = heartbeat
+        self.send_timeout = send_timeout
+        self.retry_ms = retry_ms
+
+    async def _write(self, send, body: bytes):
+        await asyncio.wait_for(send({"type": "http.response.body", "body": body, "more_body": True}), self.send_timeout)
+
+    async def __call__(self, scope, receive, send):
+        subscription = self.subscription
+
+        async def watch_disconnect():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            subscription.close()
+
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            await self._write(send, f"retry: {self.retry_ms}\n\n".encode() + b"".join(format_event(event) for event in self.initial))
+            while not subscription.closed:
+                events = await subscription.next(self.heartbeat)
+                if subscription.closed:
+                    break
+                await self._write(send, b"".join(format_event(event) for event in events) if events else b": ping\n\n")
+        except asyncio.TimeoutError:
+            self.broker.record_slow_disconnect()
+        finally:
+            watcher.cancel()
+            self.broker.unsubscribe(subscription)
@@ -0,0 +1,21 @@
+from core.config import (
+    LIKE_JOURNAL_DIR, LIKE_JOURNAL_FSYNC, LIKE_FLUSH_INTERVAL, LIKE_FLUSH_MAX_PENDING, LIKE_FLUSH_BATCH, LIKE_FLUSH_MAX_ATTEMPTS,
+)
+from cache import cache
+from .journal import LikeJournal
+from .likes import LikeBuffer
+
+
+def invalidate_liked_blogs(blog_ids):
+    if blog_ids:
+        cache.invalidate_tags("blogs:sort:likes", *(f"blog:{blog_id}" for blog_id in blog_ids))
+
+
+like_buffer = LikeBuffer(
+    LikeJournal(LIKE_JOURNAL_DIR, LIKE_JOURNAL_FSYNC),
+    LIKE_FLUSH_INTERVAL,
+    LIKE_FLUSH_MAX_PENDING,
+    LIKE_FLUSH_BATCH,
+    LIKE_FLUSH_MAX_ATTEMPTS,
+    on_flush=invalidate_liked_blogs,
+)
@@ -0,0 +1,167 @@
+import logging
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no flock; assume a single process there
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class LikeJournal:
+    """Append-only log of acknowledged like toggles, split into segments.
+
+    Each process writes to its own segment and holds an exclusive flock on every
+    segment it has not yet discarded. A segment nobody holds a lock on belongs
+    to a process that died before flushing, so ``recover`` may replay it.
+
+    ``append`` only hands the record to the OS; ``sync`` makes it durable.
+    Callers append under their own lock, to keep the journal in toggle order,
+    and sync after releasing it, so one fsync covers every record appended by
+    the threads waiting on it (group commit).
+    """
+
+    def __init__(self, directory: str, fsync: bool = True):
+        self.directory = directory
+        self.fsync = fsync
+        self._seq = 0
+        self._file = None
+        self._held = {}
+        self._owner = None
+        self._write_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._written = 0
+        self._synced = 0
+        self._unsynced = []
+
+    def _segment_path(self, seq: int):
+        return os.path.join(self.directory, f"likes-{os.getpid()}-{seq:012d}.log")
+
+    def _lock(self, file):
+        if fcntl is None:
+            return True
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def claim(self):
+        """Take the journal directory for this process; False if another process has it."""
+        os.makedirs(self.directory, exist_ok=True)
+        file = open(os.path.join(self.directory, "writer.lock"), "a")
+        if not self._lock(file):
+            file.close()
+            return False
+        self._owner = file
+        return True
+
+    def open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._seq += 1
+        path = self._segment_path(self._seq)
+        # A dead process may have had our pid (always so in a container); leave its segments to recover.
+        while os.path.exists(path):
+            self._seq += 1
+            path = self._segment_path(self._seq)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock(self._file)
+        self._held[path] = self._file
+        return path
+
+    def append(self, blog_id: int, user_id: int, liked: bool):
+        """Write one toggle; returns its sequence number for ``sync``."""
+        with self._write_lock:
+            self._file.write(f"{blog_id} {user_id} {int(liked)}\n")
+            self._file.flush()
+            self._written += 1
+            return self._written
+
+    def sync(self, upto: int):
+        """Block until every record up to ``upto`` is on disk."""
+        if not self.fsync:
+            return
+        with self._sync_lock:
+            with self._write_lock:
+                if self._synced >= upto:
+                    return
+                written = self._written
+                files, self._unsynced = self._unsynced + [self._file], []
+            for file in files:
+                try:
+                    os.fsync(file.fileno())
+                except ValueError:
+                    # Discarded: its toggles already reached the database.
+                    pass
+            with self._write_lock:
+                self._synced = written
+
+    def rotate(self):
+        """Seal the active segment and start a new one; returns the sealed path."""
+        with self._write_lock:
+            sealed = self._file
+            if self._synced < self._written:
+                self._unsynced.append(sealed)
+            self.open()
+        return sealed.name
+
+    def dead_letter(self, states: dict):
+        """Write states that could not be applied to a file ``recover`` skips; returns its path.
+
+        Renaming it to end in .log makes the next start replay it.
+        """
+        path = os.path.join(self.directory, f"likes-{os.getpid()}-{time.time_ns()}.dead")
+        with open(path, "w", encoding="utf-8") as file:
+            for (blog_id, user_id), liked in states.items():
+                file.write(f"{blog_id} {user_id} {int(liked)}\n")
+            file.flush()
+            os.fsync(file.fileno())
+        return path
+
+    def discard(self, *paths: str):
+        for path in paths:
+            file = self._held.pop(path, None)
+            if file is not None:
+                file.close()
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def recover(self):
+        """Lock orphaned segments and return (paths, coalesced states) in write order."""
+        states = {}
+        recovered = []
+        paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(".log")]
+        for path in sorted(paths, key=lambda p: (os.path.getmtime(p), p)):
+            if path in self._held:
+                continue
+            file = open(path, "r", encoding="utf-8")
+            if not self._lock(file):
+                file.close()
+                continue
+            for line in file:
+                parts = line.split()
+                if len(parts) != 3:
+                    # A torn final line is a toggle that was never acknowledged.
+                    continue
+                blog_id, user_id, liked = (int(part) for part in parts)
+                states[(blog_id, user_id)] = bool(liked)
+            self._held[path] = file
+            recovered.append(path)
+        if recovered:
+            logger.info("Recovered %d like toggles from %d journal segments", len(states), len(recovered))
+        return recovered, states
+
+    def close(self):
+        for file in self._held.values():
+            file.close()
+        self._held = {}
+        self._file = None
+        self._unsynced = []
+        if self._owner is not None:
+            self._owner.close()
+            self._owner = None
@@ -0,0 +1,189 @@
+from collections import defaultdict
+import logging
+import threading
+from database import SessionLocal
+from crud import likes_crud
+from .journal import LikeJournal
+
+logger = logging.getLogger(__name__)
+
+
+class LikeBuffer:
+    """Write-behind buffer for like toggles.
+
+    Toggles are journaled and kept in memory as (base, liked) per (blog_id, user_id),
+    where base is the state the database had before the first buffered toggle.
+    Toggling back to base drops the entry, so a burst of toggles by one user
+    costs nothing at flush time. A background thread writes the surviving states
+    in batches every ``interval`` seconds, or sooner once ``max_pending`` keys
+    are waiting, and then recounts likes_count for the touched blogs.
+
+    A failed flush puts its toggles back for the next one. After ``max_attempts``
+    failures in a row the batch is written to a dead-letter file next to the
+    journal and dropped, so one bad row cannot hold the buffer up for good.
+    """
+
+    def __init__(self, journal: LikeJournal, interval: float, max_pending: int, batch_size: int, max_attempts: int = 10, on_flush=None):
+        self.journal = journal
+        self.interval = interval
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.on_flush = on_flush
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._pending = {}
+        self._deltas = defaultdict(int)
+        self._flushing = {}
+        self._flushing_deltas = {}
+        self._sealed = []
+        self._failures = 0
+
+    def _buffered(self, key):
+        return self._pending.get(key) or self._flushing.get(key)
+
+    def state(self, blog_id: int, user_id: int, load_state):
+        with self._lock:
+            entry = self._buffered((blog_id, user_id))
+        return entry[1] if entry else load_state()
+
+    def delta(self, blog_id: int):
+        with self._lock:
+            return self._deltas.get(blog_id, 0) + self._flushing_deltas.get(blog_id, 0)
+
+    def toggle(self, blog_id: int, user_id: int, load_state):
+        key = (blog_id, user_id)
+        while True:
+            with self._lock:
+                buffered = key in self._pending or key in self._flushing
+            stored = None if buffered else load_state()
+
+            with self._lock:
+                if key in self._pending:
+                    base, current = self._pending[key]
+                elif key in self._flushing:
+                    # The database will hold the in-flight state once the current flush lands.
+                    base = current = self._flushing[key][1]
+                elif stored is not None:
+                    base = current = stored
+                else:
+                    # A flush landed between the two checks; read the database again.
+                    continue
+                liked = not current
+                seq = self.journal.append(blog_id, user_id, liked)
+                if liked == base:
+                    del self._pending[key]
+                else:
+                    self._pending[key] = (base, liked)
+                self._deltas[blog_id] += 1 if liked else -1
+                if len(self._pending) >= self.max_pending:
+                    self._wake.set()
+            # Outside the lock, so toggles arriving meanwhile share the fsync.
+            self.journal.sync(seq)
+            return liked
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch, self._pending = self._pending, {}
+                self._flushing, self._flushing_deltas = batch, dict(self._deltas)
+                self._deltas = defaultdict(int)
+                self._sealed.append(self.journal.rotate())
+
+            db = SessionLocal()
+            try:
+                blog_ids = likes_crud.apply_like_states(db, {key: liked for key, (_, liked) in batch.items()}, self.batch_size)
+            except Exception:
+                db.rollback()
+                self._failures += 1
+                if self._failures < self.max_attempts:
+                    logger.exception("Like flush failed; %d toggles stay buffered", len(batch))
+                    self._requeue(batch)
+                else:
+                    path = self.journal.dead_letter({key: liked for key, (_, liked) in batch.items()})
+                    logger.error(
+                        "Like flush failed %d times in a row; gave up on %d toggles, written to %s",
+                        self._failures, len(batch), path, exc_info=True,
+                    )
+                    self._settle()
+                return 0
+            finally:
+                db.close()
+
+            self._settle()
+            if self.on_flush:
+                self.on_flush(blog_ids)
+            return len(batch)
+
+    def _settle(self):
+        """Forget the in-flight batch and the journal segments that held it."""
+        self._failures = 0
+        with self._lock:
+            self._flushing, self._flushing_deltas = {}, {}
+            sealed, self._sealed = self._sealed, []
+        self.journal.discard(*sealed)
+
+    def _requeue(self, batch):
+        with self._lock:
+            for key, (base, liked) in batch.items():
+                newer = self._pending.get(key)
+                if newer is None:
+                    self._pending[key] = (base, liked)
+                elif newer[1] == base:
+                    del self._pending[key]
+                else:
+                    self._pending[key] = (base, newer[1])
+            for blog_id, delta in self._flushing_deltas.items():
+                self._deltas[blog_id] += delta
+            self._flushing, self._flushing_deltas = {}, {}
+
+    def recover(self):
+        segments, states = self.journal.recover()
+        if not states:
+            self.journal.discard(*segments)
+            return 0
+        db = SessionLocal()
+        try:
+            blog_ids = likes_crud.apply_like_states(db, states, self.batch_size)
+        finally:
+            db.close()
+        self.journal.discard(*segments)
+        if self.on_flush:
+            self.on_flush(blog_ids)
+        return len(states)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Like flusher iteration failed")
+
+    def start(self):
+        if not self.journal.claim():
+            raise RuntimeError(
+                f"LIKE_WRITE_BEHIND needs a single worker, but another process already buffers likes in {self.journal.directory}"
+            )
+        self.journal.open()
+        self.recover()
+        self._thread = threading.Thread(target=self._run, name="like-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+        self.journal.close()
+
+    def stats(self):
+        with self._lock:
+            return {"pending": len(self._pending), "flushing": len(self._flushing), "sealed_segments": len(self._sealed)}
@@ -0,0 +1,195 @@
+import argparse
+import sys
+import time
+from database import SessionLocal
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from crud import blogs_crud, comments_crud
+from core.config import UPLOAD_DIR
+from media import derivatives
+import bulk
+import os
+
+
+def reconcile_counters(args):
+    db = SessionLocal()
+    try:
+        updated = blogs_crud.reconcile_counters(db, args.batch_size)
+        print(f"Reconciled like/comment counters for {updated} blogs")
+    finally:
+        db.close()
+
+
+def backfill_comment_paths(args):
+    db = SessionLocal()
+    try:
+        updated = comments_crud.backfill_paths(db, args.batch_size)
+        print(f"Rebuilt thread paths and reply counts for {updated} comments")
+    finally:
+        db.close()
+
+
+def backfill_derivatives(args):
+    filenames = [
+        name for name in sorted(os.listdir(UPLOAD_DIR))
+        if os.path.isfile(os.path.join(UPLOAD_DIR, name)) and derivatives.is_image(name)
+        and (args.force or not os.path.exists(derivatives.manifest_path(name)))
+    ]
+    print(f"Generating derivatives for {len(filenames)} images with {args.workers} workers")
+    failed = 0
+    db = SessionLocal()
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = {executor.submit(derivatives.generate_derivatives, name): name for name in filenames}
+            for future in as_completed(futures):
+                if future.exception():
+                    failed += 1
+                    print(f"  failed {futures[future]}: {future.exception()}")
+                else:
+                    # New variants change the blogs' responses, so change their ETags too.
+                    blogs_crud.touch_image(db, f"/uploads/{futures[future]}")
+    finally:
+        db.close()
+    print(f"Done: {len(filenames) - failed} generated, {failed} failed")
+
+
+def open_stream(path: str, mode: str):
+    if path == "-":
+        return sys.stdout if "w" in mode else sys.stdin
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def export_rows(args):
+    fmt = bulk.detect_format(args.path, args.format)
+    db = SessionLocal()
+    stream = open_stream(args.path, "w")
+    started = time.perf_counter()
+    try:
+        exported = bulk.export_entity(db, args.entity, stream, fmt, args.batch_size)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+        db.close()
+    print(f"Exported {exported} {args.entity} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+def import_rows(args):
+    fmt = bulk.detect_format(args.path, args.format)
+    db = SessionLocal()
+    stream = open_stream(args.path, "r")
+    started = time.perf_counter()
+    try:
+        imported = bulk.import_entity(db, args.entity, bulk.read_rows(stream, fmt), args.batch_size, args.commit_every, args.no_fk_checks)
+        print(f"Imported {imported} {args.entity} in {time.perf_counter() - started:.1f}s; recomputing derived columns")
+        bulk.finalize_import(db, args.entity, args.batch_size)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        db.close()
+
+
+def explain_queries(args):
+    from database.explain import explain_endpoints
+
+    db = SessionLocal()
+    try:
+        failures = explain_endpoints(db, args.verbose)
+    finally:
+        db.close()
+    if failures:
+        print(f"{len(failures)} queries read a table without an index")
+        sys.exit(1)
+    print("Every endpoint query uses an index")
+
+
+def dispatch_outbox(args):
+    from outbox import dispatcher
+
+    if args.once:
+        total = 0
+        while True:
+            claimed = dispatcher.dispatch()
+            total += claimed
+            if claimed < dispatcher.batch_size:
+                break
+        dispatcher.connection.close()
+        print(f"Dispatched {total} emails: {dispatcher.stats()}")
+        return
+    # For deployments that set OUTBOX_DISPATCHER=false on the API workers.
+    dispatcher.start()
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        dispatcher.stop()
+
+
+def refresh_trending(args):
+    from trending import ranker
+
+    if args.rebuild:
+        print(f"Ranked {ranker.rebuild()} blogs")
+        return
+    if args.once:
+        print(f"Folded {ranker.refresh()} likes and comments into the trending scores: {ranker.stats()}")
+        return
+    # For deployments that set TRENDING_REFRESH=false on the API workers.
+    ranker.start()
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        ranker.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blog API management commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    reconcile = subparsers.add_parser("reconcile-counters", help="Recompute likes_count/comments_count from the likes and comments tables")
+    reconcile.add_argument("--batch-size", type=int, default=1000)
+    reconcile.set_defaults(func=reconcile_counters)
+
+    paths = subparsers.add_parser("backfill-comment-paths", help="Compute materialized thread paths and reply counts for existing comments")
+    paths.add_argument("--batch-size", type=int, default=1000)
+    paths.set_defaults(func=backfill_comment_paths)
+
+    backfill = subparsers.add_parser("backfill-derivatives", help="Generate thumbnails and responsive WebP/AVIF sizes for existing uploads")
+    backfill.add_argument("--workers", type=int, default=2)
+    backfill.add_argument("--force", action="store_true", help="regenerate images that already have derivatives")
+    backfill.set_defaults(func=backfill_derivatives)
+
+    export = subparsers.add_parser("export", help="Stream a table to NDJSON or CSV")
+    export.add_argument("entity", choices=sorted(bulk.ENTITIES))
+    export.add_argument("path", help="output file, or - for stdout")
+    export.add_argument("--format", choices=["ndjson", "csv"])
+    export.add_argument("--batch-size", type=int, default=5000, help="rows fetched per server-side cursor round trip")
+    export.set_defaults(func=export_rows)
+
+    load = subparsers.add_parser("import", help="Bulk insert NDJSON or CSV rows into a table")
+    load.add_argument("entity", choices=sorted(bulk.ENTITIES))
+    load.add_argument("path", help="input file, or - for stdin")
+    load.add_argument("--format", choices=["ndjson", "csv"])
+    load.add_argument("--batch-size", type=int, default=5000, help="rows per multi-row INSERT")
+    load.add_argument("--commit-every", type=int, default=10, help="batches per transaction")
+    load.add_argument("--no-fk-checks", action="store_true", help="disable MySQL unique/foreign key checks during the load")
+    load.set_defaults(func=import_rows)
+
+    explain = subparsers.add_parser("explain-queries", help="EXPLAIN each read endpoint's queries and fail on full table scans")
+    explain.add_argument("--verbose", action="store_true", help="print every query plan, not just the failing ones")
+    explain.set_defaults(func=explain_queries)
+
+    outbox = subparsers.add_parser("dispatch-outbox", help="Deliver queued emails from the outbox")
+    outbox.add_argument("--once", action="store_true", help="drain what is due now and exit instead of running until interrupted")
+    outbox.set_defaults(func=dispatch_outbox)
+
+    trending = subparsers.add_parser("refresh-trending", help="Keep the trending ranking current from recent likes and comments")
+    trending.add_argument("--once", action="store_true", help="run a single pass and exit instead of running until interrupted")
+    trending.add_argument("--rebuild", action="store_true", help="recompute every score from the window and exit")
+    trending.set_defaults(func=refresh_trending)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
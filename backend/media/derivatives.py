@@ -0,0 +1,152 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from core.config import (
+    UPLOAD_DIR, DERIVATIVE_WIDTHS, DERIVATIVE_THUMBNAIL_SIZE, DERIVATIVE_FORMATS,
+    DERIVATIVE_QUALITY, DERIVATIVE_WORKERS, DERIVATIVE_MAX_PENDING,
+)
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DERIVED_DIR = os.path.join(UPLOAD_DIR, "derived")
+IMAGE_EXTENSIONS = {"jpg", "jpeg", "png", "gif", "webp", "jfif", "bmp", "tif", "tiff", "avif"}
+
+# Manifests never change once written (uploads are content addressed), so
+# found ones are kept until evicted. Misses are remembered briefly, since the
+# pool here or in another worker may write the manifest at any time.
+MANIFEST_CACHE_MAX_ENTRIES = 4096
+MANIFEST_MISS_TTL = 30
+
+os.makedirs(DERIVED_DIR, exist_ok=True)
+
+_manifests = OrderedDict()
+_manifests_lock = threading.Lock()
+
+
+def is_image(filename: str):
+    return filename.rsplit(".", 1)[-1].lower() in IMAGE_EXTENSIONS
+
+
+def manifest_path(filename: str):
+    return os.path.join(DERIVED_DIR, f"{filename}.json")
+
+
+def _save(image, filename: str, suffix: str, formats):
+    urls = {}
+    for fmt in formats:
+        name = f"{filename}-{suffix}.{fmt}"
+        # Saving without exif/icc arguments drops the source metadata.
+        image.save(os.path.join(DERIVED_DIR, name), fmt.upper(), quality=DERIVATIVE_QUALITY)
+        urls[fmt] = f"/uploads/derived/{name}"
+    return urls
+
+
+def generate_derivatives(filename: str):
+    from PIL import Image, ImageOps, features
+
+    formats = [fmt for fmt in DERIVATIVE_FORMATS if features.check(fmt)]
+    with Image.open(os.path.join(UPLOAD_DIR, filename)) as source:
+        image = ImageOps.exif_transpose(source)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+
+    manifest = {"width": image.width, "height": image.height, "sizes": {}}
+    thumbnail = ImageOps.fit(image, (DERIVATIVE_THUMBNAIL_SIZE, DERIVATIVE_THUMBNAIL_SIZE))
+    manifest["thumbnail"] = _save(thumbnail, filename, "thumb", formats)
+    for width in sorted(DERIVATIVE_WIDTHS):
+        if width >= image.width:
+            break
+        resized = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        manifest["sizes"][str(width)] = _save(resized, filename, f"w{width}", formats)
+    manifest["sizes"][str(image.width)] = _save(image, filename, f"w{image.width}", formats)
+
+    temp_path = manifest_path(filename) + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(temp_path, manifest_path(filename))
+    return manifest
+
+
+def _read_manifest(filename: str):
+    try:
+        with open(manifest_path(filename)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def derivative_urls(image_url: str | None):
+    if not image_url or not image_url.startswith("/uploads/"):
+        return None
+    filename = image_url.rsplit("/", 1)[1]
+    now = time.monotonic()
+    with _manifests_lock:
+        entry = _manifests.get(filename)
+        if entry is not None and (entry[0] is not None or entry[1] > now):
+            _manifests.move_to_end(filename)
+            return entry[0]
+    manifest = _read_manifest(filename)
+    with _manifests_lock:
+        _manifests[filename] = (manifest, now + MANIFEST_MISS_TTL)
+        _manifests.move_to_end(filename)
+        while len(_manifests) > MANIFEST_CACHE_MAX_ENTRIES:
+            _manifests.popitem(last=False)
+    return manifest
+
+
+def forget_manifest(image_url: str):
+    with _manifests_lock:
+        _manifests.pop(image_url.rsplit("/", 1)[1], None)
+
+
+def _lower_priority():
+    try:
+        os.nice(10)
+    except OSError:
+        pass
+
+
+class DerivativePool:
+    """Runs generate_derivatives in a small process pool with a bounded backlog."""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, image_url: str | None, on_done=None):
+        if not image_url or not is_image(image_url) or os.path.exists(manifest_path(image_url.rsplit("/", 1)[1])):
+            return False
+        if not self._slots.acquire(blocking=False):
+            logger.warning("Derivative backlog full, skipping %s; run manage.py backfill-derivatives", image_url)
+            return False
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_lower_priority)
+        future = self._executor.submit(generate_derivatives, image_url.rsplit("/", 1)[1])
+        future.add_done_callback(lambda f: self._finished(f, image_url, on_done))
+        return True
+
+    def _finished(self, future, image_url: str, on_done):
+        self._slots.release()
+        if future.cancelled():
+            return
+        if future.exception():
+            logger.error("Derivative generation failed for %s: %s", image_url, future.exception())
+            return
+        forget_manifest(image_url)
+        if on_done:
+            on_done()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+pool = DerivativePool(DERIVATIVE_WORKERS, DERIVATIVE_MAX_PENDING)
@@ -0,0 +1,137 @@
+from email.utils import formatdate
+from starlette.responses import Response
+from core.config import UPLOAD_CHUNK_SIZE, MEDIA_OFFLOAD, MEDIA_OFFLOAD_PREFIX, MEDIA_MAX_AGE
+import anyio
+import mimetypes
+import os
+import re
+import stat
+
+mimetypes.add_type("image/jpeg", ".jfif")
+mimetypes.add_type("image/webp", ".webp")
+mimetypes.add_type("image/avif", ".avif")
+
+HASHED_NAME_RE = re.compile(r"^(derived/)?[0-9a-f]{64}\.")
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def route_path(scope):
+    root_path = scope.get("root_path", "")
+    path = scope["path"]
+    return path[len(root_path):] if root_path and path.startswith(root_path) else path
+
+
+def parse_range(header: str | None, size: int):
+    """Return (start, end) for a single satisfiable byte range, None to send the whole file, or False if unsatisfiable."""
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+class MediaFiles:
+    """Serves uploads with byte ranges, long-lived caching for hashed names and optional proxy offload."""
+
+    def __init__(self, directory: str, offload: str = MEDIA_OFFLOAD, offload_prefix: str = MEDIA_OFFLOAD_PREFIX, chunk_size: int = UPLOAD_CHUNK_SIZE):
+        self.directory = os.path.realpath(directory)
+        self.offload = offload
+        self.offload_prefix = offload_prefix.rstrip("/")
+        self.chunk_size = chunk_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["method"] not in ("GET", "HEAD"):
+            await Response("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})(scope, receive, send)
+            return
+        name = route_path(scope).lstrip("/")
+        path = os.path.realpath(os.path.join(self.directory, name))
+        try:
+            if not path.startswith(self.directory + os.sep):
+                raise FileNotFoundError
+            stat_result = await anyio.to_thread.run_sync(os.stat, path)
+            if not stat.S_ISREG(stat_result.st_mode):
+                raise FileNotFoundError
+        except OSError:
+            await Response("Not Found", status_code=404)(scope, receive, send)
+            return
+
+        size = stat_result.st_size
+        etag = f'"{int(stat_result.st_mtime):x}-{size:x}"'
+        headers = {
+            "content-type": mimetypes.guess_type(name)[0] or "application/octet-stream",
+            "accept-ranges": "bytes",
+            "etag": etag,
+            "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+            "cache-control": IMMUTABLE if HASHED_NAME_RE.match(name) else f"public, max-age={MEDIA_MAX_AGE}",
+        }
+        request_headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+
+        if self.offload != "none":
+            await self.send_offloaded(scope, receive, send, name, path, headers)
+            return
+
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match and etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+            await Response(status_code=304, headers=headers)(scope, receive, send)
+            return
+
+        byte_range = parse_range(request_headers.get("range"), size)
+        if_range = request_headers.get("if-range")
+        if byte_range and if_range and if_range != etag and if_range != headers["last-modified"]:
+            byte_range = None
+        if byte_range is False:
+            headers["content-range"] = f"bytes */{size}"
+            await Response(status_code=416, headers=headers)(scope, receive, send)
+            return
+
+        status = 200
+        start, end = 0, size - 1
+        if byte_range:
+            status = 206
+            start, end = byte_range
+            headers["content-range"] = f"bytes {start}-{end}/{size}"
+        headers["content-length"] = str(end - start + 1)
+
+        raw_headers = [(key.encode("latin-1"), value.encode("latin-1")) for key, value in headers.items()]
+        await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+        if scope["method"] == "HEAD" or size == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        await self.send_file(scope, send, path, start, end - start + 1)
+
+    async def send_file(self, scope, send, path: str, offset: int, count: int):
+        extensions = scope.get("extensions") or {}
+        async with await anyio.open_file(path, mode="rb") as file:
+            if "http.response.zerocopysend" in extensions:
+                await send({"type": "http.response.zerocopysend", "file": file.wrapped, "offset": offset, "count": count})
+                return
+            await file.seek(offset)
+            remaining = count
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def send_offloaded(self, scope, receive, send, name: str, path: str, headers: dict):
+        # The front proxy re-reads the file and handles ranges and conditional requests itself.
+        if self.offload == "x-accel":
+            headers["x-accel-redirect"] = f"{self.offload_prefix}/{name}"
+        else:
+            headers["x-sendfile"] = path
+        headers.pop("accept-ranges")
+        await Response(status_code=200, headers=headers)(scope, receive, send)
@@ -0,0 +1,238 @@
+from contextlib import asynccontextmanager
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+from core.config import (
+    UPLOAD_DIR, UPLOAD_TMP_DIR, UPLOAD_CHUNK_SIZE, MAX_IMAGE_SIZE, MAX_VIDEO_SIZE, UPLOAD_SESSION_TTL, UPLOAD_SWEEP_INTERVAL,
+)
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import secrets
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MAX_SIZES = {"image": MAX_IMAGE_SIZE, "video": MAX_VIDEO_SIZE}
+STORED_URL_RE = re.compile(r"^/uploads/[0-9a-f]{64}\.[a-z0-9]{1,10}$")
+SESSION_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+os.makedirs(UPLOAD_TMP_DIR, exist_ok=True)
+
+# session id -> [lock, requests holding or waiting for it]; entries go away
+# with their last user, so only sessions with a request in flight have one.
+_session_locks = {}
+
+
+class UploadError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def extension(filename: str | None):
+    ext = os.path.splitext(filename or "")[1].lower().lstrip(".")
+    return ext if re.fullmatch(r"[a-z0-9]{1,10}", ext) else "bin"
+
+
+def _commit(temp_path: str, digest: str, ext: str):
+    name = f"{digest}.{ext}"
+    final_path = os.path.join(UPLOAD_DIR, name)
+    if os.path.exists(final_path):
+        os.remove(temp_path)
+    else:
+        os.replace(temp_path, final_path)
+    return f"/uploads/{name}"
+
+
+async def save_upload(upload: UploadFile, kind: str):
+    max_size = MAX_SIZES[kind]
+    temp_path = os.path.join(UPLOAD_TMP_DIR, secrets.token_hex(16) + ".part")
+    digest = hashlib.sha256()
+    size = 0
+    f = await run_in_threadpool(open, temp_path, "wb")
+    try:
+        while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_size:
+                raise UploadError(413, f"{kind.capitalize()} exceeds the {max_size} byte limit")
+            digest.update(chunk)
+            await run_in_threadpool(f.write, chunk)
+    except BaseException:
+        await run_in_threadpool(f.close)
+        os.remove(temp_path)
+        raise
+    await run_in_threadpool(f.close)
+    return await run_in_threadpool(_commit, temp_path, digest.hexdigest(), extension(upload.filename))
+
+
+def is_stored_media(url: str | None):
+    return bool(url) and bool(STORED_URL_RE.match(url)) and os.path.exists(os.path.join(UPLOAD_DIR, url.rsplit("/", 1)[1]))
+
+
+def _session_paths(session_id: str):
+    if not SESSION_ID_RE.match(session_id):
+        raise UploadError(404, "Upload not found")
+    base = os.path.join(UPLOAD_TMP_DIR, session_id)
+    return base + ".json", base + ".part"
+
+
+def _load_session(session_id: str, user_id: int):
+    meta_path, part_path = _session_paths(session_id)
+    try:
+        with open(meta_path) as f:
+            session = json.load(f)
+    except FileNotFoundError:
+        raise UploadError(404, "Upload not found")
+    if session["user_id"] != user_id:
+        raise UploadError(403, "Not authorized")
+    session["offset"] = os.path.getsize(part_path)
+    return session
+
+
+def create_session(user_id: int, filename: str, size: int, kind: str):
+    if kind not in MAX_SIZES:
+        raise UploadError(400, "kind must be 'image' or 'video'")
+    if size <= 0 or size > MAX_SIZES[kind]:
+        raise UploadError(413, f"{kind.capitalize()} exceeds the {MAX_SIZES[kind]} byte limit")
+    session_id = secrets.token_hex(16)
+    meta_path, part_path = _session_paths(session_id)
+    session = {"id": session_id, "user_id": user_id, "filename": filename, "size": size, "kind": kind}
+    open(part_path, "wb").close()
+    with open(meta_path, "w") as f:
+        json.dump(session, f)
+    return {**session, "offset": 0}
+
+
+def get_session(session_id: str, user_id: int):
+    return _load_session(session_id, user_id)
+
+
+@asynccontextmanager
+async def _session_lock(session_id: str):
+    entry = _session_locks.setdefault(session_id, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if not entry[1]:
+            del _session_locks[session_id]
+
+
+async def append_chunk(session_id: str, user_id: int, offset: int, stream):
+    async with _session_lock(session_id):
+        session = await run_in_threadpool(_load_session, session_id, user_id)
+        if offset != session["offset"]:
+            raise UploadError(409, f"Upload is at offset {session['offset']}")
+        _, part_path = _session_paths(session_id)
+        written = session["offset"]
+        f = await run_in_threadpool(open, part_path, "ab")
+        try:
+            async for chunk in stream:
+                written += len(chunk)
+                if written > session["size"]:
+                    await run_in_threadpool(f.truncate, session["offset"])
+                    raise UploadError(413, "Chunk runs past the declared upload size")
+                await run_in_threadpool(f.write, chunk)
+        finally:
+            await run_in_threadpool(f.close)
+        return {**session, "offset": written}
+
+
+def _hash_file(path: str):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def complete_session(session_id: str, user_id: int):
+    async with _session_lock(session_id):
+        session = await run_in_threadpool(_load_session, session_id, user_id)
+        if session["offset"] != session["size"]:
+            raise UploadError(409, f"Upload is at offset {session['offset']} of {session['size']}")
+        meta_path, part_path = _session_paths(session_id)
+        digest = await run_in_threadpool(_hash_file, part_path)
+        url = await run_in_threadpool(_commit, part_path, digest, extension(session["filename"]))
+        os.remove(meta_path)
+    return {"url": url, "size": session["size"], "kind": session["kind"]}
+
+
+def _remove(*paths: str):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def sweep_stale(max_age: float, now: float | None = None):
+    """Delete upload sessions and temp files untouched for ``max_age`` seconds.
+
+    A session's .part file is modified by every chunk, so its mtime is the
+    session's last activity; .part files without metadata are save_upload
+    spools left behind by a crashed worker. Returns how many were removed.
+    """
+    cutoff = (now or time.time()) - max_age
+    removed = 0
+    for name in os.listdir(UPLOAD_TMP_DIR):
+        base, ext = os.path.splitext(os.path.join(UPLOAD_TMP_DIR, name))
+        try:
+            if ext == ".part":
+                stale = os.path.getmtime(base + ".part") < cutoff
+            elif ext == ".json":
+                # Metadata whose .part is already gone.
+                stale = not os.path.exists(base + ".part") and os.path.getmtime(base + ".json") < cutoff
+            else:
+                continue
+        except FileNotFoundError:
+            continue
+        if stale:
+            _remove(base + ".part", base + ".json")
+            removed += 1
+    return removed
+
+
+class SessionSweeper:
+    """Runs sweep_stale every ``interval`` seconds on a background thread."""
+
+    def __init__(self, max_age: float, interval: float):
+        self.max_age = max_age
+        self.interval = interval
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            try:
+                removed = sweep_stale(self.max_age)
+            except OSError as exc:
+                logger.warning("Upload sweep failed: %s", exc)
+                continue
+            if removed:
+                logger.info("Removed %d stale uploads", removed)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="upload-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+
+
+sweeper = SessionSweeper(UPLOAD_SESSION_TTL, UPLOAD_SWEEP_INTERVAL)
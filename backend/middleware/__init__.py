@@ -1 +1,5 @@
-from .cors import setup_cors
\ No newline at end of file
+from .cors import setup_cors
+from .profiling import QueryProfilingMiddleware
+from .compression import CompressionMiddleware
+from .consistency import ReadYourWritesMiddleware
+from .body_limit import BodySizeLimitMiddleware
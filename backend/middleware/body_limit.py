@@ -0,0 +1,43 @@
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+from core.config import MAX_REQUEST_SIZE
+
+
+class BodySizeLimitMiddleware:
+    """Refuses request bodies larger than ``max_size`` bytes as they arrive.
+
+    Form parsing spools every uploaded file before the endpoint runs, so the
+    per-file limits in media.uploads only apply once the whole body is on disk.
+    A Content-Length over the limit is answered with 413 before any of the body
+    is read; a body without one is counted as it streams and fails with 413 as
+    soon as it passes the limit.
+    """
+
+    def __init__(self, app, max_size: int = MAX_REQUEST_SIZE):
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Request body exceeds the {self.max_size} byte limit"
+        length = Headers(scope=scope).get("content-length")
+        if length is not None and length.isdigit() and int(length) > self.max_size:
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_size:
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,162 @@
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+from media.serving import route_path
+from core.config import (
+    COMPRESSION_ENCODINGS, COMPRESSION_MIN_SIZE, COMPRESSION_EXCLUDE_PATHS,
+    COMPRESSION_GZIP_LEVEL, COMPRESSION_BROTLI_QUALITY, COMPRESSION_ZSTD_LEVEL,
+)
+
+try:
+    import brotli
+except ImportError:  # br is only offered when the brotli package is installed
+    brotli = None
+try:
+    import zstandard
+except ImportError:  # likewise for zstd
+    zstandard = None
+
+COMPRESSIBLE_TYPES = {"application/json", "application/x-ndjson", "application/javascript", "application/xml", "image/svg+xml"}
+# Bodies that are not worth compressing or whose headers would no longer describe them.
+SKIP_STATUSES = {204, 206, 304}
+
+
+class GzipEncoder:
+    def __init__(self, level: int = COMPRESSION_GZIP_LEVEL):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool):
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class BrotliEncoder:
+    def __init__(self, quality: int = COMPRESSION_BROTLI_QUALITY):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, final: bool):
+        return self._compressor.process(data) + (self._compressor.finish() if final else self._compressor.flush())
+
+
+class ZstdEncoder:
+    def __init__(self, level: int = COMPRESSION_ZSTD_LEVEL):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, final: bool):
+        mode = zstandard.COMPRESSOBJ_FLUSH_FINISH if final else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        return self._compressor.compress(data) + self._compressor.flush(mode)
+
+
+ENCODERS = {"gzip": GzipEncoder}
+if brotli is not None:
+    ENCODERS["br"] = BrotliEncoder
+if zstandard is not None:
+    ENCODERS["zstd"] = ZstdEncoder
+
+
+def negotiate(accept_encoding: str, encodings):
+    """Return the encoding the client weights highest, ties going to the earlier one in ``encodings``."""
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+    best, best_weight = None, 0.0
+    for encoding in encodings:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compressible(content_type: str | None):
+    if not content_type:
+        return False
+    mime = content_type.split(";", 1)[0].strip().lower()
+    if mime == "text/event-stream":
+        # Events must reach the client as they are sent, not when a compressor block fills.
+        return False
+    return mime.startswith("text/") or mime in COMPRESSIBLE_TYPES or mime.endswith(("+json", "+xml"))
+
+
+class CompressionMiddleware:
+    """Compresses text-like responses with the best encoding both sides support.
+
+    A body sent in a single message is compressed only if it is at least
+    ``min_size`` bytes. A streamed body is compressed chunk by chunk and
+    flushed after each one, so nothing is held back beyond the current chunk.
+    Responses that are already encoded, partial, not text-like or under an
+    excluded path (uploaded media) pass through untouched.
+    """
+
+    def __init__(self, app, encodings=COMPRESSION_ENCODINGS, min_size: int = COMPRESSION_MIN_SIZE, exclude_paths=COMPRESSION_EXCLUDE_PATHS):
+        self.app = app
+        self.encodings = [encoding.strip() for encoding in encodings if encoding.strip() in ENCODERS]
+        self.min_size = min_size
+        self.exclude_paths = tuple(path for path in exclude_paths if path)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD" or route_path(scope).startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        encoder = None
+
+        async def send_compressed(message):
+            nonlocal start, encoder
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                if start is not None:
+                    await send(start)
+                    start = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                start["headers"] = list(start.get("headers", []))
+                headers = MutableHeaders(scope=start)
+                if (
+                    start["status"] in SKIP_STATUSES
+                    or "content-encoding" in headers
+                    or not compressible(headers.get("content-type"))
+                    or (not more_body and len(body) < self.min_size)
+                ):
+                    await send(start)
+                    start = None
+                    await send(message)
+                    return
+                encoder = ENCODERS[encoding]()
+                headers["content-encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["etag"] = "W/" + etag
+                body = encoder.compress(body, final=not more_body)
+                if more_body:
+                    del headers["content-length"]
+                else:
+                    headers["content-length"] = str(len(body))
+                await send(start)
+                start = None
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+
+            if encoder is None:
+                await send(message)
+                return
+            await send({"type": "http.response.body", "body": encoder.compress(body, final=not more_body), "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
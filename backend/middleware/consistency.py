@@ -0,0 +1,78 @@
+import hashlib
+import hmac
+import time
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from database.replicas import read_your_writes
+from core.config import READ_YOUR_WRITES_WINDOW
+from core.security import SECRET_KEY
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+MARKER_COOKIE = "read_primary_until"
+MARKER_HEADER = "x-read-primary-until"
+
+
+def marker_signature(until: str):
+    return hmac.new(SECRET_KEY.encode(), f"{MARKER_COOKIE}:{until}".encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def make_marker(until: float):
+    until = f"{until:.3f}"
+    return f"{until}:{marker_signature(until)}"
+
+
+def marker_fresh(value: str | None, window: float = READ_YOUR_WRITES_WINDOW):
+    """True for a marker this server signed that has not expired.
+
+    Unsigned or forged markers, and any naming a time further ahead than one
+    window, are ignored, so a client cannot pin its reads to the primary.
+    """
+    if not value:
+        return False
+    until, _, signature = value.partition(":")
+    if not hmac.compare_digest(signature, marker_signature(until)):
+        return False
+    try:
+        now = time.time()
+        return now < float(until) <= now + window
+    except ValueError:
+        return False
+
+
+class ReadYourWritesMiddleware:
+    """Keeps a client's reads on the primary for ``window`` seconds after it writes.
+
+    A successful write (any method but GET, HEAD and OPTIONS) answers with a
+    cookie and a header holding the signed time until which the client's reads
+    should skip the replicas. A request carrying an unexpired marker, as that cookie or
+    echoed back in the header by clients that do not keep cookies, sets
+    ``read_your_writes`` so get_read_db uses the primary and cached responses,
+    which may have been filled from a lagging replica, are bypassed.
+    """
+
+    def __init__(self, app, window: float = READ_YOUR_WRITES_WINDOW):
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        connection = HTTPConnection(scope)
+        fresh = marker_fresh(connection.cookies.get(MARKER_COOKIE), self.window) or marker_fresh(connection.headers.get(MARKER_HEADER), self.window)
+        token = read_your_writes.set(fresh)
+
+        async def send_with_marker(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = make_marker(time.time() + self.window)
+                message["headers"] = list(message.get("headers", []))
+                headers = MutableHeaders(scope=message)
+                headers.append("set-cookie", f"{MARKER_COOKIE}={until}; Max-Age={int(self.window) + 1}; Path=/; HttpOnly; SameSite=Lax")
+                headers[MARKER_HEADER] = until
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send if scope["method"] in SAFE_METHODS else send_with_marker)
+        finally:
+            read_your_writes.reset(token)
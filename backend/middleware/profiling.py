@@ -0,0 +1,46 @@
+import logging
+import time
+from database.instrumentation import RequestProfile, request_profile, metrics
+from core.config import SERVER_TIMING
+
+logger = logging.getLogger(__name__)
+
+
+class QueryProfilingMiddleware:
+    """Attributes SQL statements to the route that issued them.
+
+    Sets a RequestProfile for the engine listeners in database.instrumentation,
+    records per-route totals when the request finishes, optionally reports the
+    DB time in a Server-Timing header, and in DB_PROFILE_DEBUG mode logs
+    statements repeated within one request.
+    """
+
+    def __init__(self, app, server_timing: bool = SERVER_TIMING):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope)
+        token = request_profile.set(profile)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and self.server_timing:
+                elapsed = (time.perf_counter() - started) * 1000
+                timing = f'db;dur={profile.db_time * 1000:.1f};desc="{profile.statements} queries", app;dur={elapsed:.1f}'
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"server-timing", timing.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_profile.reset(token)
+            repeated = profile.repeated_statements()
+            for statement, count in repeated:
+                logger.warning("Possible N+1 on %s %s: %d x %s", scope["method"], profile.route, count, " ".join(statement.split())[:300])
+            metrics.record_request(scope["method"], profile, time.perf_counter() - started, len(repeated))
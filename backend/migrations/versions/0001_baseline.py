@@ -0,0 +1,70 @@
+"""Baseline schema as created by Base.metadata.create_all before migrations existed
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 15:00:00
+
+Databases that were created by the old create_all call at import time already
+have these tables; mark them with ``alembic stamp 0001`` instead of running this.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("username", sa.String(100), nullable=False, unique=True),
+        sa.Column("email", sa.String(150), nullable=False, unique=True),
+        sa.Column("password", sa.String(255), nullable=False),
+        sa.Column("otp", sa.String(6), nullable=True),
+        sa.Column("otp_expires", sa.String(50), nullable=True),
+        sa.Column("reset_token", sa.String(255), nullable=True),
+        sa.Column("reset_expires", sa.String(50), nullable=True),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+
+    op.create_table(
+        "blogs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("image_url", sa.String(255), nullable=True),
+        sa.Column("video_url", sa.String(255), nullable=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+    op.create_index("ix_blogs_id", "blogs", ["id"])
+
+    op.create_table(
+        "comments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("blog_id", sa.Integer(), sa.ForeignKey("blogs.id"), nullable=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("parent_comment_id", sa.Integer(), sa.ForeignKey("comments.id"), nullable=True),
+    )
+    op.create_index("ix_comments_id", "comments", ["id"])
+
+    op.create_table(
+        "likes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("blog_id", sa.Integer(), sa.ForeignKey("blogs.id"), nullable=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.UniqueConstraint("blog_id", "user_id", name="unique_blog_like"),
+    )
+    op.create_index("ix_likes_id", "likes", ["id"])
+
+
+def downgrade():
+    op.drop_table("likes")
+    op.drop_table("comments")
+    op.drop_table("blogs")
+    op.drop_table("users")
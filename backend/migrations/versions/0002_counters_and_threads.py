@@ -0,0 +1,62 @@
+"""Denormalized counters, revalidation versions, token versions and comment thread paths
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 15:00:00
+
+Run manage.py reconcile-counters and manage.py backfill-comment-paths after
+upgrading a database that already has blogs and comments.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def recreate():
+    # SQLite cannot ADD COLUMN with a CURRENT_TIMESTAMP default; rebuild the table there.
+    return "always" if op.get_bind().dialect.name == "sqlite" else "auto"
+
+
+def upgrade():
+    with op.batch_alter_table("blogs", recreate=recreate()) as batch:
+        batch.add_column(sa.Column("likes_count", sa.Integer(), nullable=False, server_default="0"))
+        batch.add_column(sa.Column("comments_count", sa.Integer(), nullable=False, server_default="0"))
+        batch.add_column(sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+        batch.add_column(sa.Column("comments_version", sa.Integer(), nullable=False, server_default="0"))
+        batch.add_column(sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True))
+    op.create_index("ix_blogs_likes_count", "blogs", ["likes_count", "id"])
+    op.create_index("ix_blogs_fulltext", "blogs", ["title", "content"], mysql_prefix="FULLTEXT")
+
+    with op.batch_alter_table("users") as batch:
+        batch.add_column(sa.Column("token_version", sa.Integer(), nullable=False, server_default="0"))
+
+    with op.batch_alter_table("comments") as batch:
+        batch.add_column(sa.Column("path", sa.String(700), nullable=False, server_default=""))
+        batch.add_column(sa.Column("reply_count", sa.Integer(), nullable=False, server_default="0"))
+    op.create_index("ix_comments_blog_path", "comments", ["blog_id", "path"])
+    op.create_index("ix_comments_blog_parent", "comments", ["blog_id", "parent_comment_id", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_comments_blog_parent", table_name="comments")
+    op.drop_index("ix_comments_blog_path", table_name="comments")
+    with op.batch_alter_table("comments") as batch:
+        batch.drop_column("reply_count")
+        batch.drop_column("path")
+
+    with op.batch_alter_table("users") as batch:
+        batch.drop_column("token_version")
+
+    op.drop_index("ix_blogs_fulltext", table_name="blogs")
+    op.drop_index("ix_blogs_likes_count", table_name="blogs")
+    with op.batch_alter_table("blogs") as batch:
+        batch.drop_column("updated_at")
+        batch.drop_column("comments_version")
+        batch.drop_column("version")
+        batch.drop_column("comments_count")
+        batch.drop_column("likes_count")
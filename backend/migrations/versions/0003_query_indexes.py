@@ -0,0 +1,33 @@
+"""Secondary indexes for the listing, per-author, comment and password-reset queries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 15:00:00
+"""
+from alembic import op
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # get_blogs_filtered / get_blogs_after order by (sort column, id).
+    op.create_index("ix_blogs_created_at", "blogs", ["created_at", "id"])
+    op.create_index("ix_blogs_title", "blogs", ["title", "id"])
+    # get_blogs_by_user.
+    op.create_index("ix_blogs_user_id", "blogs", ["user_id", "id"])
+    # Reply lookups and the self-referencing foreign key on comment deletes.
+    op.create_index("ix_comments_parent", "comments", ["parent_comment_id"])
+    # verify_reset_token.
+    op.create_index("ix_users_reset_token", "users", ["reset_token"])
+
+
+def downgrade():
+    op.drop_index("ix_users_reset_token", table_name="users")
+    op.drop_index("ix_comments_parent", table_name="comments")
+    op.drop_index("ix_blogs_user_id", table_name="blogs")
+    op.drop_index("ix_blogs_title", table_name="blogs")
+    op.drop_index("ix_blogs_created_at", table_name="blogs")
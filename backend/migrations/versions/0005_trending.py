@@ -0,0 +1,65 @@
+"""Like and comment timestamps, and the materialized trending ranking
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 21:00:00
+
+Likes and comments made before this revision keep a NULL created_at: their
+real times are unknown, and stamping them all with the upgrade time would make
+every blog look hot at once. The first trending pass after upgrading builds
+blog_trending from whatever falls in the window.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def recreate():
+    # SQLite cannot ADD COLUMN with a CURRENT_TIMESTAMP default; rebuild the table there.
+    return "always" if op.get_bind().dialect.name == "sqlite" else "auto"
+
+
+def upgrade():
+    for table in ("likes", "comments"):
+        # Add the column bare so existing rows stay NULL, then give new rows a default.
+        with op.batch_alter_table(table) as batch:
+            batch.add_column(sa.Column("created_at", sa.DateTime(timezone=True), nullable=True))
+        with op.batch_alter_table(table, recreate=recreate()) as batch:
+            batch.alter_column("created_at", existing_type=sa.DateTime(timezone=True), nullable=True, server_default=sa.func.now())
+        op.create_index(f"ix_{table}_created_at", table, ["created_at"])
+
+    op.create_table(
+        "blog_trending",
+        sa.Column("blog_id", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(["blog_id"], ["blogs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("blog_id"),
+    )
+    op.create_index("ix_blog_trending_score", "blog_trending", ["score", "blog_id"])
+
+    state = op.create_table(
+        "trending_state",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("last_like_id", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_comment_id", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("ranked", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("rebuilt_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.bulk_insert(state, [{"id": 1, "last_like_id": 0, "last_comment_id": 0, "ranked": 0}])
+
+
+def downgrade():
+    op.drop_table("trending_state")
+    op.drop_index("ix_blog_trending_score", table_name="blog_trending")
+    op.drop_table("blog_trending")
+    for table in ("comments", "likes"):
+        op.drop_index(f"ix_{table}_created_at", table_name=table)
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column("created_at")
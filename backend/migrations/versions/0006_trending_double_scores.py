@@ -0,0 +1,37 @@
+"""Store trending scores as double precision, relative to a recent epoch
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 10:00:00
+
+A plain FLOAT is four bytes on MySQL, too coarse for scores that sit in the
+thousands and must still compare equal when a cursor hands one back. Scores
+are also now measured from trending_crud.SCORE_EPOCH instead of 1970, so the
+stored ones are dropped and the trending state reset: the next pass rebuilds
+the ranking from the likes and comments inside the window.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def reset():
+    op.execute("DELETE FROM blog_trending")
+    op.execute("UPDATE trending_state SET last_like_id = 0, last_comment_id = 0, ranked = 0, rebuilt_at = NULL")
+
+
+def upgrade():
+    reset()
+    with op.batch_alter_table("blog_trending") as batch:
+        batch.alter_column("score", existing_type=sa.Float(), type_=sa.Double(), existing_nullable=False)
+
+
+def downgrade():
+    reset()
+    with op.batch_alter_table("blog_trending") as batch:
+        batch.alter_column("score", existing_type=sa.Double(), type_=sa.Float(), existing_nullable=False)
@@ -1,4 +1,6 @@
 from .blogs import Blog
 from .user import User
 from .comments import Comment
-from .likes import Like
\ No newline at end of file
+from .likes import Like
+from .outbox import OutboxMessage
+from .trending import BlogTrending, TrendingState
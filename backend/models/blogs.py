@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -13,7 +13,20 @@ class Blog(Base):
     video_url = Column(String(255), nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    likes_count = Column(Integer, nullable=False, default=0, server_default="0")
+    comments_count = Column(Integer, nullable=False, default=0, server_default="0")
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    comments_version = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     author = relationship("User", back_populates="blogs")
     comments = relationship("Comment", back_populates="blog")
     likes = relationship("Like", back_populates="blog")
+
+    __table_args__ = (
+        Index("ix_blogs_created_at", "created_at", "id"),
+        Index("ix_blogs_title", "title", "id"),
+        Index("ix_blogs_likes_count", "likes_count", "id"),
+        Index("ix_blogs_user_id", "user_id", "id"),
+        Index("ix_blogs_fulltext", "title", "content", mysql_prefix="FULLTEXT"),
+    )
@@ -1,7 +1,27 @@
-from sqlalchemy import Column, Integer, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Index, DateTime
 from sqlalchemy.orm import relationship, backref
+from sqlalchemy.sql import func
 from database import Base
 
+PATH_SEGMENT = 9
+MAX_PATH_LENGTH = 700
+MAX_DEPTH = MAX_PATH_LENGTH // PATH_SEGMENT
+
+
+def path_segment(comment_id: int):
+    return f"{comment_id:08x}/"
+
+
+def subtree_end(path: str):
+    """Smallest path sorting after every descendant of ``path``.
+
+    Paths hold only hex digits and "/", and "/" sorts before "0" both
+    bytewise and under MySQL's accent/case-insensitive collations, so
+    bumping the trailing "/" to "0" bounds the subtree whatever the collation.
+    """
+    return path[:-1] + "0"
+
+
 class Comment(Base):
     __tablename__ = "comments"
 
@@ -10,7 +30,24 @@ class Comment(Base):
     blog_id = Column(Integer, ForeignKey("blogs.id"))
     user_id = Column(Integer, ForeignKey("users.id"))
     parent_comment_id = Column(Integer, ForeignKey("comments.id"), nullable=True)
+    # Materialized path of fixed-width hex ids from the thread root down to this
+    # comment, so a subtree is one range scan on (blog_id, path) in display order.
+    path = Column(String(MAX_PATH_LENGTH), nullable=False, default="", server_default="")
+    reply_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # NULL for comments made before the column existed, as for likes.
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=True)
 
     blog = relationship("Blog", back_populates="comments")
     user = relationship("User", back_populates="comments")
     replies = relationship("Comment", backref=backref('parent', remote_side=[id]))
+
+    __table_args__ = (
+        Index("ix_comments_blog_path", "blog_id", "path"),
+        Index("ix_comments_blog_parent", "blog_id", "parent_comment_id", "id"),
+        Index("ix_comments_parent", "parent_comment_id"),
+        Index("ix_comments_created_at", "created_at"),
+    )
+
+    @property
+    def depth(self):
+        return len(self.path) // PATH_SEGMENT - 1
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint, DateTime, Index
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from database import Base
 
 class Like(Base):
@@ -8,8 +9,13 @@ class Like(Base):
     id = Column(Integer, primary_key=True, index=True)
     blog_id = Column(Integer, ForeignKey("blogs.id"))
     user_id = Column(Integer, ForeignKey("users.id"))
+    # NULL for likes made before the column existed; those never count towards trending.
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=True)
 
     blog = relationship("Blog", back_populates="likes")
     user = relationship("User", back_populates="likes")
 
-    __table_args__ = (UniqueConstraint("blog_id", "user_id", name="unique_blog_like"),)
+    __table_args__ = (
+        UniqueConstraint("blog_id", "user_id", name="unique_blog_like"),
+        Index("ix_likes_created_at", "created_at"),
+    )
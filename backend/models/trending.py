@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, Double, ForeignKey, DateTime, Index
+from sqlalchemy.sql import func
+from database import Base
+
+class BlogTrending(Base):
+    __tablename__ = "blog_trending"
+
+    blog_id = Column(Integer, ForeignKey("blogs.id", ondelete="CASCADE"), primary_key=True)
+    # Natural log of the blog's decayed activity scaled to SCORE_EPOCH in
+    # crud.trending_crud: each like or comment adds weight * e^(rate * age from
+    # the epoch). Every score decays at the same rate, so ordering by this
+    # column is ordering by current heat without rewriting rows as time passes.
+    # Double precision, so cursors can compare scores for equality.
+    score = Column(Double, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (Index("ix_blog_trending_score", "score", "blog_id"),)
+
+
+class TrendingState(Base):
+    __tablename__ = "trending_state"
+
+    id = Column(Integer, primary_key=True)
+    # Highest like and comment ids already folded into blog_trending.
+    last_like_id = Column(Integer, nullable=False, default=0, server_default="0")
+    last_comment_id = Column(Integer, nullable=False, default=0, server_default="0")
+    # Rows in blog_trending, kept by the ranker so listings need not count them.
+    ranked = Column(Integer, nullable=False, default=0, server_default="0")
+    rebuilt_at = Column(DateTime, nullable=True)
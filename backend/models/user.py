@@ -11,8 +11,9 @@ class User(Base):
     password = Column(String(255), nullable=False)
     otp = Column(String(6), nullable=True)
     otp_expires = Column(String(50), nullable=True)
-    reset_token = Column(String(255), nullable=True)
+    reset_token = Column(String(255), nullable=True, index=True)
     reset_expires = Column(String(50), nullable=True)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     blogs = relationship("Blog", back_populates="author")
     comments = relationship("Comment", back_populates="user")
@@ -0,0 +1,17 @@
+from core.config import (
+    conf, OUTBOX_POLL_INTERVAL, OUTBOX_BATCH_SIZE, OUTBOX_MAX_ATTEMPTS, OUTBOX_BACKOFF, OUTBOX_BACKOFF_MAX,
+    OUTBOX_LEASE, OUTBOX_SMTP_IDLE_TIMEOUT, OUTBOX_RETENTION_DAYS,
+)
+from .smtp import SmtpConnection
+from .dispatcher import OutboxDispatcher
+
+dispatcher = OutboxDispatcher(
+    SmtpConnection(conf, OUTBOX_SMTP_IDLE_TIMEOUT),
+    OUTBOX_POLL_INTERVAL,
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_BACKOFF,
+    OUTBOX_BACKOFF_MAX,
+    OUTBOX_LEASE,
+    OUTBOX_RETENTION_DAYS,
+)
@@ -0,0 +1,118 @@
+import datetime
+import logging
+import smtplib
+import threading
+import time
+from database import SessionLocal
+from crud import outbox_crud
+
+logger = logging.getLogger(__name__)
+
+
+def classify(error: Exception):
+    """Return "permanent" for a rejected message, "message" for a transient per-message
+    failure and "connection" when the session itself failed."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return "permanent"
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, smtplib.SMTPAuthenticationError)):
+        return "connection"
+    if isinstance(error, smtplib.SMTPResponseException):
+        return "permanent" if error.smtp_code >= 500 else "message"
+    return "connection"
+
+
+class OutboxDispatcher:
+    """Delivers rows of the email_outbox table from a background thread.
+
+    Each pass leases up to ``batch_size`` due messages and sends them over one
+    reused SMTP session. While passes come back full it keeps going, so a burst
+    drains without waiting for the poll interval. A failed message is retried
+    with jittered exponential backoff until ``max_attempts``. A broken session
+    ends the batch and returns the untried messages to the queue. Leases let
+    several processes share the table, and let another process pick up the
+    rows of one that died mid-batch.
+    """
+
+    def __init__(self, connection, interval: float, batch_size: int, max_attempts: int, backoff: float, backoff_max: float, lease: float, retention_days: int):
+        self.connection = connection
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.lease = lease
+        self.retention_days = retention_days
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._purged_at = 0.0
+        self._stats = {"sent": 0, "retried": 0, "failed": 0, "batches": 0, "lease_lost": 0}
+
+    def notify(self):
+        self._wake.set()
+
+    def dispatch(self):
+        """Send one batch; returns how many messages were claimed."""
+        db = SessionLocal()
+        try:
+            messages = outbox_crud.claim_due(db, self.batch_size, self.lease)
+            if not messages:
+                return 0
+            sent, failed, released = [], [], []
+            for position, message in enumerate(messages):
+                try:
+                    self.connection.send(self.connection.message(message.recipient, message.subject, message.body))
+                    sent.append(message)
+                except (smtplib.SMTPException, OSError) as e:
+                    kind = classify(e)
+                    failed.append((message, e, kind == "permanent"))
+                    if kind == "connection":
+                        logger.warning("SMTP session failed, releasing %d queued emails: %s", len(messages) - position - 1, e)
+                        released = messages[position + 1:]
+                        break
+            retried, gave_up, skipped = outbox_crud.record_results(db, sent, failed, released, self.max_attempts, self.backoff, self.backoff_max)
+            if skipped:
+                logger.warning("Lease on %d of %d emails expired mid-batch; left them to their new claimant", skipped, len(messages))
+            self._stats["batches"] += 1
+            self._stats["sent"] += len(sent)
+            self._stats["retried"] += retried
+            self._stats["failed"] += gave_up
+            self._stats["lease_lost"] += skipped
+            return len(messages)
+        finally:
+            db.close()
+
+    def purge(self):
+        db = SessionLocal()
+        try:
+            return outbox_crud.purge_sent(db, datetime.datetime.now() - datetime.timedelta(days=self.retention_days))
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                while self.dispatch() == self.batch_size and not self._stopping.is_set():
+                    pass
+                if time.monotonic() - self._purged_at > 3600:
+                    self.purge()
+                    self._purged_at = time.monotonic()
+            except Exception:
+                logger.exception("Outbox dispatch failed")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+        self.connection.close()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="outbox-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self):
+        return {**self._stats, "smtp_connects": self.connection.connects}
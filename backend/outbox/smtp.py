@@ -0,0 +1,69 @@
+from email.message import EmailMessage
+import smtplib
+import ssl
+import time
+
+
+class SmtpConnection:
+    """A single SMTP session reused across messages.
+
+    The session is opened on first use and kept between batches. It is
+    reopened after an error, or when it has been idle longer than
+    ``idle_timeout`` (servers drop idle clients after a while).
+    """
+
+    def __init__(self, conf, idle_timeout: float):
+        self.conf = conf
+        self.idle_timeout = idle_timeout
+        self._server = None
+        self._last_used = 0.0
+        self.connects = 0
+
+    def _connect(self):
+        conf = self.conf
+        if conf.MAIL_SSL_TLS:
+            server = smtplib.SMTP_SSL(conf.MAIL_SERVER, conf.MAIL_PORT, timeout=conf.TIMEOUT, context=ssl.create_default_context())
+        else:
+            server = smtplib.SMTP(conf.MAIL_SERVER, conf.MAIL_PORT, timeout=conf.TIMEOUT)
+            if conf.MAIL_STARTTLS:
+                server.starttls(context=ssl.create_default_context())
+        if conf.USE_CREDENTIALS and conf.MAIL_USERNAME:
+            password = conf.MAIL_PASSWORD
+            server.login(conf.MAIL_USERNAME, password.get_secret_value() if hasattr(password, "get_secret_value") else password)
+        self.connects += 1
+        return server
+
+    def message(self, recipient: str, subject: str, body: str):
+        message = EmailMessage()
+        message["From"] = f"{self.conf.MAIL_FROM_NAME} <{self.conf.MAIL_FROM}>" if self.conf.MAIL_FROM_NAME else str(self.conf.MAIL_FROM)
+        message["To"] = recipient
+        message["Subject"] = subject
+        message.set_content(body)
+        return message
+
+    def send(self, message: EmailMessage):
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            self.close()
+        if self._server is None:
+            self._server = self._connect()
+        try:
+            self._server.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            self._server = None
+            raise
+        except smtplib.SMTPException:
+            # A rejected message leaves the session usable (smtplib sends RSET).
+            raise
+        except OSError:
+            self._server = None
+            raise
+        finally:
+            self._last_used = time.monotonic()
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Union
 from datetime import datetime
 
 class BlogCreate(BaseModel):
@@ -8,16 +8,44 @@ class BlogCreate(BaseModel):
     image_url: Optional[str] = None
     video_url: Optional[str] = None
 
-class BlogOut(BaseModel):
+class BlogFields(BaseModel):
     id: int
     title: str
-    content: str
-    image_url: Optional[str]
-    video_url: Optional[str]
-    author_username: Optional[str]
+    image_url: Optional[str] = None
+    image_variants: Optional[dict] = None
+    video_url: Optional[str] = None
+    user_id: Optional[int] = None
+    author_username: Optional[str] = None
     likes_count: int
     comments_count: int
     created_at: datetime
 
     class Config:
         from_attributes = True
+
+class BlogOut(BlogFields):
+    content: str
+
+class BlogSummary(BlogFields):
+    excerpt: str
+
+BlogRow = Union[BlogOut, BlogSummary]
+
+class BlogPage(BaseModel):
+    blogs: list[BlogRow]
+    total: Optional[int]
+    page: int
+    limit: int
+    total_pages: Optional[int]
+    total_capped: Optional[bool] = None
+
+class BlogCursorPage(BaseModel):
+    blogs: list[BlogRow]
+    limit: int
+    next_cursor: Optional[str]
+    total: Optional[int] = None
+    total_capped: Optional[bool] = None
+
+class BlogBatch(BaseModel):
+    blogs: list[BlogRow]
+    missing: list[int]
@@ -8,8 +8,25 @@ class CommentCreate(BaseModel):
 class CommentOut(BaseModel):
     id: int
     content: str
-    username: Optional[str]
+    blog_id: Optional[int] = None
+    user_id: Optional[int] = None
+    username: Optional[str] = None
     parent_comment_id: Optional[int]
 
     class Config:
         from_attributes = True
+
+class CommentNode(CommentOut):
+    depth: int
+    reply_count: int
+
+class CommentThread(CommentNode):
+    replies: list[CommentNode]
+
+class CommentThreadPage(BaseModel):
+    threads: list[CommentThread]
+    next_after: Optional[int]
+
+class CommentReplyPage(BaseModel):
+    replies: list[CommentNode]
+    next_after: Optional[int]
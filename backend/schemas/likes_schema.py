@@ -2,3 +2,13 @@ from pydantic import BaseModel
 
 class LikeOut(BaseModel):
     likes_count: int
+
+
+class LikeState(BaseModel):
+    blog_id: int
+    is_liked: bool
+    likes_count: int
+
+class LikeBatch(BaseModel):
+    likes: list[LikeState]
+    missing: list[int]
@@ -0,0 +1,30 @@
+from core.config import SEARCH_BACKEND
+from .fulltext import FullTextSearch
+from .inverted import InvertedIndexSearch
+
+BACKENDS = {
+    "fulltext": FullTextSearch,
+    "inverted": InvertedIndexSearch,
+}
+
+backend = BACKENDS[SEARCH_BACKEND]()
+
+
+def search_blogs(db, term: str, limit: int):
+    return backend.search(db, term, limit)
+
+
+async def search_blogs_async(db, term: str, limit: int):
+    return await backend.search_async(db, term, limit)
+
+
+def index_blog(blog):
+    backend.index_blog(blog)
+
+
+def remove_blog(blog_id: int):
+    backend.remove_blog(blog_id)
+
+
+def rebuild_index(db):
+    backend.rebuild(db)
@@ -0,0 +1,27 @@
+from sqlalchemy import desc, select
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session
+from models import Blog
+
+
+class FullTextSearch:
+    """Ranks blogs with the FULLTEXT index on (title, content); MySQL keeps the index current."""
+
+    def search(self, db: Session, term: str, limit: int):
+        return list(db.execute(self._statement(term, limit)).scalars())
+
+    async def search_async(self, db, term: str, limit: int):
+        return list((await db.execute(self._statement(term, limit))).scalars())
+
+    def _statement(self, term: str, limit: int):
+        relevance = match(Blog.title, Blog.content, against=term).in_natural_language_mode()
+        return select(Blog.id).where(relevance).order_by(desc(relevance)).limit(limit)
+
+    def index_blog(self, blog):
+        pass
+
+    def remove_blog(self, blog_id: int):
+        pass
+
+    def rebuild(self, db: Session):
+        pass
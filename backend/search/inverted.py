@@ -0,0 +1,168 @@
+from collections import Counter
+from sqlalchemy.orm import Session
+from models import Blog
+import bisect
+import heapq
+import math
+import re
+import threading
+
+TOKEN_RE = re.compile(r"\w+")
+TITLE_WEIGHT = 3
+K1 = 1.2
+B = 0.75
+# Postings read from each term's impact-ordered list between threshold checks.
+BLOCK = 64
+# How far the average document length may drift before the impact order is rebuilt.
+AVG_DRIFT = 0.1
+
+
+def tokenize(text: str):
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+def term_frequencies(title: str, content: str):
+    terms = Counter(tokenize(content))
+    for token in tokenize(title):
+        terms[token] += TITLE_WEIGHT
+    return terms
+
+
+def impact(tf: int, length: int, avg_length: float):
+    """A posting's BM25 term weight before idf."""
+    return tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / avg_length))
+
+
+class InvertedIndexSearch:
+    """Per-process BM25 posting-list index, kept current by the blog CRUD functions.
+
+    Only the process that handles a write sees it, so the app runs this
+    backend with a single worker (see SEARCH_BACKEND in core.config).
+
+    Besides the postings themselves, each term keeps its postings ordered by
+    impact, computed against a snapshot of the average document length. A
+    query walks those lists best first and stops once no unread posting could
+    reach the top ``limit`` (the threshold algorithm), so its cost follows
+    ``limit`` rather than the length of the posting lists. The ordered lists
+    are built lazily and dropped when the average length drifts by more than
+    AVG_DRIFT. Within that drift, a live impact is at most the snapshot impact
+    divided by ``slack``, which keeps the stopping bound exact.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {}
+        self._ordered = {}
+        self._doc_terms = {}
+        self._lengths = {}
+        self._total_length = 0
+        self._snapshot_avg = None
+
+    def search(self, db: Session, term: str, limit: int):
+        tokens = set(tokenize(term))
+        with self._lock:
+            doc_count = len(self._lengths)
+            if not doc_count or limit <= 0:
+                return []
+            avg_length = self._total_length / doc_count
+            slack = self._refresh_snapshot(avg_length)
+            terms = []
+            for token in tokens:
+                postings = self._postings.get(token)
+                if postings:
+                    idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    terms.append((idf, postings, self._ordered_postings(token)))
+            return self._top(terms, avg_length, slack, limit)
+
+    def _top(self, terms, avg_length: float, slack: float, limit: int):
+        heap = []
+        seen = set()
+        position = 0
+        while True:
+            bound = sum(idf * -ordered[position][0] / slack for idf, _, ordered in terms if position < len(ordered))
+            if not bound or (len(heap) == limit and heap[0][0] > bound):
+                break
+            for _, _, ordered in terms:
+                for _, blog_id in ordered[position:position + BLOCK]:
+                    if blog_id in seen:
+                        continue
+                    seen.add(blog_id)
+                    length = self._lengths[blog_id]
+                    score = sum(idf * impact(postings[blog_id], length, avg_length) for idf, postings, _ in terms if blog_id in postings)
+                    entry = (score, blog_id)
+                    if len(heap) < limit:
+                        heapq.heappush(heap, entry)
+                    elif entry > heap[0]:
+                        heapq.heapreplace(heap, entry)
+            position += BLOCK
+        return [blog_id for _, blog_id in sorted(heap, reverse=True)]
+
+    def _refresh_snapshot(self, avg_length: float):
+        if self._snapshot_avg is None or abs(avg_length / self._snapshot_avg - 1) > AVG_DRIFT:
+            self._snapshot_avg = avg_length
+            self._ordered.clear()
+        # Live lengths are normalized by a larger average than the snapshot's,
+        # so live impacts can exceed the ordered ones by up to this factor.
+        return min(1.0, self._snapshot_avg / avg_length)
+
+    def _ordered_postings(self, token: str):
+        ordered = self._ordered.get(token)
+        if ordered is None:
+            ordered = sorted(self._ordered_key(token, blog_id, tf) for blog_id, tf in self._postings[token].items())
+            self._ordered[token] = ordered
+        return ordered
+
+    def _ordered_key(self, token: str, blog_id: int, tf: int):
+        return (-impact(tf, self._lengths[blog_id], self._snapshot_avg), blog_id)
+
+    async def search_async(self, db, term: str, limit: int):
+        return self.search(db, term, limit)
+
+    def index_blog(self, blog):
+        terms = term_frequencies(blog.title, blog.content)
+        with self._lock:
+            self._remove(blog.id)
+            length = sum(terms.values())
+            self._doc_terms[blog.id] = tuple(terms)
+            self._lengths[blog.id] = length
+            self._total_length += length
+            for token, tf in terms.items():
+                self._postings.setdefault(token, {})[blog.id] = tf
+                if token in self._ordered:
+                    bisect.insort(self._ordered[token], self._ordered_key(token, blog.id, tf))
+
+    def remove_blog(self, blog_id: int):
+        with self._lock:
+            self._remove(blog_id)
+
+    def rebuild(self, db: Session, batch_size: int = 1000):
+        rows = db.query(Blog.id, Blog.title, Blog.content).yield_per(batch_size)
+        with self._lock:
+            self._postings.clear()
+            self._ordered.clear()
+            self._snapshot_avg = None
+            self._doc_terms.clear()
+            self._lengths.clear()
+            self._total_length = 0
+            for row in rows:
+                self.index_blog(row)
+
+    def _remove(self, blog_id: int):
+        tokens = self._doc_terms.pop(blog_id, None)
+        if tokens is None:
+            return
+        for token in tokens:
+            postings = self._postings[token]
+            ordered = self._ordered.get(token)
+            if ordered is not None:
+                key = self._ordered_key(token, blog_id, postings[blog_id])
+                index = bisect.bisect_left(ordered, key)
+                if index < len(ordered) and ordered[index] == key:
+                    del ordered[index]
+                else:
+                    self._ordered.pop(token)
+            del postings[blog_id]
+            if not postings:
+                del self._postings[token]
+                self._ordered.pop(token, None)
+        self._total_length -= self._lengths.pop(blog_id)
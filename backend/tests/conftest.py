@@ -0,0 +1,93 @@
+import os
+
+# The application modules read their configuration at import time.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SEARCH_BACKEND", "inverted")
+os.environ.setdefault("CACHE_BACKEND", "memory")
+os.environ.setdefault("LIKE_WRITE_BEHIND", "false")
+os.environ.setdefault("OUTBOX_DISPATCHER", "false")
+os.environ.setdefault("TRENDING_REFRESH", "false")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from database import Base
+import models
+
+
+@pytest.fixture
+def engine():
+    # One shared connection, so every session sees the same in-memory database.
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def statements(engine):
+    """SQL statements run on the test engine, in order."""
+    captured = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        captured.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield captured
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def client(engine):
+    from fastapi.testclient import TestClient
+    from app import app
+    from cache import cache
+    from database import get_db, get_read_db
+
+    Session = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    def override():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override
+    app.dependency_overrides[get_read_db] = override
+    cache.clear()
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    cache.clear()
+
+
+def seed_blogs(db, author, count, likers=(), comments=0):
+    blogs = [models.Blog(title=f"{author.username} post {i}", content=f"body {i}", user_id=author.id) for i in range(count)]
+    db.add_all(blogs)
+    db.flush()
+    for blog in blogs:
+        for user in likers:
+            db.add(models.Like(blog_id=blog.id, user_id=user.id))
+        for i in range(comments):
+            db.add(models.Comment(blog_id=blog.id, user_id=author.id, content=f"comment {i}", path=""))
+        blog.likes_count = len(likers)
+        blog.comments_count = comments
+    db.commit()
+    return blogs
+
+
+@pytest.fixture
+def users(db):
+    users = [models.User(username=f"user{i}", email=f"user{i}@example.com", password="x") for i in range(4)]
+    db.add_all(users)
+    db.commit()
+    return users
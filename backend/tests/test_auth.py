@@ -0,0 +1,15 @@
+from crud import user_crud
+
+
+def test_register_and_reset_password(client, db):
+    response = client.post("/api/register", json={"username": "alice", "email": "alice@mail.com", "password": "First-pass1!"})
+    assert response.status_code == 200
+    assert client.post("/api/register", json={"username": "alice", "email": "alice@mail.com", "password": "Other-pass3!"}).status_code == 400
+    assert client.post("/api/login", json={"username": "alice", "password": "First-pass1!"}).status_code == 200
+
+    user_crud.set_reset_token(db, "alice@mail.com", "token", "9999-12-31 00:00:00")
+    response = client.post("/api/reset-password", json={"reset_token": "token", "new_password": "Second-pass2!"})
+    assert response.status_code == 200
+    assert client.post("/api/login", json={"username": "alice", "password": "First-pass1!"}).status_code == 400
+    assert client.post("/api/login", json={"username": "alice", "password": "Second-pass2!"}).status_code == 200
+    assert client.post("/api/reset-password", json={"reset_token": "token", "new_password": "x"}).status_code == 400
@@ -0,0 +1,40 @@
+import pytest
+from cache import LocalSharedClient, MemoryCache, ReplicaLagCache, SharedCache
+
+
+BACKENDS = {
+    "memory": lambda: MemoryCache(),
+    "shared": lambda: SharedCache(LocalSharedClient()),
+    "replicas": lambda: ReplicaLagCache(MemoryCache(), delay=60),
+}
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_fill_racing_an_invalidation_is_dropped(backend):
+    cache = BACKENDS[backend]()
+    since = cache.fence()
+    # A write lands and invalidates while the stale value is being read.
+    cache.invalidate_tags("blog:1")
+    cache.set("blog:1", {"title": "old"}, tags=["blog:1"], since=since)
+    assert cache.get("blog:1") is None
+
+    # Other tags, and fills fenced after the invalidation, still go through.
+    cache.set("blog:2", {"title": "other"}, tags=["blog:2"], since=since)
+    assert cache.get("blog:2") == {"title": "other"}
+    since = cache.fence()
+    cache.set("blog:1", {"title": "new"}, tags=["blog:1"], since=since)
+    assert cache.get("blog:1") == {"title": "new"}
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_clear_empties_the_cache_but_keeps_fences(backend):
+    cache = BACKENDS[backend]()
+    cache.set("a", 1, tags=["t"])
+    cache.set("b", 2)
+    since = cache.fence()
+    cache.clear()
+    assert cache.get("a") is None and cache.get("b") is None
+
+    cache.invalidate_tags("t")
+    cache.set("a", 1, tags=["t"], since=since)
+    assert cache.get("a") is None
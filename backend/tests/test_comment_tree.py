@@ -0,0 +1,49 @@
+import pytest
+from crud import comments_crud
+from models import Blog, Comment
+from models.comments import MAX_DEPTH, path_segment
+from tests.conftest import seed_blogs
+
+
+def add(db, blog, user, parent=None):
+    return comments_crud.create_comment(db, "text", blog.id, user.id, parent.id if parent else None)
+
+
+def test_delete_moves_replies_to_the_parent(db, users):
+    blog = seed_blogs(db, users[0], 1)[0]
+    root = add(db, blog, users[0])
+    middle = add(db, blog, users[1], root)
+    child = add(db, blog, users[2], middle)
+    grandchild = add(db, blog, users[3], child)
+    sibling = add(db, blog, users[1], middle)
+    other = add(db, blog, users[0])
+
+    middle_id = middle.id
+    assert comments_crud.delete_comment(db, middle) == 2
+    db.expire_all()
+    assert db.get(Comment, middle_id) is None
+    assert (child.parent_comment_id, sibling.parent_comment_id) == (root.id, root.id)
+    assert child.path == path_segment(root.id) + path_segment(child.id)
+    assert grandchild.path == child.path + path_segment(grandchild.id)
+    assert root.reply_count == 2
+    assert db.get(Blog, blog.id).comments_count == 5
+
+    # Deleting a root promotes its replies to roots.
+    comments_crud.delete_comment(db, root)
+    db.expire_all()
+    assert child.parent_comment_id is None and child.path == path_segment(child.id)
+    assert grandchild.path == child.path + path_segment(grandchild.id)
+    roots, replies, _ = comments_crud.get_threads(db, blog.id, 10, 10)
+    assert [c.id for c, _ in roots] == [child.id, sibling.id, other.id]
+    assert [c.id for c, _ in replies] == [grandchild.id]
+    assert [c.id for c, _ in comments_crud.get_replies(db, child, 10)[0]] == [grandchild.id]
+
+
+def test_reply_depth_is_limited(db, users):
+    blog = seed_blogs(db, users[0], 1)[0]
+    parent = None
+    for _ in range(MAX_DEPTH):
+        parent = add(db, blog, users[0], parent)
+    with pytest.raises(ValueError):
+        add(db, blog, users[0], parent)
+    assert db.get(Blog, blog.id).comments_count == MAX_DEPTH
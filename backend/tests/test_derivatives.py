@@ -0,0 +1,63 @@
+from concurrent.futures import Future
+from media import derivatives
+
+
+def test_manifests_are_cached(monkeypatch):
+    reads = []
+
+    def read(filename):
+        reads.append(filename)
+        return {"sizes": {}} if filename == "a.png" else None
+
+    monkeypatch.setattr(derivatives, "_read_manifest", read)
+    monkeypatch.setattr(derivatives, "_manifests", derivatives.OrderedDict())
+    for _ in range(3):
+        assert derivatives.derivative_urls("/uploads/a.png") == {"sizes": {}}
+        assert derivatives.derivative_urls("/uploads/b.png") is None
+    assert reads == ["a.png", "b.png"]
+
+    derivatives.forget_manifest("/uploads/b.png")
+    derivatives.derivative_urls("/uploads/b.png")
+    monkeypatch.setattr(derivatives, "MANIFEST_MISS_TTL", -1)
+    derivatives.forget_manifest("/uploads/b.png")
+    derivatives.derivative_urls("/uploads/b.png")
+    derivatives.derivative_urls("/uploads/b.png")
+    assert reads == ["a.png", "b.png", "b.png", "b.png", "b.png"]
+
+
+def test_cancelled_generation_is_ignored():
+    pool = derivatives.DerivativePool(1, 1)
+    assert pool._slots.acquire(blocking=False)
+    future = Future()
+    future.cancel()
+    done = []
+    pool._finished(future, "/uploads/a.png", lambda: done.append(True))
+    assert done == []
+    assert pool._slots.acquire(blocking=False)
+
+
+def test_finished_derivatives_change_the_etag(client, db, engine, users, monkeypatch):
+    import models
+    from api import blogs as blogs_api
+    from sqlalchemy.orm import sessionmaker
+
+    blog = models.Blog(title="t", content="c", image_url="/uploads/a.png", user_id=users[0].id)
+    db.add(blog)
+    db.commit()
+    monkeypatch.setattr(derivatives, "_read_manifest", lambda filename: None)
+    monkeypatch.setattr(derivatives, "_manifests", derivatives.OrderedDict())
+    first = client.get(f"/api/blogs/{blog.id}")
+    assert first.json()["image_variants"] is None
+    etag = first.headers["ETag"]
+    assert client.get(f"/api/blogs/{blog.id}", headers={"If-None-Match": etag}).status_code == 304
+
+    manifest = {"sizes": {"320": "/uploads/a-320.webp"}}
+    monkeypatch.setattr(derivatives, "_read_manifest", lambda filename: manifest)
+    monkeypatch.setattr(blogs_api, "SessionLocal", sessionmaker(bind=engine))
+    derivatives.forget_manifest("/uploads/a.png")
+    blogs_api.derivatives_ready("/uploads/a.png")
+
+    second = client.get(f"/api/blogs/{blog.id}", headers={"If-None-Match": etag})
+    assert second.status_code == 200
+    assert second.headers["ETag"] != etag
+    assert second.json()["image_variants"] == manifest
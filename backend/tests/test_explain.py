@@ -0,0 +1,36 @@
+import datetime
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from crud import comments_crud, trending_crud
+from database.explain import explain_endpoints
+from models import User
+from tests.conftest import seed_blogs
+
+
+def test_read_endpoints_use_indexes(tmp_path, monkeypatch):
+    # Migrate a real database file, so the indexes checked are the ones the
+    # migrations create rather than the ones create_all would.
+    import core.config
+
+    url = f"sqlite:///{tmp_path / 'explain.db'}"
+    monkeypatch.setattr(core.config, "DATABASE_URL", url)
+    command.upgrade(Config("alembic.ini"), "head")
+
+    engine = create_engine(url)
+    db = sessionmaker(bind=engine)()
+    try:
+        users = [User(username=f"user{i}", email=f"user{i}@mail.com", password="x") for i in range(5)]
+        db.add_all(users)
+        db.commit()
+        for author in users:
+            for blog in seed_blogs(db, author, 20, likers=users[:3]):
+                root = comments_crud.create_comment(db, "root", blog.id, author.id)
+                comments_crud.create_comment(db, "reply", blog.id, users[0].id, root.id)
+        trending_crud.rebuild(db, datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None), 0, 1000)
+
+        assert explain_endpoints(db) == []
+    finally:
+        db.close()
+        engine.dispose()
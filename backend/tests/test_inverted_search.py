@@ -0,0 +1,70 @@
+import math
+import random
+from types import SimpleNamespace
+from search.inverted import InvertedIndexSearch, term_frequencies, tokenize, impact
+
+
+def exhaustive(docs, query, limit):
+    """Score every posting, as the index did before it pruned."""
+    frequencies = {blog_id: term_frequencies(title, content) for blog_id, (title, content) in docs.items()}
+    avg_length = sum(sum(terms.values()) for terms in frequencies.values()) / len(frequencies)
+    scores = {}
+    for token in set(tokenize(query)):
+        matching = [blog_id for blog_id, terms in frequencies.items() if token in terms]
+        idf = math.log(1 + (len(docs) - len(matching) + 0.5) / (len(matching) + 0.5))
+        for blog_id in matching:
+            terms = frequencies[blog_id]
+            scores[blog_id] = scores.get(blog_id, 0.0) + idf * impact(terms[token], sum(terms.values()), avg_length)
+    return [blog_id for blog_id, _ in sorted(scores.items(), key=lambda item: (item[1], item[0]), reverse=True)[:limit]]
+
+
+def text(rng, words):
+    return " ".join(f"w{min(int(rng.paretovariate(1.0)), 300)}" for _ in range(words))
+
+
+def test_pruned_search_matches_exhaustive_ranking():
+    rng = random.Random(7)
+    index = InvertedIndexSearch()
+    docs = {}
+
+    def put(blog_id):
+        docs[blog_id] = (text(rng, 3), text(rng, rng.randint(5, 80)))
+        index.index_blog(SimpleNamespace(id=blog_id, title=docs[blog_id][0], content=docs[blog_id][1]))
+
+    for blog_id in range(1, 1501):
+        put(blog_id)
+    queries = ["w1", "w2 w3", "w1 w40", "w7 w150 w2", "w299", "nothing"]
+    for query in queries:
+        assert index.search(None, query, 25) == exhaustive(docs, query, 25)
+
+    # Updates, deletes and a shift in average length after the ordered lists exist.
+    for blog_id in rng.sample(sorted(docs), 300):
+        index.remove_blog(blog_id)
+        del docs[blog_id]
+    for blog_id in rng.sample(sorted(docs), 300):
+        put(blog_id)
+    for blog_id in range(1501, 1801):
+        docs[blog_id] = (text(rng, 3), text(rng, 200))
+        index.index_blog(SimpleNamespace(id=blog_id, title=docs[blog_id][0], content=docs[blog_id][1]))
+    for query in queries:
+        for limit in (1, 25, 2000):
+            assert index.search(None, query, limit) == exhaustive(docs, query, limit)
+
+
+def test_listing_reports_capped_search_totals(client, db, users, monkeypatch):
+    from api import blogs as blogs_api
+    from crud import blogs_crud
+    from search import rebuild_index
+    from tests.conftest import seed_blogs
+
+    monkeypatch.setattr(blogs_api, "SEARCH_MAX_RESULTS", 5)
+    monkeypatch.setattr(blogs_crud, "SEARCH_MAX_RESULTS", 5)
+    seed_blogs(db, users[0], 8)
+    rebuild_index(db)
+
+    body = client.get("/api/blogs/", params={"search": "post", "limit": 2, "page": 3}).json()
+    assert (body["total"], body["total_pages"], body["total_capped"]) == (5, 3, True)
+    assert len(body["blogs"]) == 1
+    cursor = client.get("/api/blogs/", params={"search": "post", "cursor": "", "include_total": True}).json()
+    assert (cursor["total"], cursor["total_capped"]) == (5, True)
+    assert "total_capped" not in client.get("/api/blogs/", params={"search": "7"}).json()
@@ -0,0 +1,89 @@
+import os
+import pytest
+import models
+from ingest.journal import LikeJournal
+from ingest.likes import LikeBuffer
+from tests.conftest import seed_blogs
+
+
+def test_only_one_process_buffers_likes(tmp_path):
+    first = LikeJournal(str(tmp_path))
+    assert first.claim()
+    second = LikeBuffer(LikeJournal(str(tmp_path)), 1.0, 10, 10)
+    with pytest.raises(RuntimeError):
+        second.start()
+    first.close()
+    assert second.journal.claim()
+    second.journal.close()
+
+
+@pytest.fixture
+def sessions(engine, monkeypatch):
+    from sqlalchemy.orm import sessionmaker
+    from ingest import likes
+
+    monkeypatch.setattr(likes, "SessionLocal", sessionmaker(bind=engine, autocommit=False, autoflush=False))
+
+
+def liked_by(db, blog):
+    db.expire_all()
+    return sorted(like.user_id for like in db.query(models.Like).filter(models.Like.blog_id == blog.id)), blog.likes_count
+
+
+def test_toggles_of_a_crashed_process_are_replayed(tmp_path, db, users, sessions):
+    blog, = seed_blogs(db, users[0], 1)
+    crashed = LikeBuffer(LikeJournal(str(tmp_path)), 1.0, 100, 10)
+    crashed.journal.claim()
+    crashed.journal.open()
+    for user in users[:3]:
+        crashed.toggle(blog.id, user.id, lambda: False)
+    crashed.toggle(blog.id, users[2].id, lambda: False)
+    with open(crashed.journal._file.name, "a", encoding="utf-8") as segment:
+        segment.write(f"{blog.id} {users[3].id}")  # torn, never acknowledged
+    # Dies without flushing: its locks go, its segment stays.
+    crashed.journal.close()
+
+    restarted = LikeBuffer(LikeJournal(str(tmp_path)), 1.0, 100, 10)
+    assert restarted.journal.claim()
+    restarted.journal.open()
+    assert restarted.recover() == 3
+    assert liked_by(db, blog) == ([users[0].id, users[1].id], 2)
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".log")] == [os.path.basename(restarted.journal._file.name)]
+    restarted.journal.close()
+
+
+def test_failed_flush_is_requeued_then_dead_lettered(tmp_path, db, users, sessions, monkeypatch):
+    from crud import likes_crud
+    from ingest import likes
+
+    blog, = seed_blogs(db, users[0], 1)
+    buffer = LikeBuffer(LikeJournal(str(tmp_path)), 1.0, 100, 10, max_attempts=2)
+    buffer.journal.claim()
+    buffer.journal.open()
+    apply_like_states = likes_crud.apply_like_states
+
+    def fail(*args):
+        raise RuntimeError("database is down")
+
+    monkeypatch.setattr(likes.likes_crud, "apply_like_states", fail)
+    buffer.toggle(blog.id, users[1].id, lambda: False)
+    assert buffer.flush() == 0
+    # Requeued: still visible to readers and flushed once the database is back.
+    assert buffer.state(blog.id, users[1].id, lambda: False) is True
+    assert buffer.delta(blog.id) == 1
+    monkeypatch.setattr(likes.likes_crud, "apply_like_states", apply_like_states)
+    assert buffer.flush() == 1
+    assert liked_by(db, blog) == ([users[1].id], 1)
+
+    monkeypatch.setattr(likes.likes_crud, "apply_like_states", fail)
+    buffer.toggle(blog.id, users[2].id, lambda: False)
+    assert buffer.flush() == 0
+    assert buffer.flush() == 0
+    # Gave up after two attempts: dropped from the buffer and its journal, kept aside.
+    assert buffer.stats() == {"pending": 0, "flushing": 0, "sealed_segments": 0}
+    assert buffer.delta(blog.id) == 0
+    dead, = [name for name in os.listdir(tmp_path) if name.endswith(".dead")]
+    with open(tmp_path / dead, encoding="utf-8") as file:
+        assert file.read() == f"{blog.id} {users[2].id} 1\n"
+    assert buffer.flush() == 0
+    buffer.journal.close()
@@ -0,0 +1,22 @@
+from crud import blogs_crud
+from api.blogs import MAX_LISTING_PAGE
+from tests.conftest import seed_blogs
+
+
+def test_listing_limit_is_clamped(client, db, users):
+    seed_blogs(db, users[0], MAX_LISTING_PAGE + 5)
+    response = client.get("/api/blogs/", params={"limit": 100000, "page": 0})
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["blogs"]) == MAX_LISTING_PAGE
+    assert (body["page"], body["limit"]) == (1, MAX_LISTING_PAGE)
+    assert len(client.get("/api/blogs/", params={"limit": -5, "cursor": ""}).json()["blogs"]) == 1
+
+
+def test_count_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(blogs_crud, "COUNT_CACHE_MAX_ENTRIES", 3)
+    for i in range(10):
+        blogs_crud.store_count(f"term {i}", i)
+    assert len(blogs_crud._count_cache) == 3
+    assert blogs_crud.cached_count("term 0") is None
+    assert blogs_crud.cached_count("term 9") == 9
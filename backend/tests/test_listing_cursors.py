@@ -0,0 +1,33 @@
+import pytest
+from crud import blogs_crud
+from tests.conftest import seed_blogs
+
+
+@pytest.mark.parametrize("sort_by", ["created_at", "title", "likes"])
+@pytest.mark.parametrize("order", ["desc", "asc"])
+def test_cursor_walk_returns_every_blog_once(db, users, sort_by, order):
+    # Seeded in one commit, so created_at ties for every row (and likes too).
+    blogs = seed_blogs(db, users[0], 7, likers=users[:1])
+    seen, cursor, pages = [], None, 0
+    while True:
+        page, cursor = blogs_crud.get_blogs_after(db, cursor, 3, sort_by, order)
+        seen += [blog.id for blog, _ in page]
+        pages += 1
+        assert pages <= 3
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(blog.id for blog in blogs)
+    assert len(seen) == len(set(seen))
+
+
+def test_api_cursor_walk(client, db, users):
+    blogs = seed_blogs(db, users[0], 7)
+    seen, cursor = [], ""
+    for _ in range(3):
+        body = client.get("/api/blogs/", params={"cursor": cursor, "limit": 3}).json()
+        seen += [blog["id"] for blog in body["blogs"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert cursor is None
+    assert seen == sorted((blog.id for blog in blogs), reverse=True)
@@ -0,0 +1,54 @@
+"""The blog listings must issue a fixed number of queries, whatever the page size.
+
+If a per-row query (a like or comment count, or a lazy-loaded author) comes
+back, the larger page runs more statements than the smaller one and these fail.
+"""
+import pytest
+import models
+from tests.conftest import seed_blogs
+
+
+@pytest.fixture
+def authors(db, users):
+    prolific, occasional = users[0], users[1]
+    seed_blogs(db, prolific, 60, likers=users[1:], comments=2)
+    seed_blogs(db, occasional, 1, likers=users[2:], comments=1)
+    # One blog per author as well, so a lazily loaded author costs a query per row.
+    for i in range(60):
+        author = models.User(username=f"author{i}", email=f"author{i}@example.com", password="x")
+        db.add(author)
+        db.flush()
+        seed_blogs(db, author, 1, likers=users[:2], comments=1)
+    return prolific, occasional
+
+
+def count_queries(client, statements, path, **params):
+    statements.clear()
+    response = client.get(path, params=params)
+    assert response.status_code == 200, response.text
+    return len(statements), response.json()
+
+
+@pytest.mark.parametrize("params", [
+    {"sort_by": "created_at"},
+    {"sort_by": "likes", "view": "excerpt"},
+    {"sort_by": "title", "order": "asc", "cursor": ""},
+])
+def test_listing_query_count_does_not_depend_on_page_size(client, statements, authors, params):
+    small, small_page = count_queries(client, statements, "/api/blogs/", limit=1, **params)
+    large, large_page = count_queries(client, statements, "/api/blogs/", limit=50, **params)
+    assert len(small_page["blogs"]) == 1
+    assert len(large_page["blogs"]) == 50
+    assert all(blog["author_username"] for blog in large_page["blogs"])
+    assert small == large
+
+
+def test_user_blogs_query_count_does_not_depend_on_blog_count(client, statements, authors):
+    prolific, occasional = authors
+    few, few_blogs = count_queries(client, statements, f"/api/blogs/user/{occasional.id}")
+    many, many_blogs = count_queries(client, statements, f"/api/blogs/user/{prolific.id}")
+    assert len(few_blogs) == 1
+    assert len(many_blogs) == 60
+    assert {blog["likes_count"] for blog in many_blogs} == {3}
+    assert {blog["comments_count"] for blog in many_blogs} == {2}
+    assert few == many
@@ -0,0 +1,28 @@
+import datetime
+from sqlalchemy.orm import sessionmaker
+from crud import outbox_crud
+from models import OutboxMessage
+
+
+def test_results_for_an_expired_lease_are_skipped(db, engine):
+    for i in range(3):
+        outbox_crud.enqueue_email(db, f"user{i}@mail.com", "subject", "body")
+    first = outbox_crud.claim_due(db, 10, lease=60)
+    assert len(first) == 3
+    # Lease on the first message runs out and another dispatcher claims it.
+    other = sessionmaker(bind=engine)()
+    other.query(OutboxMessage).filter(OutboxMessage.id == first[0].id).update({"next_attempt_at": datetime.datetime.now()})
+    other.commit()
+    second = outbox_crud.claim_due(other, 10, lease=60)
+    assert [message.id for message in second] == [first[0].id]
+    token = second[0].claim_token
+    other.close()
+
+    retried, gave_up, skipped = outbox_crud.record_results(db, first[:2], [(first[2], OSError("boom"), True)], [], 5, 1.0, 60.0)
+    assert (retried, gave_up, skipped) == (0, 1, 1)
+    db.expire_all()
+    rows = {row.id: row for row in db.query(OutboxMessage)}
+    assert rows[first[0].id].status == "sending" and rows[first[0].id].claim_token == token
+    assert rows[first[0].id].attempts == 0
+    assert rows[first[1].id].status == "sent" and rows[first[1].id].claim_token is None
+    assert rows[first[2].id].status == "failed" and rows[first[2].id].attempts == 1
@@ -0,0 +1,15 @@
+import time
+from middleware.consistency import make_marker, marker_fresh
+
+
+def test_only_signed_unexpired_markers_are_fresh():
+    now = time.time()
+    assert marker_fresh(make_marker(now + 2), window=5)
+    assert not marker_fresh(make_marker(now - 1), window=5)
+    # Signed, but further ahead than one window.
+    assert not marker_fresh(make_marker(now + 3600), window=5)
+    forged = f"{now + 2:.3f}:{'0' * 32}"
+    assert not marker_fresh(forged, window=5)
+    assert not marker_fresh(f"{now + 2:.3f}", window=5)
+    assert not marker_fresh("9e99:" + make_marker(now + 2).split(":")[1], window=5)
+    assert not marker_fresh(None) and not marker_fresh("garbage")
@@ -0,0 +1,35 @@
+import datetime
+from crud import blogs_crud, trending_crud
+from models import BlogTrending, TrendingState
+from tests.conftest import seed_blogs
+
+
+def now():
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def test_trending_cursor_pages_through_tied_scores(db, users):
+    blogs = seed_blogs(db, users[0], 25, likers=users[:2])
+    assert trending_crud.rebuild(db, now(), 0, 100) == 25
+    # Likes seeded in one statement share a timestamp, so most scores tie.
+    seen, cursor = [], ""
+    while cursor is not None:
+        page, cursor = blogs_crud.get_blogs_after(db, cursor or None, 4, "trending")
+        seen += [blog.id for blog, _ in page]
+    assert sorted(seen) == sorted(blog.id for blog in blogs)
+    assert len(seen) == len(set(seen))
+
+
+def test_deleting_a_blog_keeps_the_ranked_count(db, users):
+    blogs = seed_blogs(db, users[0], 3, likers=users[:1])
+    trending_crud.rebuild(db, now(), 0, 100)
+    blogs_crud.delete_blog(db, blogs[0])
+    assert db.get(TrendingState, 1).ranked == 2 == db.query(BlogTrending).count()
+    assert blogs_crud.get_blogs_filtered(db, 1, 10, "trending")[1] == 2
+
+
+def test_scores_are_measured_from_a_recent_epoch():
+    score = trending_crud.event_score(now(), 1.0)
+    assert 0 < score < 10_000
+    later = trending_crud.event_score(now() + datetime.timedelta(hours=1), 1.0)
+    assert later > score
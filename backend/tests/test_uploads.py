@@ -0,0 +1,63 @@
+import asyncio
+import os
+import time
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from media import uploads
+from middleware import BodySizeLimitMiddleware
+
+
+def test_session_locks_are_released(monkeypatch, tmp_path):
+    monkeypatch.setattr(uploads, "UPLOAD_TMP_DIR", str(tmp_path))
+    session = uploads.create_session(1, "a.txt", 4, "image")
+
+    async def chunks():
+        yield b"ab"
+
+    async def run():
+        await asyncio.gather(
+            uploads.append_chunk(session["id"], 1, 0, chunks()),
+            uploads.append_chunk(session["id"], 1, 0, chunks()),
+            return_exceptions=True,
+        )
+        assert uploads._session_locks == {}
+        try:
+            await uploads.complete_session(session["id"], 1)
+        except uploads.UploadError:
+            pass
+        assert uploads._session_locks == {}
+
+    asyncio.run(run())
+
+
+def test_sweep_removes_stale_sessions_and_spools(monkeypatch, tmp_path):
+    monkeypatch.setattr(uploads, "UPLOAD_TMP_DIR", str(tmp_path))
+    stale = uploads.create_session(1, "a.png", 10, "image")
+    fresh = uploads.create_session(1, "b.png", 10, "image")
+    spool = tmp_path / "0123.part"
+    spool.write_bytes(b"x")
+    old = time.time() - 7200
+    for path in (tmp_path / f"{stale['id']}.part", tmp_path / f"{stale['id']}.json", spool):
+        os.utime(path, (old, old))
+
+    assert uploads.sweep_stale(3600) == 2
+    assert sorted(os.listdir(tmp_path)) == sorted([f"{fresh['id']}.json", f"{fresh['id']}.part"])
+
+
+def test_request_body_limit():
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    client = TestClient(BodySizeLimitMiddleware(app, max_size=1000))
+    assert client.post("/upload", files={"file": ("a.bin", b"x" * 100)}).json() == {"size": 100}
+    assert client.post("/upload", files={"file": ("a.bin", b"x" * 5000)}).status_code == 413
+
+    def chunked():
+        for _ in range(10):
+            yield b"x" * 500
+
+    response = client.post("/upload", content=chunked(), headers={"content-type": "multipart/form-data; boundary=b"})
+    assert response.status_code == 413
@@ -0,0 +1,10 @@
+from core.config import TRENDING_INTERVAL, TRENDING_REBUILD_INTERVAL, TRENDING_BATCH_SIZE
+from cache import cache
+from .ranker import TrendingRanker
+
+
+def invalidate_trending():
+    cache.invalidate_tags("blogs:sort:trending")
+
+
+ranker = TrendingRanker(TRENDING_INTERVAL, TRENDING_REBUILD_INTERVAL, TRENDING_BATCH_SIZE, on_change=invalidate_trending)
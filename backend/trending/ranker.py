@@ -0,0 +1,95 @@
+import logging
+import threading
+from database import SessionLocal
+from crud import trending_crud
+
+logger = logging.getLogger(__name__)
+
+
+class TrendingRanker:
+    """Keeps the blog_trending table current from a background thread.
+
+    Every ``interval`` seconds it folds the likes and comments made since the
+    last pass into the stored scores and drops blogs that have gone cold. Every
+    ``rebuild_interval`` seconds it recomputes all scores from the window
+    instead, which also catches unlikes and deleted comments. Passes are
+    serialized through the trending_state row, so any number of processes can
+    run the ranker.
+    """
+
+    def __init__(self, interval: float, rebuild_interval: float, batch_size: int, on_change=None):
+        self.interval = interval
+        self.rebuild_interval = rebuild_interval
+        self.batch_size = batch_size
+        self.on_change = on_change
+        self._stopping = threading.Event()
+        self._thread = None
+        self._stats = {"passes": 0, "rebuilds": 0, "events": 0, "pruned": 0, "ranked": 0}
+
+    def refresh(self):
+        """Fold in everything new; returns how many events were read."""
+        db = SessionLocal()
+        try:
+            now = trending_crud.utc_now()
+            if trending_crud.rebuild_due(db, now, self.rebuild_interval):
+                ranked = trending_crud.rebuild(db, now, self.rebuild_interval, self.batch_size)
+                if ranked is not None:
+                    self._stats["rebuilds"] += 1
+                    self._stats["ranked"] = ranked
+                    self._changed()
+                    return 0
+            events = 0
+            while True:
+                read = trending_crud.fold_new_events(db, now, self.batch_size)
+                if not read:
+                    break
+                events += read
+                if read < self.batch_size:
+                    break
+            pruned = trending_crud.prune(db, now)
+            self._stats["passes"] += 1
+            self._stats["events"] += events
+            self._stats["pruned"] += pruned
+            if events or pruned:
+                self._changed()
+            return events
+        finally:
+            db.close()
+
+    def rebuild(self):
+        """Recompute every score now, however recently that was last done."""
+        db = SessionLocal()
+        try:
+            ranked = trending_crud.rebuild(db, trending_crud.utc_now(), 0, self.batch_size)
+            self._stats["rebuilds"] += 1
+            self._stats["ranked"] = ranked
+            self._changed()
+            return ranked
+        finally:
+            db.close()
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Trending refresh failed")
+            self._stopping.wait(self.interval)
+
+    def start(self):
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="trending-ranker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self):
+        return dict(self._stats)
@@ -42,6 +42,7 @@ function Home() {
         limit: limit.toString(),
         sort_by: sortBy,
         order: order,
+        view: 'excerpt',
         ...(search && { search })
       });
       const response = await api.get(`/blogs?${params}`);
@@ -154,8 +155,16 @@ function Home() {
                   <option value="created_at">Date</option>
                   <option value="title">Title</option>
                   <option value="likes">Likes</option>
+                  <option value="trending">Trending</option>
                 </select>
-                <select value={order} onChange={(e) => handleOrderChange(e.target.value)} className="order-select">
+                {/* Trending is always ranked hottest first, so there is no order to pick. */}
+                <select
+                  value={sortBy === 'trending' ? 'desc' : order}
+                  onChange={(e) => handleOrderChange(e.target.value)}
+                  disabled={sortBy === 'trending'}
+                  title={sortBy === 'trending' ? 'Trending is always ranked hottest first' : undefined}
+                  className="order-select"
+                >
                   <option value="desc">Descending</option>
                   <option value="asc">Ascending</option>
                 </select>
@@ -171,7 +180,7 @@ function Home() {
                     <div key={blog.id} className="blog-cards">
                       <div className="blog-contents">
                         <h2>{blog.title}</h2>
-                        <p>{`${blog.content.substring(0, 100)}${blog.content.length > 100 ? '...' : ''}`}</p>
+                        <p>{blog.excerpt}</p>
                         <button onClick={() => handleViewBlog(blog)} className="read-more-btn">
                           Read More
                         </button>
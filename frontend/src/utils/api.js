@@ -5,6 +5,11 @@ const api = axios.create({
   timeout: 20000,
 });
 
+// After a write the API names a time until which our reads must come from the
+// primary database; echo it back so we see our own changes despite replica lag.
+// The value is "<unix time>:<signature>"; only the time is ours to read.
+let readPrimaryUntil = null;
+
 // Request interceptor to add token to headers
 api.interceptors.request.use(
   (config) => {
@@ -12,6 +17,9 @@ api.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    if (readPrimaryUntil && Number(readPrimaryUntil.split(':')[0]) * 1000 > Date.now()) {
+      config.headers['X-Read-Primary-Until'] = readPrimaryUntil;
+    }
     return config;
   },
   (error) => {
@@ -21,7 +29,13 @@ api.interceptors.request.use(
 
 // Response interceptor to handle token expiration
 api.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    const until = response.headers['x-read-primary-until'];
+    if (until) {
+      readPrimaryUntil = until;
+    }
+    return response;
+  },
   (error) => {
     if (error.response?.status === 401) {
       localStorage.removeItem('access_token');